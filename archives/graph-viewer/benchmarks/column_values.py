@@ -0,0 +1,90 @@
+"""1000万行のカラムを取得する場合の、リスト (get_column_values) と配列 (get_column_array) の速度とメモリを比較する。
+
+csv は初回だけ生成して --workdir に残す。(生成には数十秒かかる)
+    list:            全体を DataFrame として読み込み、get_column_values でリストにする (以前の実装)
+    array:           全体を DataFrame として読み込み、get_column_array で配列を取得する
+    columnar cold:   columnar で読み込む。キャッシュが無い状態から .npy を作る
+    columnar warm:   columnar で読み込む。作成済みの .npy をメモリマップで読み込む
+
+Usage:
+    python -m benchmarks.column_values
+    python -m benchmarks.column_values --rows 1000000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from src.backend._csv import CSVReader
+
+COLUMN = "v1"
+
+
+def generate_csv(filepath: str, number_of_rows: int) -> None:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "time[sec]": np.arange(number_of_rows) * 0.1,
+            COLUMN: rng.normal(size=number_of_rows),
+            "v2[A]": rng.normal(size=number_of_rows),
+        }
+    )
+    df.to_csv(filepath, index=False)
+
+
+def measure(run: Callable[[], object]) -> tuple[float, float, float]:
+    """(秒, ピークメモリ(MiB), 結果のサイズ(MiB)) を返す。
+    NOTE: numpy の確保したメモリも tracemalloc で計測出来る。メモリマップは実際に読んだ分もファイルのページとして扱われ含まれない。
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    if isinstance(result, list):
+        # リスト本体 + float オブジェクト1つあたり 24 バイト
+        size = result.__sizeof__() + 24 * len(result)
+    else:
+        size = result.nbytes  # type: ignore
+    return elapsed, peak / 2**20, size / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "graph-viewer-bench"))
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    filepath = os.path.join(args.workdir, f"{args.rows}.csv")
+    if not os.path.exists(filepath):
+        print(f"generating {filepath} ...")
+        generate_csv(filepath, args.rows)
+    cache_dir = os.path.join(args.workdir, "cache")
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+    eager = CSVReader(filepath)
+    strategies: dict[str, Callable[[], object]] = {
+        "list": lambda: eager.get_column_values(COLUMN),
+        "array": lambda: eager.get_column_array(COLUMN),
+        "columnar cold": lambda: CSVReader(filepath, columnar=True, cache_dir=cache_dir).get_column_array(COLUMN),
+        "columnar warm": lambda: CSVReader(filepath, columnar=True, cache_dir=cache_dir).get_column_array(COLUMN),
+    }
+
+    print(f"rows={args.rows:,} ({os.path.getsize(filepath) / 2**20:.0f} MiB)")
+    print(f"{'strategy':<14} {'seconds':>9} {'peak MiB':>9} {'result MiB':>11}")
+    for name, run in strategies.items():
+        elapsed, peak, size = measure(run)
+        print(f"{name:<14} {elapsed:>9.3f} {peak:>9.1f} {size:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
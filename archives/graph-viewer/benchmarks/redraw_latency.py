@@ -0,0 +1,85 @@
+"""点の数が多い系列をプロットした場合の、再描画にかかる時間を間引き (level of detail) の有無で比較する。
+
+GraphPlotter を画面に表示せずに (Agg で) 描画して計測する。
+    plot:   系列をプロットして最初に描画するまで
+    redraw: そのまま再描画する
+    zoom:   X軸のレンジを変えて再描画する (拡大していく)
+    reset:  X軸のレンジを自動に戻して再描画する
+
+Usage:
+    python -m benchmarks.redraw_latency
+    python -m benchmarks.redraw_latency --rows 10000000 --series 4
+"""
+import argparse
+import time
+from typing import Callable
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+
+from src.backend.graph import GraphPlotter  # noqa: E402
+
+
+def measure(run: Callable[[], None], repeat: int) -> float:
+    """1回あたりのミリ秒を返す。"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def benchmark(lod: bool, x_values: np.ndarray, series: list[np.ndarray], repeat: int) -> dict[str, float]:
+    graph = GraphPlotter(None, lod=lod)
+    canvas = graph.figure_canvas
+
+    def plot() -> None:
+        for i, y_values in enumerate(series):
+            graph.plot(y_values=y_values, label=f"v{i}", x_values=x_values)
+        canvas.draw()
+
+    results = {"plot": measure(plot, 1), "redraw": measure(canvas.draw, repeat)}
+
+    x_max = float(x_values[-1])
+    widths = [x_max / 2**i for i in range(1, repeat + 1)]
+
+    def zoom() -> None:
+        width = widths.pop(0)
+        graph.set_x_range((x_max / 2 - width / 2, x_max / 2 + width / 2))
+        canvas.draw()
+
+    results["zoom"] = measure(zoom, repeat)
+
+    def reset() -> None:
+        graph.auto_scale_x_range()
+        canvas.draw()
+
+    results["reset"] = measure(reset, repeat)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--series", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    x_values = np.arange(args.rows) * 0.1
+    series = [np.cumsum(rng.normal(size=args.rows)).astype(np.float32) for _ in range(args.series)]
+
+    print(f"rows={args.rows:,} series={args.series}")
+    print(f"{'mode':<6} {'plot ms':>9} {'redraw ms':>10} {'zoom ms':>9} {'reset ms':>9}")
+    for lod in (False, True):
+        results = benchmark(lod, x_values, series, args.repeat)
+        print(
+            f"{'lod' if lod else 'raw':<6} {results['plot']:>9.1f} {results['redraw']:>10.1f} "
+            f"{results['zoom']:>9.1f} {results['reset']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""ラベルから重複する部分を取り除く処理 (utils.remove_duplicates) の速度を、以前の実装と比較する。
+
+    legacy: 以前の実装。全ての組み合わせに対して O(m^2) で共通部分文字列を探し、正規表現で取り除く
+    cold:   現在の実装 (suffix automaton) 。キャッシュが無い状態から計算する
+    warm:   現在の実装。同じラベルで2回目に呼んだ場合 (キャッシュを使う)
+    same:   取り除く部分文字列の集合が以前の実装と同じかどうか
+            NOTE: 以前の実装は集合の順番 (実行ごとに変わる) で正規表現を作っていたので、取り除いた結果は比較しない
+
+ラベルは、共通の接頭辞・接尾辞を持つファイル名を模して生成する。
+NOTE: 以前の実装は 1000 ラベルだと1分程度かかる。--legacy-max より多い場合は計測しない。
+
+Usage:
+    python -m benchmarks.remove_duplicates
+    python -m benchmarks.remove_duplicates --labels 10 100 1000 --legacy-max 100
+"""
+import argparse
+import itertools
+import random
+import re
+import time
+from typing import Callable
+
+from src.common import utils
+from src.common.substring import find_longest_common_substrings
+from src.common.constants import WORD_LENGTH_REMOVE_DUPLICATE
+
+
+def find_longest_duplicate_word(string1: str, string2: str) -> str:
+    """以前の実装。"""
+    answer = ""
+    length_1, length_2 = len(string1), len(string2)
+
+    for i in range(length_1):
+        match = ""
+        for j in range(length_2):
+            if i + j < length_1 and string1[i + j] == string2[j]:
+                match += string2[j]
+            else:
+                if len(match) > len(answer):
+                    answer = match
+                match = ""
+        if len(match) > len(answer):
+            answer = match
+    return answer
+
+
+def legacy_find_duplicate_words(*strings: str) -> set[str]:
+    """以前の実装の、取り除く部分文字列を探す処理。"""
+    longest_duplicate_words = set()
+    for pair in itertools.combinations(strings, 2):
+        longest_duplicate_word = find_longest_duplicate_word(*pair)
+        if len(longest_duplicate_word) > WORD_LENGTH_REMOVE_DUPLICATE:
+            longest_duplicate_words.add(longest_duplicate_word)
+    return longest_duplicate_words
+
+
+def legacy_remove_duplicates(*strings: str) -> list[str]:
+    """以前の実装。(正規表現は `(` と `)` だけをエスケープしていた)"""
+    longest_duplicate_words = list(legacy_find_duplicate_words(*strings))
+    if not longest_duplicate_words:
+        return list(strings)
+
+    regex = "|".join(longest_duplicate_words).translate(str.maketrans({"(": "\\(", ")": "\\)"}))
+    return [re.sub(regex, "", s) for s in strings]
+
+
+def generate_labels(number_of_labels: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    lines = ["lineA", "lineB", "lineC"]
+    conditions = ["room_temperature", "high_temperature", "low_humidity"]
+    return [
+        f"2023{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}_{rng.choice(lines)}_measurement_"
+        f"{rng.choice(conditions)}_{i:04d}.csv"
+        for i in range(number_of_labels)
+    ]
+
+
+def clear_caches() -> None:
+    utils._remove_duplicates.cache_clear()
+
+
+def measure(run: Callable[[], object]) -> float:
+    """ミリ秒を返す。"""
+    start = time.perf_counter()
+    run()
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--labels", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--legacy-max", type=int, default=1000, help="以前の実装を計測するラベルの数の上限")
+    args = parser.parse_args()
+
+    print(f"{'labels':>7} {'legacy[ms]':>12} {'cold[ms]':>10} {'warm[ms]':>10} {'speedup':>8} {'same':>5}")
+    for number_of_labels in args.labels:
+        labels = generate_labels(number_of_labels)
+
+        clear_caches()
+        cold = measure(lambda: utils.remove_duplicates(*labels))
+        warm = measure(lambda: utils.remove_duplicates(*labels))
+
+        if number_of_labels <= args.legacy_max:
+            legacy = measure(lambda: legacy_remove_duplicates(*labels))
+            legacy_text, speedup_text = f"{legacy:12.1f}", f"{legacy / cold:7.1f}x"
+            same = legacy_find_duplicate_words(*labels) == find_longest_common_substrings(labels, WORD_LENGTH_REMOVE_DUPLICATE)
+            same_text = f"{str(same):>5}"
+        else:
+            legacy_text, speedup_text, same_text = f"{'-':>12}", f"{'-':>8}", f"{'-':>5}"
+        print(f"{number_of_labels:7d} {legacy_text} {cold:10.1f} {warm:10.3f} {speedup_text} {same_text}")
+
+    print()
+    print("example:", utils.remove_duplicates(*generate_labels(3)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd
 
+from src.backend.cache import ColumnCache
+from src.common.constants import CSV_CACHE_DIR
+
 
 class CSVReader:
     """
@@ -9,19 +13,42 @@ class CSVReader:
         - [pandas.DataFrameの行・列を指定して削除するdrop | note.nkmk.me](https://note.nkmk.me/python-pandas-drop/)
     """
 
-    def __init__(
-        self,
-        filepath: str,
-    ) -> None:
+    def __init__(self, filepath: str, columnar: bool = False, cache_dir: str = CSV_CACHE_DIR) -> None:
         """インスタンスの初期化。
 
         Args:
             filepath (str): csvファイルのパス。
+            columnar (bool, optional): カラム単位で読み込むかどうか。デフォルトは `False` (全体を DataFrame として読み込む)。
+            NOTE: `True` の場合は初期化時にヘッダと型だけを読み込み、カラムの値は参照した時に読み込む。
+            読み込んだカラムは cache_dir に .npy として保存し、次回からはメモリマップで読み込む。
+            cache_dir (str, optional): columnar の場合のキャッシュの保存先。デフォルトは CSV_CACHE_DIR 。
         """
-        self.df: pd.DataFrame = pd.read_csv(
-            filepath,
-        )
-        self.columns = self.df.columns.values.tolist()
+        self.filepath = filepath
+        self.columnar = columnar
+        self._df: pd.DataFrame | None = None
+        # columnar の場合に読み込んだカラムの値
+        self._column_arrays: dict[str, np.ndarray] = {}
+
+        if columnar:
+            self._cache = ColumnCache(filepath, cache_dir)
+            self.columns: list[str] = list(self._cache.columns)
+        else:
+            self._df = pd.read_csv(
+                filepath,
+            )
+            self.columns = self._df.columns.values.tolist()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """csvファイル全体の DataFrame 。
+        NOTE: columnar の場合は参照した時に全てのカラムを読み込み、以降は columnar でない場合と同じように扱う。
+        """
+        if self._df is None:
+            self.load_columns(self.columns)
+            self._df = pd.DataFrame({column: self._column_arrays[column] for column in self.columns})
+            self._column_arrays = {}
+            self.columnar = False
+        return self._df
 
     def exists_column(self, column_name: str) -> bool:
         """カラムが存在するかどうか。
@@ -34,8 +61,41 @@ class CSVReader:
         """
         return column_name in self.columns
 
+    def load_columns(self, columns: list[str]) -> None:
+        """columnar の場合に、カラムをまとめて読み込んでおく。(csvファイルを読むのが1回で済む)
+
+        Args:
+            columns (list[str]): 対象のカラム。存在しないカラムは無視する。
+        """
+        if not self.columnar:
+            return
+        missing = [column for column in columns if column not in self._column_arrays and self.exists_column(column)]
+        if missing:
+            self._column_arrays.update(self._cache.load(missing))
+
+    def get_column_array(self, column: str) -> np.ndarray | None:
+        """特定のカラムが持つ値を配列として取得する。
+
+        NOTE: 可能な限りコピーせずに返す。(columnar の場合はキャッシュのメモリマップ、そうでない場合は DataFrame が持つ配列)
+        返り値は読み取り専用として扱い、書き換える場合はコピーすること。
+
+        Args:
+            column (str): 対象のカラム。
+
+        Returns:
+            np.ndarray | None: 特定のカラムが持つ値の配列。カラムが存在しない場合は None 。
+        """
+        if not self.exists_column(column):
+            return
+
+        if self.columnar:
+            self.load_columns([column])
+            return self._column_arrays[column]
+        return self.df[column].to_numpy()
+
     def get_column_values(self, column: str, includes_header: bool = False) -> list[int | float] | None:
         """特定のカラムが持つ値をリストとして取得する。
+        NOTE: 値を1つずつ Python のオブジェクトに変換するので、行数が多い場合は get_column_array を使うこと。
 
         Args:
             column (str): 対象のカラム。
@@ -47,7 +107,7 @@ class CSVReader:
         if not self.exists_column(column):
             return
 
-        column_values = self.df[column].tolist()
+        column_values = self.get_column_array(column).tolist()  # type: ignore : exists_column で None にならないことが確定するため
         if includes_header:
             # 返り値の先頭にヘッダを付与する
             column_values.insert(0, column)
@@ -61,9 +121,11 @@ class CSVReader:
             after (str): 変更後の名称。
         """
         self.df.rename(columns={before: after}, inplace=True)
+        self.columns = self.df.columns.values.tolist()
 
     def drop_column(self, labels: str | list[str]) -> None:
         self.df.drop(labels=labels, axis=1, inplace=True)
+        self.columns = self.df.columns.values.tolist()
 
     def drop_row_by_index(self, index: int | list[int]) -> None:
         self.df.drop(labels=index, axis=0, inplace=True)
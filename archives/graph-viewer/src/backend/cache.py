@@ -0,0 +1,170 @@
+"""CSVのカラムをバイナリ (.npy) としてキャッシュする。
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.common.constants import CSV_CACHE_DIR, CSV_SNIFF_ROWS, TIME_AXIS_HEADER_REGEX
+
+# キャッシュの形式を変えた場合に古いキャッシュを使わないようにするためのバージョン
+CACHE_VERSION = 1
+
+
+def sniff_dtypes(filepath: str, nrows: int = CSV_SNIFF_ROWS) -> dict[str, str]:
+    """先頭の数行だけを読み込み、カラムごとの型の種類を推測する。
+
+    Args:
+        filepath (str): csvファイルのパス。
+        nrows (int, optional): 推測に使う行数。デフォルトは CSV_SNIFF_ROWS 。
+
+    Returns:
+        dict[str, str]: カラム名をキー、型の種類 (`"integer"` / `"float"` / `"object"`) を値とする辞書。
+    """
+    sample = pd.read_csv(filepath, nrows=nrows)
+    dtypes = {}
+    for column in sample.columns:
+        kind = sample[column].dtype.kind
+        if kind in "iub":
+            dtypes[column] = "integer"
+        elif kind == "f":
+            dtypes[column] = "float"
+        else:
+            dtypes[column] = "object"
+    return dtypes
+
+
+def downcast(column: str, values: pd.Series) -> np.ndarray:
+    """カラムの値を、値を表現出来る範囲で小さい型の配列にする。
+
+    整数は値の範囲に収まる最小の整数型、小数は float32 にする。
+    NOTE: 時間軸のカラムは行数が多いと float32 では精度が足りない (隣り合う時刻が同じ値になる) ので float64 のままにする。
+
+    Args:
+        column (str): カラム名。
+        values (pd.Series): カラムの値。
+
+    Returns:
+        np.ndarray: 変換した配列。数値でないカラムは object の配列のまま返す。
+    """
+    kind = values.dtype.kind
+    if kind in "iu":
+        return pd.to_numeric(values, downcast="integer").to_numpy()
+    if kind == "b":
+        return values.to_numpy()
+    if kind == "f":
+        if TIME_AXIS_HEADER_REGEX.search(column):
+            return values.to_numpy(dtype=np.float64)
+        return values.to_numpy(dtype=np.float32)
+    return values.to_numpy()
+
+
+class ColumnCache:
+    """CSVファイルのカラムを1つずつ .npy ファイルとしてキャッシュする。
+
+    キャッシュは cache_dir/<csvファイルの絶対パスのハッシュ値>/ 以下に、
+    meta.json (元ファイルの更新日時・サイズ・カラム名・型の種類) と <カラムの番号>.npy を保存する。
+    元ファイルの更新日時かサイズが変わった場合はキャッシュを作り直す。
+    読み込んだ配列はメモリマップ (np.load の mmap_mode="r") なので、実際に参照した部分だけがメモリに載る。
+    """
+
+    def __init__(self, filepath: str, cache_dir: str = CSV_CACHE_DIR) -> None:
+        """インスタンスの初期化。キャッシュが無いか古い場合は、先頭の数行から型を推測してメタデータを作る。
+
+        Args:
+            filepath (str): csvファイルのパス。
+            cache_dir (str, optional): キャッシュを保存するディレクトリ。デフォルトは CSV_CACHE_DIR 。
+        """
+        self.filepath = os.path.abspath(filepath)
+        self.directory = os.path.join(cache_dir, hashlib.sha1(self.filepath.encode("utf-8")).hexdigest())
+        self._meta_path = os.path.join(self.directory, "meta.json")
+
+        meta = self._read_meta()
+        if meta is None:
+            meta = self._create_meta()
+        self.columns: list[str] = meta["columns"]
+        self.dtypes: dict[str, str] = meta["dtypes"]
+
+    def _source_stat(self) -> dict[str, int]:
+        stat = os.stat(self.filepath)
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    def _read_meta(self) -> dict | None:
+        try:
+            with open(self._meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != CACHE_VERSION or meta.get("source") != self._source_stat():
+            return None
+        return meta
+
+    def _create_meta(self) -> dict:
+        # 古いキャッシュが残っていれば削除する
+        if os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                os.remove(os.path.join(self.directory, filename))
+        os.makedirs(self.directory, exist_ok=True)
+
+        dtypes = sniff_dtypes(self.filepath)
+        meta = {
+            "version": CACHE_VERSION,
+            "path": self.filepath,
+            "source": self._source_stat(),
+            "columns": list(dtypes.keys()),
+            "dtypes": dtypes,
+        }
+        self._write_atomically(self._meta_path, lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8")))
+        return meta
+
+    def _column_path(self, column: str) -> str:
+        # NOTE: カラム名にはファイル名に使えない文字が含まれることがあるので、カラムの番号をファイル名にする
+        return os.path.join(self.directory, f"{self.columns.index(column)}.npy")
+
+    def _write_atomically(self, path: str, write) -> None:
+        # NOTE: 書き込み中に中断しても壊れたキャッシュを読まないように、一時ファイルに書いてから置き換える
+        # NOTE: 別のスレッドが同じファイルを書いている場合があるので、スレッドごとに一時ファイルを分ける
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    def is_cached(self, column: str) -> bool:
+        return os.path.exists(self._column_path(column))
+
+    def load(self, columns: list[str]) -> dict[str, np.ndarray]:
+        """カラムの値を読み込む。キャッシュが無いカラムはまとめてcsvから読み込み、キャッシュに保存する。
+
+        Args:
+            columns (list[str]): 対象のカラム。存在しないカラムは無視する。
+
+        Returns:
+            dict[str, np.ndarray]: カラム名をキー、値の配列を値とする辞書。
+        """
+        columns = [column for column in dict.fromkeys(columns) if column in self.columns]
+        missing = [column for column in columns if not self.is_cached(column)]
+
+        loaded: dict[str, np.ndarray] = {}
+        if missing:
+            # NOTE: 小数と推測したカラムは型を指定して読み込む (推測する処理を省く)
+            # 数値でない値が混ざっていた場合は、型を指定せずに読み込み直す
+            dtype = {column: np.float64 for column in missing if self.dtypes[column] == "float"}
+            try:
+                df = pd.read_csv(self.filepath, usecols=missing, dtype=dtype)  # type: ignore
+            except ValueError:
+                df = pd.read_csv(self.filepath, usecols=missing)
+            for column in missing:
+                values = downcast(column, df[column])
+                # 数値でないカラムは pickle が必要になるのでキャッシュしない
+                if values.dtype.kind == "O":
+                    loaded[column] = values
+                    continue
+                self._write_atomically(self._column_path(column), lambda f: np.save(f, values))
+
+        for column in columns:
+            if column not in loaded:
+                loaded[column] = np.load(self._column_path(column), mmap_mode="r")
+        return loaded
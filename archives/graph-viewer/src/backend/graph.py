@@ -2,14 +2,23 @@
 """
 import tkinter
 from dataclasses import dataclass
+from typing import Hashable
 
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 
+from src.backend.lod import DecimatedSeries, is_monotonic
 from src.common.constants import (
     PLOT_BASELINE_STYLE,
     PLOT_FIGURE_BG_COLOR,
+    PLOT_LOD_MIN_POINTS,
     PLOT_PARAM_FONT,
     PLOT_PARAM_X_MARGIN,
     PLOT_PARAM_Y_MARGIN,
@@ -27,8 +36,15 @@ def draw_figure_to_canvas(canvas_component, figure) -> FigureCanvasTkAgg:
 
 @dataclass
 class Metadata:
-    data: list
+    data: np.ndarray
     label: str
+    header: str = ""
+    filepath: str = ""
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """プロットを識別するキー (ヘッダ, csvファイルのパス) 。"""
+        return (self.header, self.filepath)
 
 
 class GraphPlotter:
@@ -39,7 +55,17 @@ class GraphPlotter:
         - プロットの余白をグローバルに設定 : https://stackoverflow.com/questions/42668433/matplotlib-globally-set-margins
     """
 
-    def __init__(self, canvas_component: tkinter.Canvas, figure_size: tuple[int, int] = (10, 8)) -> None:
+    def __init__(
+        self, canvas_component: tkinter.Canvas | None, figure_size: tuple[int, int] = (10, 8), lod: bool = True
+    ) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            canvas_component (tkinter.Canvas | None): 描画先の canvas 。
+            NOTE: None の場合は画面に表示せずに描画する。(計測用)
+            figure_size (tuple[int, int], optional): グラフの大きさ(インチ)。デフォルトは (10, 8) 。
+            lod (bool, optional): 点の数が多い系列を間引いてプロットするかどうか。デフォルトは True 。
+        """
         plt.rcParams["font.family"] = PLOT_PARAM_FONT
         plt.rcParams["axes.xmargin"] = PLOT_PARAM_X_MARGIN
         plt.rcParams["axes.ymargin"] = PLOT_PARAM_Y_MARGIN
@@ -47,27 +73,140 @@ class GraphPlotter:
         self.fig, self.axes = plt.subplots(figsize=figure_size)
         self.fig.set_facecolor(PLOT_FIGURE_BG_COLOR)
         self.fig.subplots_adjust(**PLOT_SUBPLOT_POSITION)
-        self.figure_canvas = draw_figure_to_canvas(canvas_component, self.fig)
+        if canvas_component is None:
+            self.figure_canvas: FigureCanvasAgg = FigureCanvasAgg(self.fig)
+        else:
+            self.figure_canvas = draw_figure_to_canvas(canvas_component, self.fig)
+        # plot() で key を指定して描画した線
+        self.lines: dict[Hashable, Line2D] = {}
+        self.lod = lod
+        # 間引いてプロットした線と、間引く前の系列
+        self.decimated: dict[Line2D, DecimatedSeries] = {}
+        # set_baseline() で描画した水平線
+        self.baselines: dict[str, LineCollection] = {}
+        # 水平線・凡例を除いて描画した画像 (refresh_overlay() で使う)
+        self._background = None
+        self._connect_axes_callbacks()
+        self.figure_canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _connect_axes_callbacks(self) -> None:
+        # NOTE: axes.cla() でコールバックも消えるので、クリアする度に登録し直す
+        self.axes.callbacks.connect("xlim_changed", self._on_xlim_changed)
 
     def clear(self) -> None:
         """グラフをクリアする。"""
         self.axes.cla()
+        self.lines = {}
+        self.decimated = {}
+        self.baselines = {}
+        self._background = None
+        self._connect_axes_callbacks()
         self.figure_canvas.draw()
 
-    def plot(self, y_values: list, label: str, x_values: list | None = None) -> None:
+    def _overlay_artists(self) -> list[Artist]:
+        """グラフ全体を描画せずに更新する (animated にした) 水平線と凡例。"""
+        artists: list[Artist] = [baseline for baseline in self.baselines.values() if baseline.get_visible()]
+        if (legend := self.axes.get_legend()) is not None:
+            artists.append(legend)
+        return artists
+
+    def _on_draw(self, event) -> None:
+        """グラフ全体を描画した後に、水平線と凡例を除いた画像を保存してから水平線と凡例を重ねる。"""
+        self._background = self.figure_canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_overlay()
+
+    def _draw_overlay(self) -> None:
+        for artist in self._overlay_artists():
+            self.fig.draw_artist(artist)
+        self.figure_canvas.blit(self.fig.bbox)
+
+    def refresh_overlay(self) -> None:
+        """水平線と凡例だけを更新する。
+
+        NOTE: グラフ全体は描画せず、保存しておいた画像に水平線と凡例を重ねて差し替える。(blitting)
+        線の追加/削除やレンジの変更はグラフ全体が変わるので commit_change() を使うこと。
+        """
+        if self._background is None:
+            self.commit_change()
+            return
+        self.figure_canvas.restore_region(self._background)
+        self._draw_overlay()
+
+    def _number_of_buckets(self) -> int:
+        # 描画領域の横幅のピクセル数まで間引く
+        return max(int(self.axes.bbox.width), 1)
+
+    def _on_xlim_changed(self, axes: Axes) -> None:
+        """X軸のレンジが変わった場合に、間引いた線を表示範囲の点で間引き直す。"""
+        self._update_lod_views(*axes.get_xlim())
+
+    def _update_lod_views(self, x_min: float, x_max: float) -> None:
+        number_of_buckets = self._number_of_buckets()
+        for line, series in self.decimated.items():
+            line.set_data(*series.view(x_min, x_max, number_of_buckets))
+
+    def plot(
+        self, y_values: np.ndarray, label: str, x_values: np.ndarray | None = None, key: Hashable | None = None
+    ) -> None:
         """グラフにデータをプロットする。
 
         Args:
-            data (any): axes.plot が受け付けるデータ。
+            y_values (np.ndarray): Y軸の値。
+            label (str): 凡例に表示する名前。
+            x_values (np.ndarray | None, optional): X軸の値。デフォルトは None (Y軸の値の番号を使う)。
+            NOTE: 配列の真偽値は判定出来ないので None かどうかで判定する。
+            key (Hashable | None, optional): 後から remove_line() などで線を指定するためのキー。デフォルトは None 。
         """
-        if x_values:
-            self.axes.plot(x_values, y_values, label=label)
+        series = None
+        # NOTE: 点の数が多い系列は間引いてプロットし、X軸のレンジが変わる度に表示範囲だけを間引き直す
+        if self.lod and len(y_values) >= PLOT_LOD_MIN_POINTS and (x_values is None or is_monotonic(x_values)):
+            series = DecimatedSeries(y_values, x_values)
+            x_values, y_values = series.view(*series.x_range, self._number_of_buckets())
+
+        if key is not None and key in self.lines:
+            # NOTE: 同じキーの線があれば、新しく作らずに値とラベルだけを差し替える (色も変わらない)
+            line = self.lines[key]
+            self.decimated.pop(line, None)
+            line.set_data(x_values if x_values is not None else np.arange(len(y_values)), y_values)
+            line.set_label(label)
+        elif x_values is not None:
+            (line,) = self.axes.plot(x_values, y_values, label=label)
         else:
-            self.axes.plot(y_values, label=label)
+            (line,) = self.axes.plot(y_values, label=label)
+        if series is not None:
+            self.decimated[line] = series
+        if key is not None:
+            self.lines[key] = line
 
         self.fig.subplots_adjust(**PLOT_SUBPLOT_POSITION)
 
-        self.axes.legend(bbox_to_anchor=(1.00, 1), borderaxespad=0)
+        self.update_legend()
+
+    def remove_line(self, key: Hashable) -> None:
+        """plot() で key を指定して描画した線を削除する。"""
+        line = self.lines.pop(key, None)
+        if line is not None:
+            self.decimated.pop(line, None)
+            line.remove()
+
+    def retain_lines(self, keys: list[Hashable]) -> None:
+        """keys 以外のキーで描画した線を削除する。"""
+        for key in [key for key in self.lines if key not in keys]:
+            self.remove_line(key)
+
+    def set_line_label(self, key: Hashable, label: str) -> None:
+        """plot() で key を指定して描画した線の凡例のラベルを変更する。(update_legend() で反映する)"""
+        if key in self.lines:
+            self.lines[key].set_label(label)
+
+    def update_legend(self) -> None:
+        """凡例を描画されている線に合わせる。"""
+        if self.axes.get_lines():
+            legend = self.axes.legend(bbox_to_anchor=(1.00, 1), borderaxespad=0)
+            # NOTE: 凡例だけを更新する場合に refresh_overlay() で重ねられるように、グラフ全体の描画からは除く
+            legend.set_animated(True)
+        elif (legend := self.axes.get_legend()) is not None:
+            legend.remove()
 
     def set_x_range(self, x_range: tuple[float, float]) -> None:
         self.axes.set_xlim([*x_range])  # type: ignore
@@ -75,23 +214,53 @@ class GraphPlotter:
     def set_y_range(self, y_range: tuple[float, float]) -> None:
         self.axes.set_ylim([*y_range])  # type: ignore
 
-    def auto_scale_x_range(self) -> None:
+    def _relim(self) -> None:
+        # NOTE: 間引いた線は表示範囲の点しか持たないので、全体の点で間引き直してからデータの範囲を計算する
+        for line, series in self.decimated.items():
+            line.set_data(*series.view(*series.x_range, self._number_of_buckets()))
         self.axes.relim()
+
+    def auto_scale_x_range(self) -> None:
+        self._relim()
         self.axes.autoscale(axis="x")
 
     def auto_scale_y_range(self) -> None:
-        self.axes.relim()
+        self._relim()
         self.axes.autoscale(axis="y")
+        # X軸のレンジは変わらないので、表示範囲の点で間引き直す
+        self._update_lod_views(*self.axes.get_xlim())
 
-    def plot_hline(
+    def set_baseline(
         self,
-        h_value: int | float,
+        name: str,
+        h_value: int | float | None,
         color: str = "blue",
         linestyle: str = PLOT_BASELINE_STYLE,
     ) -> None:
-        x_min, x_max = self.axes.get_xlim()
-        self.axes.hlines([h_value], x_min, x_max, color, linestyles=linestyle)
-        self.has_hline = True
+        """水平線 (規格線) を描画する。同じ name の水平線は作り直さずに位置だけを変える。
+
+        NOTE: 水平線は X軸 の端から端まで引くので、X軸のレンジが変わっても描き直す必要は無い。
+        データの範囲 (relim) と凡例には含めない。refresh_overlay() か commit_change() で反映する。
+
+        Args:
+            name (str): 水平線の名前。
+            h_value (int | float | None): Y座標。None の場合は非表示にする。
+            color (str, optional): 色。デフォルトは "blue" 。
+            linestyle (str, optional): 線の種類。デフォルトは PLOT_BASELINE_STYLE 。
+        """
+        baseline = self.baselines.get(name)
+        if baseline is None:
+            # X座標 は軸に対する割合 (0 ~ 1) 、Y座標 はデータの値として扱う
+            # NOTE: Line2D にすると axes.get_lines() と relim() の対象になるので、hlines() と同じ LineCollection にする
+            baseline = LineCollection(
+                [[(0, 0), (1, 0)]], transform=self.axes.get_yaxis_transform(), linestyles=linestyle, animated=True
+            )
+            self.axes.add_collection(baseline, autolim=False)
+            self.baselines[name] = baseline
+        if h_value is not None:
+            baseline.set_segments([[(0, h_value), (1, h_value)]])
+        baseline.set_color(color)
+        baseline.set_visible(h_value is not None)
 
     def auto_set_y_tick(self, tick_interval: int = 20):
         min, max = self.axes.get_ylim()
@@ -99,5 +268,7 @@ class GraphPlotter:
         self.axes.yaxis.set_major_locator(ticker.MultipleLocator(spacing))
 
     def commit_change(self) -> None:
-        """グラフにプロットした結果を反映させる。"""
-        self.figure_canvas.draw()
+        """グラフにプロットした結果を反映させる。
+        NOTE: すぐには描画せず、イベントループが空いた時に1回だけ描画する。(続けて呼んでも描画は1回になる)
+        """
+        self.figure_canvas.draw_idle()
@@ -0,0 +1,136 @@
+"""複数のcsvファイルのヘッダをまとめて引けるようにする索引。
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.backend._csv import CSVReader
+from src.common import types
+from src.common.constants import TIME_AXIS_HEADER_REGEX
+
+
+@dataclass(frozen=True)
+class ColumnHandle:
+    """csvファイル1つのカラム1つを指す。値は values を参照した時に読み込む。"""
+
+    filepath: str
+    header: str
+    reader: CSVReader
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.reader.get_column_array(self.header)  # type: ignore : 索引に登録したカラムは存在する
+
+
+class HeaderIndex:
+    """ヘッダをキー、{csvファイルのパス: ColumnHandle} を値とする索引。
+
+    csvファイルを追加した時に1回だけヘッダを走査し、以降はヘッダの一覧・時間軸のカラムを走査せずに返す。
+    NOTE: CSVReader.rename_column などでカラムを変更した場合は、そのファイルを remove() してから add() し直すこと。
+    """
+
+    def __init__(self) -> None:
+        # csvファイルのパスをキー、ヘッダの配列を値とする辞書 (追加した順)
+        self._headers_by_filepath: dict[str, list[str]] = {}
+        self._columns: dict[str, dict[str, ColumnHandle]] = {}
+        # csvファイルごとの時間軸のヘッダ (時間軸が無い場合は None)
+        self._time_axis_headers: dict[str, str | None] = {}
+        # ファイルを追加/削除するまで使い回す値
+        self._headers_cache: dict[types.HeaderMode, list[str]] = {}
+        self._time_axis_values: np.ndarray | None = None
+
+    def __contains__(self, filepath: str) -> bool:
+        return filepath in self._headers_by_filepath
+
+    @property
+    def filepaths(self) -> list[str]:
+        return list(self._headers_by_filepath.keys())
+
+    def add(self, filepath: str, reader: CSVReader) -> None:
+        """csvファイルを索引に追加する。既に追加されている場合は何もしない。"""
+        if filepath in self:
+            return
+        self._headers_by_filepath[filepath] = list(reader.columns)
+        for header in reader.columns:
+            self._columns.setdefault(header, {})[filepath] = ColumnHandle(filepath, header, reader)
+        # NOTE: 時間軸は最初に見つかったヘッダを使う
+        self._time_axis_headers[filepath] = next(
+            (header for header in reader.columns if TIME_AXIS_HEADER_REGEX.search(header)), None
+        )
+        self._invalidate()
+
+    def remove(self, filepath: str) -> None:
+        """csvファイルを索引から削除する。"""
+        headers = self._headers_by_filepath.pop(filepath, None)
+        if headers is None:
+            return
+        for header in headers:
+            handles = self._columns[header]
+            del handles[filepath]
+            if not handles:
+                del self._columns[header]
+        del self._time_axis_headers[filepath]
+        self._invalidate()
+
+    def sync(self, csv_readers: dict[str, CSVReader]) -> None:
+        """csv_readers と同じファイルを同じ順番で持つようにする。追加されたファイルのヘッダだけを走査する。"""
+        for filepath in [filepath for filepath in self._headers_by_filepath if filepath not in csv_readers]:
+            self.remove(filepath)
+        for filepath, reader in csv_readers.items():
+            self.add(filepath, reader)
+        if list(self._headers_by_filepath.keys()) != list(csv_readers.keys()):
+            self._headers_by_filepath = {filepath: self._headers_by_filepath[filepath] for filepath in csv_readers}
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._headers_cache = {}
+        self._time_axis_values = None
+
+    def headers(self, mode: types.HeaderMode = "union") -> list[str]:
+        """全てのcsvファイルのヘッダを返す。
+
+        Args:
+            mode (types.HeaderMode, optional): `"union"` はどれかのファイルにあるヘッダ、
+            `"intersection"` は全てのファイルにあるヘッダ。デフォルトは `"union"` 。
+
+        Returns:
+            list[str]: ヘッダの配列。先に追加したファイルのヘッダの順に並べる。
+        """
+        if mode not in self._headers_cache:
+            number_of_files = len(self._headers_by_filepath)
+            # NOTE: dict のキーの順 (最初に登録したファイルのヘッダの順) で並べる
+            headers = list(dict.fromkeys(h for headers in self._headers_by_filepath.values() for h in headers))
+            if mode == "intersection":
+                headers = [header for header in headers if len(self._columns[header]) == number_of_files]
+            self._headers_cache[mode] = headers
+        return list(self._headers_cache[mode])
+
+    def has(self, header: str, filepath: str) -> bool:
+        return filepath in self._columns.get(header, {})
+
+    def columns(self, header: str) -> dict[str, ColumnHandle]:
+        """ヘッダを持つcsvファイルのパスをキー、ColumnHandle を値とする辞書を返す。"""
+        return dict(self._columns.get(header, {}))
+
+    def column(self, header: str, filepath: str) -> ColumnHandle | None:
+        return self._columns.get(header, {}).get(filepath)
+
+    @property
+    def time_axis_column(self) -> ColumnHandle | None:
+        """時間軸のカラム。先頭のcsvファイルの時間軸を使う。(先頭のファイルに時間軸が無い場合は None)"""
+        if not self._headers_by_filepath:
+            return None
+        filepath = next(iter(self._headers_by_filepath))
+        header = self._time_axis_headers[filepath]
+        if header is None:
+            return None
+        return self._columns[header][filepath]
+
+    @property
+    def time_axis_values(self) -> np.ndarray | None:
+        """時間軸の値。ファイルを追加/削除するまで同じ配列を返す。"""
+        if self._time_axis_values is None:
+            column = self.time_axis_column
+            if column is not None:
+                self._time_axis_values = column.values
+        return self._time_axis_values
@@ -0,0 +1,153 @@
+"""csvファイルをバックグラウンドのスレッドで読み込む。
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+from src.backend._csv import CSVReader
+from src.common.constants import CSV_LOAD_COLUMNAR, CSV_LOAD_MAX_WORKERS, TIME_AXIS_HEADER_REGEX
+
+
+@dataclass
+class LoadResult:
+    """csvファイル1つ分の読み込み結果。"""
+
+    filepath: str
+    reader: CSVReader | None = None
+    error: Exception | None = None
+    # 読み込み中にキャンセルされた場合は True 。reader は使わずに捨てること
+    cancelled: bool = False
+    # 読み込みにかかった秒数 (待機していた時間は含まない)
+    elapsed: float = 0.0
+
+
+@dataclass
+class _Job:
+    filepath: str
+    columns: list[str]
+    future: Future | None = None
+    cancelled: bool = False
+
+
+class CSVLoader:
+    """csvファイルをスレッドプールで並列に読み込み、終わったものから notify で通知する。
+
+    NOTE: pandas の csv の読み込みは大部分で GIL を解放するので、プロセスではなくスレッドで並列に読み込む。
+    (プロセスにすると CSVReader が持つメモリマップを渡す時にコピーが必要になる)
+    notify は読み込んだスレッドから呼ばれるので、UI の更新はイベントループのスレッドに渡してから行うこと。
+    (PySimpleGUI では window.write_event_value を使う)
+    """
+
+    def __init__(
+        self,
+        notify: Callable[[LoadResult], None],
+        max_workers: int = CSV_LOAD_MAX_WORKERS,
+        columnar: bool = CSV_LOAD_COLUMNAR,
+    ) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            notify (Callable[[LoadResult], None]): 読み込みが終わる度に呼ぶ関数。
+            max_workers (int, optional): 同時に読み込むファイルの数。デフォルトは CSV_LOAD_MAX_WORKERS 。
+            columnar (bool, optional): CSVReader をカラム単位で読み込むかどうか。デフォルトは CSV_LOAD_COLUMNAR 。
+        """
+        self.notify = notify
+        self.columnar = columnar
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="csv-loader")
+        self._jobs: dict[str, _Job] = {}
+        self._lock = threading.Lock()
+        # 進捗の表示に使う、読み込み中のファイルが無くなるまでに依頼された/終わったファイルの数
+        self._number_of_submitted = 0
+        self._number_of_finished = 0
+
+    @property
+    def pending_filepaths(self) -> list[str]:
+        """読み込み中 (待機中を含む) のファイルのパス。"""
+        with self._lock:
+            return list(self._jobs.keys())
+
+    @property
+    def progress(self) -> tuple[int, int]:
+        """(終わったファイルの数, 依頼されたファイルの数) 。読み込み中のファイルが無くなると (0, 0) に戻る。"""
+        with self._lock:
+            return self._number_of_finished, self._number_of_submitted
+
+    def is_pending(self, filepath: str) -> bool:
+        with self._lock:
+            return filepath in self._jobs
+
+    def submit(self, filepath: str, columns: list[str] | None = None) -> bool:
+        """csvファイルの読み込みを依頼する。
+
+        Args:
+            filepath (str): csvファイルのパス。
+            columns (list[str] | None, optional): 一緒に読み込んでおくカラム。デフォルトは None 。
+            NOTE: 選択済みのヘッダを渡すと、読み込んだ後にUIのスレッドでカラムを読み込まずに済む。
+            時間軸のカラムは指定しなくても読み込む。
+
+        Returns:
+            bool: 依頼したかどうか。既に読み込み中の場合は `False` 。
+        """
+        with self._lock:
+            if filepath in self._jobs:
+                return False
+            if not self._jobs:
+                self._number_of_submitted = self._number_of_finished = 0
+            job = _Job(filepath, list(columns or []))
+            self._jobs[filepath] = job
+            self._number_of_submitted += 1
+            job.future = self._executor.submit(self._run, job)
+        return True
+
+    def cancel(self, filepaths: list[str] | None = None) -> list[str]:
+        """読み込みをキャンセルする。
+
+        NOTE: 読み込み中の pandas.read_csv は中断出来ないので、終わるまで待ってから結果を cancelled として通知する。
+        まだ始まっていないものは読み込まず、通知もしない。
+
+        Args:
+            filepaths (list[str] | None, optional): 対象のファイルのパス。デフォルトは None (全て)。
+
+        Returns:
+            list[str]: キャンセルしたファイルのパス。
+        """
+        cancelled = []
+        with self._lock:
+            for filepath in list(self._jobs.keys()) if filepaths is None else filepaths:
+                job = self._jobs.pop(filepath, None)
+                if job is None:
+                    continue
+                job.cancelled = True
+                job.future.cancel()  # type: ignore : submit() で必ず設定される
+                self._number_of_finished += 1
+                cancelled.append(filepath)
+        return cancelled
+
+    def shutdown(self) -> None:
+        """全ての読み込みをキャンセルし、スレッドを終了させる。(読み込み中のものは待たない)"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: _Job) -> None:
+        result = LoadResult(job.filepath)
+        started_at = time.perf_counter()
+        try:
+            reader = CSVReader(job.filepath, columnar=self.columnar)
+            time_axis_columns = [column for column in reader.columns if TIME_AXIS_HEADER_REGEX.search(column)]
+            # NOTE: 時間軸は最初に見つかったカラムを使う (DataStore を参照)
+            reader.load_columns([*job.columns, *time_axis_columns[:1]])
+            result.reader = reader
+        except Exception as e:
+            result.error = e
+        result.elapsed = time.perf_counter() - started_at
+
+        with self._lock:
+            if job.cancelled:
+                result.cancelled = True
+                result.reader = None
+            else:
+                del self._jobs[job.filepath]
+                self._number_of_finished += 1
+        self.notify(result)
@@ -0,0 +1,146 @@
+"""プロットする点を画面の解像度まで間引く (level of detail)。
+"""
+import numpy as np
+
+from src.common.constants import PLOT_LOD_BASE_BUCKET, PLOT_LOD_FACTOR
+
+
+def is_monotonic(values: np.ndarray) -> bool:
+    """値が単調増加 (同じ値が続くのは可) かどうか。NaN を含む場合は False 。"""
+    return bool(np.all(values[1:] >= values[:-1]))
+
+
+def _reduce_min_max(
+    values: np.ndarray, min_indices: np.ndarray, max_indices: np.ndarray, factor: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """factor 個ずつのバケットをまとめ、まとめたバケットの中で最小/最大の値を持つ点の番号を返す。"""
+    pad = (-len(min_indices)) % factor
+    if pad:
+        # NOTE: 最後のバケットは足りない分を最後の点で埋める (最小/最大は変わらない)
+        min_indices = np.concatenate([min_indices, np.repeat(min_indices[-1:], pad)])
+        max_indices = np.concatenate([max_indices, np.repeat(max_indices[-1:], pad)])
+    min_indices = min_indices.reshape(-1, factor)
+    max_indices = max_indices.reshape(-1, factor)
+    rows = np.arange(len(min_indices))
+    return (
+        min_indices[rows, np.argmin(values[min_indices], axis=1)],
+        max_indices[rows, np.argmax(values[max_indices], axis=1)],
+    )
+
+
+def min_max_indices(values: np.ndarray, bucket_size: int, offset: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """bucket_size 個ずつのバケットごとに、最小/最大の値を持つ点の番号を返す。
+
+    Args:
+        values (np.ndarray): 対象の値。
+        bucket_size (int): 1つのバケットに含める点の数。
+        offset (int, optional): 返す番号に足す値。デフォルトは 0 。
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (最小の点の番号, 最大の点の番号) 。
+    """
+    # NOTE: 点の番号の配列は作らず、バケットの先頭の番号にバケット内の位置を足して求める
+    number_of_full_buckets = len(values) // bucket_size
+    body = values[: number_of_full_buckets * bucket_size].reshape(-1, bucket_size)
+    starts = np.arange(number_of_full_buckets, dtype=np.int64) * bucket_size + offset
+    min_indices = starts + np.argmin(body, axis=1)
+    max_indices = starts + np.argmax(body, axis=1)
+
+    # 最後の足りないバケット
+    tail = values[number_of_full_buckets * bucket_size :]
+    if len(tail):
+        tail_start = offset + number_of_full_buckets * bucket_size
+        min_indices = np.append(min_indices, tail_start + np.argmin(tail))
+        max_indices = np.append(max_indices, tail_start + np.argmax(tail))
+    return min_indices, max_indices
+
+
+class DecimatedSeries:
+    """min/max 法で間引いた点のピラミッドを持つ系列。
+
+    バケットごとに最小と最大の点を残すので、間引いても山や谷 (スパイク) は消えない。
+    レベル0 は PLOT_LOD_BASE_BUCKET 点ごと、以降は PLOT_LOD_FACTOR 倍ずつ粗くしたバケットの最小/最大の点の番号を持つ。
+    view() では表示範囲の点の数に合わせてレベルを選ぶので、拡大/縮小しても間引く処理は表示する点の数に比例する時間で終わる。
+
+    NOTE: X軸の値は単調増加である必要がある。(時間軸、または None の場合の点の番号)
+    """
+
+    def __init__(self, y_values: np.ndarray, x_values: np.ndarray | None = None) -> None:
+        """インスタンスの初期化。ピラミッドを作る。
+
+        Args:
+            y_values (np.ndarray): Y軸の値。
+            x_values (np.ndarray | None, optional): X軸の値。デフォルトは None (点の番号を使う)。
+        """
+        self.y_values = y_values
+        self.x_values = x_values
+        self.levels: list[tuple[int, np.ndarray, np.ndarray]] = []
+
+        bucket_size = PLOT_LOD_BASE_BUCKET
+        min_indices, max_indices = min_max_indices(y_values, bucket_size)
+        while True:
+            self.levels.append((bucket_size, min_indices, max_indices))
+            if len(min_indices) <= PLOT_LOD_FACTOR:
+                break
+            min_indices, max_indices = _reduce_min_max(y_values, min_indices, max_indices, PLOT_LOD_FACTOR)
+            bucket_size *= PLOT_LOD_FACTOR
+
+    def __len__(self) -> int:
+        return len(self.y_values)
+
+    @property
+    def x_range(self) -> tuple[float, float]:
+        if self.x_values is None:
+            return 0.0, float(len(self) - 1)
+        return float(self.x_values[0]), float(self.x_values[-1])
+
+    def _index_range(self, x_min: float, x_max: float) -> tuple[int, int]:
+        # NOTE: 線が表示範囲の端で途切れないように、範囲の外側の点を1つずつ含める
+        if self.x_values is None:
+            start, stop = int(np.floor(x_min)), int(np.ceil(x_max)) + 1
+        else:
+            start = int(np.searchsorted(self.x_values, x_min, side="left")) - 1
+            stop = int(np.searchsorted(self.x_values, x_max, side="right")) + 1
+        return max(start, 0), min(stop, len(self))
+
+    def view(self, x_min: float, x_max: float, number_of_buckets: int) -> tuple[np.ndarray, np.ndarray]:
+        """表示範囲の点を、number_of_buckets 個程度のバケットに間引いて返す。
+
+        Args:
+            x_min (float): 表示範囲の最小値。
+            x_max (float): 表示範囲の最大値。
+            number_of_buckets (int): バケットの数。(通常は描画領域の横幅のピクセル数)
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (X軸の値, Y軸の値) 。点の数はおよそ number_of_buckets * 2 以下になる。
+        """
+        start, stop = self._index_range(x_min, x_max)
+        number_of_points = stop - start
+        number_of_buckets = max(number_of_buckets, 1)
+
+        if number_of_points <= number_of_buckets * 2:
+            # 間引く必要が無い
+            indices = np.arange(start, stop)
+        elif number_of_points <= number_of_buckets * PLOT_LOD_BASE_BUCKET:
+            # 範囲が狭い場合は、ピラミッドを使わずに範囲の点から直接求める
+            bucket_size = -(-number_of_points // number_of_buckets)
+            min_indices, max_indices = min_max_indices(self.y_values[start:stop], bucket_size, offset=start)
+            indices = self._merge(start, stop, min_indices, max_indices)
+        else:
+            # バケットの数が number_of_buckets 以下になる最も細かいレベルを使う
+            for bucket_size, min_indices, max_indices in self.levels:
+                if number_of_points // bucket_size <= number_of_buckets:
+                    break
+            first, last = start // bucket_size, -(-stop // bucket_size)
+            indices = self._merge(start, stop, min_indices[first:last], max_indices[first:last])
+
+        x_values = indices if self.x_values is None else self.x_values[indices]
+        return x_values, self.y_values[indices]
+
+    def _merge(self, start: int, stop: int, min_indices: np.ndarray, max_indices: np.ndarray) -> np.ndarray:
+        # バケットごとに最小/最大の点を元の順番で並べ、範囲の両端の点を加える
+        pairs = np.stack([np.minimum(min_indices, max_indices), np.maximum(min_indices, max_indices)], axis=1)
+        indices = np.concatenate([[start], pairs.ravel(), [stop - 1]])
+        indices = indices[(indices >= start) & (indices < stop)]
+        # NOTE: 最小と最大が同じ点のバケットでは同じ番号が続くので除く
+        return indices[np.concatenate([[True], np.diff(indices) != 0])]
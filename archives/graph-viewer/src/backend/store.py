@@ -1,16 +1,61 @@
 """TODO docs の記述
 """
+from dataclasses import dataclass, field
+
+import numpy as np
+
 from src.backend._csv import CSVReader
 from src.backend.graph import Metadata
-from src.common import utils
-from src.common.constants import TIME_AXIS_HEADER_REGEX
+from src.backend.header_index import HeaderIndex
+from src.common import types, utils
+from src.common.constants import CSV_HEADER_MODE, CSV_LOAD_COLUMNAR
+
+
+PlotKey = tuple[str, str]
+
+
+@dataclass
+class PlotChanges:
+    """前回 pop_changes() を呼んでから plots に加えた変更。グラフを差分だけ描き直すために使う。"""
+
+    added: list[Metadata] = field(default_factory=list)
+    removed: list[PlotKey] = field(default_factory=list)
+    relabeled: list[Metadata] = field(default_factory=list)
+    # 時間軸 (X軸の値) が変わった場合は全てのプロットを描き直す必要がある
+    time_axis_changed: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.relabeled or self.time_axis_changed)
 
 
 class DataStore:
-    def __init__(self) -> None:
-        self.plots: list[Metadata] = []
+    def __init__(self, header_mode: types.HeaderMode = CSV_HEADER_MODE) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            header_mode (types.HeaderMode, optional): ヘッダの一覧に含めるヘッダ。デフォルトは CSV_HEADER_MODE 。
+            `"union"` はどれかのcsvファイルにあるヘッダ、`"intersection"` は全てのcsvファイルにあるヘッダ。
+            NOTE: どちらの場合も、ヘッダが無いcsvファイルはそのヘッダをプロットしない。
+        """
+        self._plots: dict[PlotKey, Metadata] = {}
         self.csv_readers: dict[str, CSVReader] = {}
+        self.header_mode = header_mode
+        # csv_readers と同じファイルを持つ索引 (_sync_plots で同期する)
+        self.header_index = HeaderIndex()
         self.selected_headers: list[str] = []
+        self._changes = PlotChanges()
+        self._time_axis_key: PlotKey | None = None
+
+    @property
+    def plots(self) -> list[Metadata]:
+        """プロットするデータ。選択されたヘッダの順、同じヘッダの中ではcsvファイルの順に並べる。"""
+        return [
+            self._plots[(header, filepath)]
+            for header in self.selected_headers
+            for filepath in self.csv_readers.keys()
+            if (header, filepath) in self._plots
+        ]
 
     @property
     def number_of_headers(self) -> int:
@@ -22,65 +67,109 @@ class DataStore:
 
     @property
     def headers_of_csv_reader(self) -> list[str]:
-        # NOTE csv ヘッダは一意である前提なので、csv_readersから1つだけ使う
-        reader = self._get_csv_reader_by_index(0)
-        if reader:
-            return reader.columns
-        return []
+        """全てのcsvファイルのヘッダ。header_mode に従って和集合か積集合にする。"""
+        self.header_index.sync(self.csv_readers)
+        return self.header_index.headers(self.header_mode)
 
     @property
-    def values_of_csv_time_axis(self) -> list[int | float]:
-        # csv が読み込まれていない or ヘッダが選択されていない
-        if not self.headers_of_csv_reader or not self.selected_headers:
-            return []
-
-        # ヘッダーの中に `time` という文字列が含まれれば次に進む
-        # NOTE : 大文字/小文字を区別しないように正規表現を使用
-        for header in self.headers_of_csv_reader:
-            try:
-                TIME_AXIS_HEADER_REGEX.findall(header)[0]
-                time_axis_name = header
-                break
-            except IndexError:
-                pass
-        else:
-            return []
-
-        return self._get_csv_reader_by_index(0).get_column_values(time_axis_name)  # type: ignore : self.csv_headers で None にならないことが確定するため
+    def values_of_csv_time_axis(self) -> np.ndarray | None:
+        # ヘッダが選択されていない
+        if not self.selected_headers:
+            return None
+        # NOTE: 時間軸のカラムは csvファイルを追加した時に1回だけ探し、値は索引に保持しておく
+        self.header_index.sync(self.csv_readers)
+        return self.header_index.time_axis_values
 
-    def _get_csv_reader_by_index(self, index: int) -> CSVReader | None:
-        try:
-            return list(self.csv_readers.values())[index]
-        except IndexError:
+    def _get_time_axis_key(self) -> PlotKey | None:
+        """時間軸の値を取得する (ヘッダ, csvファイル) 。plots と同じ順番にする。時間軸が無い場合は None 。"""
+        if not self.selected_headers:
             return None
+        column = self.header_index.time_axis_column
+        if column is None:
+            return None
+        return (column.header, column.filepath)
+
+    def pop_changes(self) -> PlotChanges:
+        """前回呼んでから plots に加えた変更を返し、リセットする。"""
+        changes, self._changes = self._changes, PlotChanges()
+        return changes
 
     def _sync_plots(self) -> None:
-        # plots をクリアする
-        self.plots = []
+        """選択されたヘッダ・csvファイルと plots を同期させる。
+
+        NOTE: 追加/削除されたヘッダ・csvファイルの組み合わせだけを追加/削除し、変更は pop_changes() で取得出来るようにする。
+        他のプロットはラベルが変わった場合だけ更新する。
+        """
+        self.header_index.sync(self.csv_readers)
+        # NOTE: ヘッダが無いcsvファイルはプロットしない
+        desired_keys = [
+            (header, filepath)
+            for header in self.selected_headers
+            for filepath in self.csv_readers.keys()
+            if self.header_index.has(header, filepath)
+        ]
+        desired_key_set = set(desired_keys)
+
+        # 削除されたヘッダ・csvファイルのプロットを削除する
+        for key in [key for key in self._plots if key not in desired_key_set]:
+            del self._plots[key]
+            self._record_removed(key)
+
+        # 追加されたヘッダ・csvファイルのプロットを追加する
+        added_keys = [key for key in desired_keys if key not in self._plots]
+        if added_keys:
+            # NOTE: columnar の場合、追加されたカラムだけを csvファイルごとに1回でまとめて読み込む
+            headers_by_filepath: dict[str, list[str]] = {}
+            for header, filepath in added_keys:
+                headers_by_filepath.setdefault(filepath, []).append(header)
+            for filepath, headers in headers_by_filepath.items():
+                self.csv_readers[filepath].load_columns(headers)
+
+            for header, filepath in added_keys:
+                data = self.header_index.column(header, filepath).values  # type: ignore : desired_keys には索引にあるカラムだけが含まれる
+                metadata = Metadata(data=data, label="", header=header, filepath=filepath)
+                self._plots[(header, filepath)] = metadata
+                self._changes.added.append(metadata)
+
+        self._sync_labels(added_keys)
+
+        time_axis_key = self._get_time_axis_key()
+        if time_axis_key != self._time_axis_key:
+            self._time_axis_key = time_axis_key
+            self._changes.time_axis_changed = True
+
+    def _record_removed(self, key: PlotKey) -> None:
+        # まだ描画していない (追加した後に pop_changes() されていない) プロットは、追加した記録を取り消すだけでよい
+        for i, metadata in enumerate(self._changes.added):
+            if metadata.key == key:
+                del self._changes.added[i]
+                break
+        else:
+            self._changes.removed.append(key)
+        self._changes.relabeled = [metadata for metadata in self._changes.relabeled if metadata.key != key]
 
-        # どちらかが存在しない場合
-        if not self.selected_headers or not self.csv_readers.items():
+    def _sync_labels(self, added_keys: list[PlotKey]) -> None:
+        """ヘッダ・ファイル名から重複する部分を除いてラベルを付け直す。"""
+        if not self._plots:
             return
-
         # 重複を削除する
-        headers_without_duplicate_words = utils.remove_duplicates(*self.selected_headers)
+        headers_without_duplicate_words = dict(
+            zip(self.selected_headers, utils.remove_duplicates(*self.selected_headers))
+        )
         filenames = [utils.get_filename_from_path(path) for path in self.csv_readers.keys()]
-        filenames_without_duplicate_words = utils.remove_duplicates(*filenames)
-
-        for header, header_without_duplicate in zip(self.selected_headers, headers_without_duplicate_words):
-            for csv_reader, filename_without_duplicate in zip(
-                self.csv_readers.values(), filenames_without_duplicate_words
-            ):
-                data = csv_reader.get_column_values(header)
-                if data is None:
-                    raise ValueError(f"存在しないCSVヘッダが指定されました header: {header}")
-                # インスタンス変数の値と同期させる
-                self.plots.append(
-                    Metadata(
-                        data=data,
-                        label=f"{filename_without_duplicate}_{header_without_duplicate}",
-                    )
-                )
+        filenames_without_duplicate_words = dict(zip(self.csv_readers.keys(), utils.remove_duplicates(*filenames)))
+
+        added_key_set = set(added_keys)
+        relabeled_keys = {metadata.key for metadata in self._changes.relabeled}
+        for key, metadata in self._plots.items():
+            header, filepath = key
+            label = f"{filenames_without_duplicate_words[filepath]}_{headers_without_duplicate_words[header]}"
+            if label == metadata.label:
+                continue
+            metadata.label = label
+            # 追加したプロットは追加時のラベルで描画するので、ラベルの変更として記録しない
+            if key not in added_key_set and key not in relabeled_keys:
+                self._changes.relabeled.append(metadata)
 
     def _add_header(self, header: str) -> None:
         self.selected_headers.append(header)
@@ -88,8 +177,8 @@ class DataStore:
     def _remove_header(self, header: str) -> None:
         self.selected_headers.remove(header)
 
-    def _add_csv_reader(self, filepath: str) -> None:
-        self.csv_readers[filepath] = CSVReader(filepath)
+    def _add_csv_reader(self, filepath: str, reader: CSVReader | None = None) -> None:
+        self.csv_readers[filepath] = reader if reader is not None else CSVReader(filepath, columnar=CSV_LOAD_COLUMNAR)
 
     def _remove_csv_reader(self, header: str) -> None:
         del self.csv_readers[header]
@@ -100,34 +189,31 @@ class DataStore:
     def _has_csv_reader(self, filepath: str) -> bool:
         return filepath in self.csv_readers.keys()
 
-    def update_plots_by_filepaths(self, new_filepaths: list[str]) -> None:
-        # NOTE: dir のパスは渡す前に除外しておくこと
+    def update_plots_by_filepaths(self, new_filepaths: list[str], readers: dict[str, CSVReader] | None = None) -> None:
+        """選択されたcsvファイルに合わせて csv_readers と plots を更新する。
 
-        # 存在しなければクリアする
-        if not new_filepaths:
-            self.csv_readers = {}
-            self._sync_plots()
-            return
+        NOTE: dir のパスは渡す前に除外しておくこと
 
+        Args:
+            new_filepaths (list[str]): 選択されたcsvファイルのパス。csv_readers はこの順に並べる。
+            readers (dict[str, CSVReader] | None, optional): 読み込み済みの CSVReader 。デフォルトは None 。
+            NOTE: ここに無いcsvファイルはこのメソッドの中で読み込むので、大きなファイルは
+            src.backend.loader.CSVLoader で読み込んでから渡すこと。
+        """
         # 変化なし
-        number_of_new_filepaths = len(new_filepaths)
-        if number_of_new_filepaths == self.number_of_csv_readers:
+        if list(self.csv_readers.keys()) == new_filepaths:
             return
 
-        if number_of_new_filepaths > self.number_of_csv_readers:
-            # 追加するパターン
-            for path in new_filepaths:
-                if not self._has_csv_reader(path):
-                    self._add_csv_reader(path)
-                    self._sync_plots()
-                    return
-        else:
-            # 削除するパターン
-            for path in self.csv_readers.keys():
-                if path not in new_filepaths:
-                    self._remove_csv_reader(path)
-                    self._sync_plots()
-                    return
+        # 削除されたcsvファイル
+        for path in [path for path in self.csv_readers.keys() if path not in new_filepaths]:
+            self._remove_csv_reader(path)
+        # 追加されたcsvファイル
+        for path in new_filepaths:
+            if not self._has_csv_reader(path):
+                self._add_csv_reader(path, (readers or {}).get(path))
+        # NOTE: 読み込みが終わった順に関わらず選択された順に並べる (先頭のcsvファイルの時間軸を使うため)
+        self.csv_readers = {path: self.csv_readers[path] for path in new_filepaths}
+        self._sync_plots()
 
     def update_plots_by_headers(self, new_headers: list[str]) -> None:
         # 存在しなければクリアする
@@ -1,3 +1,4 @@
+import os
 import re
 from dataclasses import dataclass
 from typing import Final
@@ -19,6 +20,10 @@ class ComponentKeys:
     base_hline_input = {"1": "-BASE_HLINE_1-", "2": "-BASE_HLINE_2-"}
     baselines_update = "-UPDATE_BASE_HLINES-"
     time_axis_indicator_text = "-X_AXIS_INDICATOR-"
+    csv_load_progress = "-CSV_LOAD_PROGRESS-"
+    csv_load_cancel = "-CANCEL_CSV_LOAD-"
+    # csvファイルの読み込みが終わった時に、読み込んだスレッドから送られるイベント (src.backend.loader を参照)
+    csv_load_done = "-CSV_LOAD_DONE-"
     # popup
     get_folder_popup_folder_input = "-GET_FOLDER_POPUP_INPUT_FOLDER-"
     get_folder_popup_submit = "-GET_FOLDER_POPUP_SUBMIT-"
@@ -27,6 +32,16 @@ class ComponentKeys:
 # 処理
 WORD_LENGTH_REMOVE_DUPLICATE: Final = 8
 TIME_AXIS_HEADER_REGEX = re.compile("time", flags=re.IGNORECASE)
+# csv の読み込み
+# True の場合、選択されたカラムだけを読み込み、.npy のキャッシュを作る (src.backend.cache を参照)
+CSV_LOAD_COLUMNAR: Final = True
+CSV_CACHE_DIR: Final = os.path.join(os.path.expanduser("~"), ".cache", "graph-viewer")
+# 型の推測に使う行数
+CSV_SNIFF_ROWS: Final = 1000
+# バックグラウンドで同時に読み込むcsvファイルの数
+CSV_LOAD_MAX_WORKERS: Final = min(4, os.cpu_count() or 1)
+# ヘッダの一覧に、どれかのcsvファイルにあるヘッダ ("union") と、全てのcsvファイルにあるヘッダ ("intersection") のどちらを表示するか
+CSV_HEADER_MODE: Final = "union"
 
 # GUI
 FONT = "Monospace"
@@ -47,3 +62,8 @@ PLOT_PARAM_Y_MARGIN = 0
 PLOT_FIGURE_BG_COLOR = "azure"
 PLOT_BASELINE_STYLE = "dashed"
 PLOT_SUBPLOT_POSITION = {"left": 0.05, "right": 0.6, "bottom": 0.1, "top": 0.95}
+# 点の数がこれより多い系列は、描画領域の横幅のピクセル数まで間引いてプロットする (src.backend.lod を参照)
+PLOT_LOD_MIN_POINTS: Final = 20_000
+# 間引いた点のピラミッドの最も細かいレベルのバケットの大きさと、レベルごとの倍率
+PLOT_LOD_BASE_BUCKET: Final = 16
+PLOT_LOD_FACTOR: Final = 4
@@ -0,0 +1,151 @@
+"""文字列の間で共通する部分文字列 (longest common substring) を求める。
+"""
+from typing import Hashable, Sequence
+
+
+class SuffixAutomaton:
+    """複数の文字列の全ての部分文字列を受理するオートマトン (generalized suffix automaton) 。
+
+    文字列を区切り (文字列ごとに異なる値) で繋げて構築し、状態ごとにその部分文字列を含む文字列の番号をビットで持つ。
+    構築は文字列の長さの合計に比例する時間で終わる。
+
+    References
+        - [Suffix Automaton - Algorithms for Competitive Programming](https://cp-algorithms.com/string/suffix-automaton.html)
+    """
+
+    def __init__(self, strings: Sequence[str]) -> None:
+        """インスタンスの初期化。strings のオートマトンを構築する。
+
+        Args:
+            strings (Sequence[str]): 対象の文字列。
+        """
+        self.strings = strings
+        # 状態ごとの遷移・suffix link・状態が表す最長の部分文字列の長さ (状態0 は空文字列)
+        self.transitions: list[dict[Hashable, int]] = [{}]
+        self.links: list[int] = [-1]
+        self.lengths: list[int] = [0]
+        # 状態ごとの、その状態の部分文字列を含む文字列の番号のビットを立てた整数
+        self.owners: list[int] = [0]
+
+        last = 0
+        for i, string in enumerate(strings):
+            bit = 1 << i
+            for char in string:
+                last = self._extend(last, char)
+                self.owners[last] |= bit
+            # NOTE: 区切りは文字列と一致しない値 (負の整数) にして、文字列をまたぐ部分文字列を受理しないようにする
+            last = self._extend(last, -i - 1)
+        self._propagate_owners()
+
+    def _extend(self, last: int, char: Hashable) -> int:
+        transitions, links, lengths = self.transitions, self.links, self.lengths
+        current = len(lengths)
+        transitions.append({})
+        links.append(0)
+        lengths.append(lengths[last] + 1)
+        self.owners.append(0)
+
+        state = last
+        while state != -1 and char not in transitions[state]:
+            transitions[state][char] = current
+            state = links[state]
+        if state == -1:
+            return current
+
+        next_state = transitions[state][char]
+        if lengths[state] + 1 == lengths[next_state]:
+            links[current] = next_state
+            return current
+
+        # next_state を分割する
+        clone = len(lengths)
+        transitions.append(dict(transitions[next_state]))
+        links.append(links[next_state])
+        lengths.append(lengths[state] + 1)
+        self.owners.append(0)
+        while state != -1 and transitions[state].get(char) == next_state:
+            transitions[state][char] = clone
+            state = links[state]
+        links[next_state] = links[current] = clone
+        return current
+
+    def _propagate_owners(self) -> None:
+        # 部分文字列を含む文字列は、その接尾辞 (suffix link の先) も含む。長い状態から順に suffix link の先に伝える
+        links, owners = self.links, self.owners
+        for state in sorted(range(1, len(self.lengths)), key=self.lengths.__getitem__, reverse=True):
+            owners[links[state]] |= owners[state]
+
+    def longest_common_substrings(self, index: int, min_length: int = 0) -> set[str]:
+        """strings[index] と、それより前の文字列それぞれとの最長共通部分文字列を求める。
+
+        strings[index] を先頭から辿り、各位置で終わる共通部分文字列の長さを suffix link を遡って文字列ごとに求める。
+        文字列ごとの最長を、同じ最長を持つ文字列をビットでまとめて保持するので、比較する文字列の数に比例する処理は無い。
+
+        Args:
+            index (int): 対象の文字列の番号。
+            min_length (int, optional): この文字数以下の共通部分文字列は無視する。デフォルトは 0 。
+
+        Returns:
+            set[str]: 最長共通部分文字列の集合。同じ長さのものが複数ある場合は strings[index] の中で最も左にあるもの。
+        """
+        transitions, links, lengths, owners = self.transitions, self.links, self.lengths, self.owners
+        string = self.strings[index]
+        targets = (1 << index) - 1
+        # (長さ, 終わりの位置, その長さが最長である文字列のビット) の配列
+        groups: list[list[int]] = []
+        found = 0
+
+        state = match_length = 0
+        for end, char in enumerate(string, start=1):
+            # この位置で終わり、前の文字列のどれかに含まれる最長の部分文字列まで進める
+            # NOTE: 同じ状態の部分文字列は同じ文字列に含まれるので、含まれない場合は suffix link の先で短くする
+            while state and not (char in transitions[state] and owners[transitions[state][char]] & targets):
+                state = links[state]
+                match_length = lengths[state]
+            if char in transitions[state] and owners[transitions[state][char]] & targets:
+                state = transitions[state][char]
+                match_length += 1
+
+            # suffix link を遡り、各文字列がこの位置で終わる最長の共通部分文字列の長さを求める
+            length, current, seen = match_length, state, 0
+            while length > min_length:
+                matched = owners[current] & targets & ~seen
+                if matched:
+                    seen |= matched
+                    self._update_groups(groups, matched & found, length, end)
+                    if matched & ~found:
+                        groups.append([length, end, matched & ~found])
+                        found |= matched
+                    if seen == targets:
+                        break
+                current = links[current]
+                length = lengths[current]
+        return {string[end - length : end] for length, end, bits in groups if bits}
+
+    @staticmethod
+    def _update_groups(groups: list[list[int]], matched: int, length: int, end: int) -> None:
+        # これまでの最長より長い文字列を、新しいグループに移す
+        moved = 0
+        for group in groups:
+            if group[0] < length and group[2] & matched:
+                moved |= group[2] & matched
+                group[2] &= ~matched
+        if moved:
+            groups.append([length, end, moved])
+
+
+def find_longest_common_substrings(strings: Sequence[str], min_length: int = 0) -> set[str]:
+    """2つずつの組み合わせ全てについて、min_length 文字より長い最長共通部分文字列を求める。
+
+    Args:
+        strings (Sequence[str]): 対象の文字列。重複は無いこと。
+        min_length (int, optional): この文字数以下の共通部分文字列は無視する。デフォルトは 0 。
+
+    Returns:
+        set[str]: 最長共通部分文字列の集合。
+    """
+    automaton = SuffixAutomaton(strings)
+    words: set[str] = set()
+    for index in range(1, len(strings)):
+        words |= automaton.longest_common_substrings(index, min_length)
+    return words
@@ -2,3 +2,4 @@ from typing import Literal
 
 GraphAxis = Literal["x", "y"]
 HlineNumber = Literal["1", "2"]
+HeaderMode = Literal["union", "intersection"]
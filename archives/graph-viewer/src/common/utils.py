@@ -1,11 +1,13 @@
 """TODO docs の記述
 """
 
-import itertools
+import collections
+import functools
 import os
 import pathlib
 import re
 
+from src.common import substring
 from src.common.constants import WORD_LENGTH_REMOVE_DUPLICATE
 
 
@@ -17,62 +19,34 @@ def get_filename_from_path(filepath: str) -> str:
     return pathlib.Path(filepath).name
 
 
-def find_longest_duplicate_word(string1: str, string2: str) -> str:
-    answer = ""
-    length_1, length_2 = len(string1), len(string2)
-
-    for i in range(length_1):
-        match = ""
-        for j in range(length_2):
-            if i + j < length_1 and string1[i + j] == string2[j]:
-                match += string2[j]
-            else:
-                if len(match) > len(answer):
-                    answer = match
-                match = ""
-        if len(match) > len(answer):
-            answer = match  # this was missing
-    return answer
-
+def remove_duplicates(*strings: str) -> list[str]:
+    """文字列の間で重複する部分を取り除く。
 
-def escape_regex(string: str) -> str:
-    return string.translate(str.maketrans({"(": "\(", ")": "\)"}))
+    2つずつの組み合わせ全てについて最長共通部分文字列を求め、WORD_LENGTH_REMOVE_DUPLICATE 文字より長いものを全ての文字列から取り除く。
+    NOTE: 同じ文字列の組み合わせはキャッシュした結果を返す。(ヘッダ・ファイルを選択する度に呼ばれるため)
 
+    Args:
+        *strings (str): 対象の文字列。
 
-def create_regex_or_pattern(*strings: str) -> str:
-    """`foo|bar` というパターンの正規表現を作る。
-    NOTE: 長さ1の配列が与えられた場合は `foo` (そのまま) を返す
+    Returns:
+        list[str]: 重複する部分を取り除いた文字列。strings と同じ順番になる。
     """
-    result = rf"{strings[0]}"
-
-    if len(strings) == 1:
-        return escape_regex(result)
-
-    for s in strings[1:]:
-        result += f"|{s}"
-    # ()をエスケープする
-    return escape_regex(result)
-
-
-def remove_duplicates(*strings: str) -> list[str]:
-    # [find and remove common substring with python - Stack Overflow](https://stackoverflow.com/questions/27963222/find-and-remove-common-substring-with-python)
-    # [Remove specific characters from a string in Python - Stack Overflow](https://stackoverflow.com/questions/3939361/remove-specific-characters-from-a-string-in-python)
-    longest_duplicate_words = []
-
-    # 与えられた配列の要素の組み合わせ全てに対して重複する文字列を探す処理を実行
-    for pair in itertools.combinations(strings, 2):
-        longest_duplicate_word = find_longest_duplicate_word(*pair)
-        # 長さが一定以下の場合は重複削除しない
-        if len(longest_duplicate_word) > WORD_LENGTH_REMOVE_DUPLICATE:
-            longest_duplicate_words.append(longest_duplicate_word)
-
-    # 配列の重複を排除
-    longest_duplicate_words = list(set(longest_duplicate_words))
-    if not longest_duplicate_words:
-        return list(strings)
-
-    regex = create_regex_or_pattern(*longest_duplicate_words)
-    return [re.sub(regex, "", s) for s in strings]
+    return list(_remove_duplicates(strings))
+
+
+@functools.lru_cache(maxsize=128)
+def _remove_duplicates(strings: tuple[str, ...]) -> tuple[str, ...]:
+    counts = collections.Counter(strings)
+    # 同じ文字列が複数ある場合は、文字列全体が重複する部分になる
+    duplicate_words = {s for s, count in counts.items() if count > 1 and len(s) > WORD_LENGTH_REMOVE_DUPLICATE}
+    # 長さが一定以下の場合は重複削除しない
+    duplicate_words |= substring.find_longest_common_substrings(list(counts.keys()), WORD_LENGTH_REMOVE_DUPLICATE)
+    if not duplicate_words:
+        return strings
+
+    # NOTE: 長いものから順に当てはめる (短い方が長い方の一部の場合に、長い方をまとめて取り除く)
+    regex = re.compile("|".join(re.escape(word) for word in sorted(duplicate_words, key=lambda word: (-len(word), word))))
+    return tuple(regex.sub("", s) for s in strings)
 
 
 def validate_graph_min_max_range(min: str, max: str) -> bool:
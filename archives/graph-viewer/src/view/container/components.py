@@ -2,9 +2,11 @@ import os
 import tkinter
 from typing import Any
 
+import numpy as np
 import PySimpleGUI as sg
 
-from src.backend.graph import GraphPlotter
+from src.backend.graph import GraphPlotter, Metadata
+from src.backend.loader import CSVLoader, LoadResult
 from src.backend.store import DataStore
 from src.common import types, utils
 from src.common.constants import (
@@ -52,6 +54,9 @@ class UserInterface:
         )
         self.data_store = DataStore()
         self.graph = GraphPlotter(self._get_canvas(), (10, 8))
+        # NOTE: csvファイルは別のスレッドで読み込み、終わったら csv_load_done イベントで受け取る
+        self.csv_loader = CSVLoader(self._notify_csv_loaded)
+        self._csv_headers_listbox_values: list[str] | None = None
 
         self.events = {
             ComponentKeys.csv_headers_listbox: self.on_select_csv_header,
@@ -60,6 +65,8 @@ class UserInterface:
             ComponentKeys.graph_range_update: self.on_click_update_graph_range,
             ComponentKeys.graph_range_reset: self.on_click_reset_graph_range,
             ComponentKeys.baselines_update: self.on_click_update_baselines,
+            ComponentKeys.csv_load_done: self.on_load_csv,
+            ComponentKeys.csv_load_cancel: self.on_click_cancel_csv_load,
         }
 
     def start_event_loop(self) -> None:
@@ -75,8 +82,15 @@ class UserInterface:
 
     def close_window(self) -> None:
         """ウィンドを閉じる。"""
+        self.csv_loader.shutdown()
         self.window.close()
 
+    def _notify_csv_loaded(self, result: LoadResult) -> None:
+        """csvファイルの読み込みが終わったことをイベントループに伝える。(読み込んだスレッドから呼ばれる)"""
+        if self.window.was_closed():
+            return
+        self.window.write_event_value(ComponentKeys.csv_load_done, result)
+
     def _print_notice(self, *messages: str) -> None:
         """通知をログに表示する
 
@@ -111,6 +125,14 @@ class UserInterface:
         except AttributeError:
             print("read_window が実行されていません!")
 
+    def get_selected_csv_filepaths(self) -> list[str]:
+        """ツリーで選択されたcsvファイルのパスを取得する
+
+        Returns:
+            list[str]: 選択されたcsvファイルのパスの配列。ディレクトリは除く
+        """
+        return [i for i in self._get_values(ComponentKeys.explorer_tree) if not utils.is_dir(i)]
+
     def get_selected_csv_headers(self) -> list[str]:
         """選択されたcsvヘッダを取得する
 
@@ -183,44 +205,92 @@ class UserInterface:
             - self._update_base_hlines()
             - self.graph.commit_change()
         """
-        self.graph.clear()
+        # NOTE: 全て描き直すので、それまでの差分は不要
+        self.data_store.pop_changes()
 
+        # 描画済みの線は作り直さずに値を差し替える (axes.cla() はしない)
+        plots = self.data_store.plots
+        self.graph.retain_lines([plot.key for plot in plots])
         values_of_time_axis = self.data_store.values_of_csv_time_axis
-
-        # x軸(時間軸)が存在する場合
-        if values_of_time_axis:
-            self._update_time_axis_indicator(True)
-
-            for plot in self.data_store.plots:
-                x_values, y_values = values_of_time_axis, plot.data
-                try:
-                    self.graph.plot(y_values=y_values, label=plot.label, x_values=x_values)
-                except ValueError:
-                    # X, Y軸プロットの長さが異なる場合、0埋めする
-                    # matplotlib の ValueError: x and y must have same first dimension, but have shapes への対応
-                    if len(x_values) > len(y_values):
-                        # x(時間軸)の方が長い: y軸を0埋めする
-                        y_values = y_values + [0] * (len(x_values) - len(y_values))
-                        self.graph.plot(y_values=y_values, label=plot.label, x_values=x_values)
-                        self._print_alert("x軸の方が長いため、y軸を0埋めしました")
-                    else:
-                        # yの方が長い: y軸を短くする
-                        y_values = y_values[: len(x_values)]
-                        self.graph.plot(y_values=y_values, label=plot.label, x_values=x_values)
-                        self._print_alert("y軸の方が長いため、y軸をx軸に合わせました")
-        # x軸(時間軸)が存在しない場合
-        else:
-            self._update_time_axis_indicator(False)
-            [self.graph.plot(y_values=plot.data, label=plot.label) for plot in self.data_store.plots]
+        self._update_time_axis_indicator(values_of_time_axis is not None)
+        for plot in plots:
+            self._plot(plot, values_of_time_axis)
+        self.graph.update_legend()
 
         # 毎回実行が必要なメソッド
         self.update_both_graph_range()
-        self._update_base_hlines()
+        self._update_base_hlines(refresh=False)
+        self.graph.commit_change()
+
+    def apply_plot_changes(self) -> None:
+        """DataStore で追加/削除されたプロットだけをグラフに反映する。
+
+        NOTE: 時間軸が変わった場合は全てのプロットの X軸 が変わるので update_graph_canvas() で描き直す。
+        """
+        changes = self.data_store.pop_changes()
+        if changes.time_axis_changed:
+            self.update_graph_canvas()
+            return
+        if changes.is_empty:
+            return
+        # ラベルが変わっただけの場合は凡例だけを更新する
+        if not changes.added and not changes.removed:
+            for plot in changes.relabeled:
+                self.graph.set_line_label(plot.key, plot.label)
+            self.graph.update_legend()
+            self.graph.refresh_overlay()
+            return
+
+        for key in changes.removed:
+            self.graph.remove_line(key)
+        for plot in changes.relabeled:
+            self.graph.set_line_label(plot.key, plot.label)
+        values_of_time_axis = self.data_store.values_of_csv_time_axis
+        for plot in changes.added:
+            self._plot(plot, values_of_time_axis)
+        self.graph.update_legend()
+
+        self.update_both_graph_range()
+        self._update_base_hlines(refresh=False)
         self.graph.commit_change()
 
+    def _plot(self, plot: Metadata, values_of_time_axis: np.ndarray | None) -> None:
+        """プロットを1つ描画する。時間軸が存在する場合はX軸を時間軸にする。"""
+        # x軸(時間軸)が存在しない場合
+        if values_of_time_axis is None:
+            self.graph.plot(y_values=plot.data, label=plot.label, key=plot.key)
+            return
+
+        # x軸(時間軸)が存在する場合
+        x_values, y_values = values_of_time_axis, plot.data
+        # X, Y軸プロットの長さが異なる場合は揃える
+        # NOTE: matplotlib の ValueError: x and y must have same first dimension, but have shapes への対応
+        if len(x_values) > len(y_values):
+            # x(時間軸)の方が長い: y軸を0埋めする
+            y_values = np.concatenate([y_values, np.zeros(len(x_values) - len(y_values), dtype=y_values.dtype)])
+            self._print_alert("x軸の方が長いため、y軸を0埋めしました")
+        elif len(x_values) < len(y_values):
+            # yの方が長い: y軸を短くする (コピーせずにスライスする)
+            y_values = y_values[: len(x_values)]
+            self._print_alert("y軸の方が長いため、y軸をx軸に合わせました")
+        self.graph.plot(y_values=y_values, label=plot.label, x_values=x_values, key=plot.key)
+
     def update_csv_headers_listbox(self) -> None:
         """CSV選択リストを更新する"""
-        self.window[ComponentKeys.csv_headers_listbox].update(values=self.data_store.headers_of_csv_reader)
+        headers = self.data_store.headers_of_csv_reader
+        # NOTE: 値を入れ替えると選択が解除されるので、ヘッダが変わらない場合 (同じ形式のcsvファイルを追加で読み込んだ場合など) は更新しない
+        if headers == self._csv_headers_listbox_values:
+            return
+        self._csv_headers_listbox_values = headers
+        # 選択中のヘッダが一覧に残る場合は選択し直す
+        selected_indexes = [headers.index(header) for header in self.data_store.selected_headers if header in headers]
+        self.window[ComponentKeys.csv_headers_listbox].update(values=headers, set_to_index=selected_indexes)  # type: ignore
+
+    def _update_csv_load_progress(self) -> None:
+        """csvファイルの読み込みの進捗を更新する"""
+        finished, submitted = self.csv_loader.progress
+        self.window[ComponentKeys.csv_load_progress].update(current_count=finished, max=max(submitted, 1))  # type: ignore
+        self.window[ComponentKeys.csv_load_cancel].update(disabled=finished == submitted)  # type: ignore
 
     # FIXME update x, y を統合する
     def _update_x_range(self) -> None:
@@ -251,6 +321,8 @@ class UserInterface:
 
     def reset_data_referring_to_tree(self) -> None:
         """フォルダーツリーに関連するデータをリセットする"""
+        self.csv_loader.cancel()
+        self._update_csv_load_progress()
         self.data_store.update_plots_by_headers([])
         self.data_store.update_plots_by_filepaths([])
         self.update_csv_headers_listbox()
@@ -274,47 +346,83 @@ class UserInterface:
         self.graph.auto_scale_y_range()
         self.graph.commit_change()
 
-    def _update_base_hlines(self) -> None:
-        """水平線を更新する"""
+    def _update_base_hlines(self, refresh: bool = True) -> None:
+        """水平線を更新する
+
+        Args:
+            refresh (bool, optional): 水平線だけを描き直すかどうか。デフォルトは `True` 。
+            NOTE: 続けてグラフ全体を描画する場合は `False` にする。(水平線もその時に描画される)
+        """
         for hline_num in BASE_HLINE_NUMBERS:
-            if hline1_value := self.get_base_hline_value(hline_num):
-                self.graph.plot_hline(hline1_value, BASE_HLINE_COLORS[hline_num])
-        self.graph.commit_change()
+            # NOTE: 入力が空の場合は None になり、水平線は非表示になる
+            self.graph.set_baseline(hline_num, self.get_base_hline_value(hline_num), BASE_HLINE_COLORS[hline_num])
+        if refresh:
+            self.graph.refresh_overlay()
 
     def on_click_tree(self) -> None:
-        """csv_reader, csv_header_listbox, グラフ を更新する処理"""
-        filepaths = [i for i in self._get_values(ComponentKeys.explorer_tree) if not utils.is_dir(i)]
+        """csv_reader, csv_header_listbox, グラフ を更新する処理
 
-        # 何も選ばれていない or ディレクトリだけ選ばれている場合
-        if not filepaths:
-            self.data_store.update_plots_by_filepaths([])
-            return
+        NOTE: 読み込み済みのファイルの削除はすぐに反映し、新しく選択されたファイルはバックグラウンドで読み込む。
+        (読み込みが終わったら on_load_csv で反映する)
+        """
+        filepaths = self.get_selected_csv_filepaths()
 
-        try:
-            # 存在しないcsvヘッダが選ばれた場合
-            self.data_store.update_plots_by_filepaths(filepaths)
-        except ValueError:
-            self._print_alert("存在しないcsvヘッダが指定されました", "ファイル間に異なるヘッダが含まれないか確認して下さい")
-            self.reset_data_referring_to_tree()
+        # 選択が外れたファイルの読み込みは中止する
+        self.csv_loader.cancel([path for path in self.csv_loader.pending_filepaths if path not in filepaths])
+
+        self.data_store.update_plots_by_filepaths([path for path in filepaths if path in self.data_store.csv_readers])
+        self.update_csv_headers_listbox()
+        self.apply_plot_changes()
+
+        # 複数のファイルが選ばれた場合は並列に読み込む
+        for path in filepaths:
+            if path not in self.data_store.csv_readers:
+                self.csv_loader.submit(path, columns=self.data_store.selected_headers)
+        self._update_csv_load_progress()
+
+    def on_load_csv(self) -> None:
+        """バックグラウンドで読み込んだcsvファイルを反映する処理"""
+        result: LoadResult = self._get_values(ComponentKeys.csv_load_done)
+        self._update_csv_load_progress()
+        # 中止されたファイル
+        if result.cancelled:
             return
+        filename = utils.get_filename_from_path(result.filepath)
+        if result.error is not None:
+            self._print_alert(f"csvファイルの読み込みに失敗しました: {filename}", repr(result.error))
+            return
+
+        filepaths = self.get_selected_csv_filepaths()
+        loaded_filepaths = [path for path in filepaths if path in self.data_store.csv_readers or path == result.filepath]
+        self.data_store.update_plots_by_filepaths(loaded_filepaths, readers={result.filepath: result.reader})  # type: ignore : error が None なら reader は None にならない
         self.update_csv_headers_listbox()
-        self.update_graph_canvas()
+        self.apply_plot_changes()
+        self._print_notice(f"読み込みました: {filename} ({result.elapsed:.1f}秒)")
+
+        # 選択中のヘッダが無いcsvファイルは、そのヘッダをプロットしない
+        missing_headers = [
+            header for header in self.data_store.selected_headers if not self.data_store.header_index.has(header, result.filepath)
+        ]
+        if missing_headers:
+            self._print_alert(f"{filename} に無いヘッダはプロットしません: {', '.join(missing_headers)}")
+
+    def on_click_cancel_csv_load(self) -> None:
+        """csvファイルの読み込みを中止する処理"""
+        cancelled = self.csv_loader.cancel()
+        self._update_csv_load_progress()
+        if cancelled:
+            self._print_notice(f"{len(cancelled)}件のcsvファイルの読み込みを中止しました")
 
     def on_select_csv_header(self) -> None:
         """グラフを更新する処理"""
         csv_headers = self.get_selected_csv_headers()
         if not csv_headers:
             self.data_store.update_plots_by_headers([])
+            self.apply_plot_changes()
             return
 
-        # 存在しないcsvヘッダが選ばれた場合
-        try:
-            self.data_store.update_plots_by_headers(csv_headers)
-        except ValueError:
-            self._print_alert("存在しないcsvヘッダが指定されました", "ファイル間に異なるヘッダが含まれないか確認して下さい")
-            self.reset_data_referring_to_tree()
-            return
-        self.update_graph_canvas()
+        self.data_store.update_plots_by_headers(csv_headers)
+        self.apply_plot_changes()
 
     def on_input_folder(self) -> None:
         """ツリーを更新する処理"""
@@ -335,7 +443,7 @@ class UserInterface:
 
     def on_click_update_baselines(self) -> None:
         """水平線を更新する処理"""
-        # hline の描画だけ呼び出すと無限に描画されてしまう
-        # clear を挟むために _update_graph_canvas を呼ぶようにする
-        self.update_graph_canvas()
+        # NOTE: 水平線は _update_base_hlines で作り直さずに位置と表示/非表示だけを変え、refresh_overlay() で重ねて描画する (blitting)
+        # 続けてレンジを合わせ直すので、最後に commit_change() でグラフ全体を描画する
+        self._update_base_hlines()
         self._print_notice("規格線を更新しました")
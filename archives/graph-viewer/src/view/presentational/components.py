@@ -66,6 +66,21 @@ def select_csv_header_frame() -> sg.Frame:
     return sg.Frame(**select_csv_headers_frame_styles)
 
 
+def csv_load_progress_components() -> tuple[sg.ProgressBar, sg.Button]:
+    csv_load_progress_styles = {
+        "max_value": 1,
+        "orientation": "h",
+        "size": (40, 10),
+        "key": ComponentKeys.csv_load_progress,
+    }
+    cancel_csv_load_button_styles = {
+        "button_text": "読み込み中止",
+        "key": ComponentKeys.csv_load_cancel,
+        "disabled": True,
+    }
+    return sg.ProgressBar(**csv_load_progress_styles), sg.Button(**cancel_csv_load_button_styles)
+
+
 def log_frame() -> sg.Frame:
     log_styles = {
         "size": (70, 6),
@@ -77,6 +92,7 @@ def log_frame() -> sg.Frame:
         "title": "ログ",
         "layout": [
             [sg.Multiline(**log_styles)],
+            [*csv_load_progress_components()],
         ],
     }
 
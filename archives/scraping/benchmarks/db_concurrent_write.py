@@ -0,0 +1,119 @@
+"""複数のスレッドから同じ DB に同時に読み書きした時の速度と "database is locked" の発生数を比較する。
+
+各スレッドは (select_in で読み込み -> upsert_many で書き込み) を1つのトランザクションとして繰り返す。
+クローラが DB の状態を読んでから更新するのと同じ形。
+
+    legacy: journal_mode=DELETE, synchronous=FULL, DEFERRED トランザクション (sqlite3.connect() のデフォルト相当)
+    wal:    ConnectionSettings() のデフォルト (WAL, synchronous=NORMAL, BEGIN IMMEDIATE)
+
+Usage:
+    python -m benchmarks.db_concurrent_write
+    python -m benchmarks.db_concurrent_write --threads 2 4 8 --transactions 200 --batch 20
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from libs import common
+from libs.db.connection import LEGACY_SETTINGS, ConnectionManager, ConnectionSettings
+from libs.db.db import DataBase
+
+TABLE_INFO = """
+id integer unique primary key autoincrement,
+title string unique,
+latest_episode_title string,
+latest_episode_url string
+"""
+
+SETTINGS: dict[str, ConnectionSettings] = {
+    "legacy": LEGACY_SETTINGS,
+    "wal": ConnectionSettings(),
+}
+
+
+def open_database(db_path: str, manager: ConnectionManager) -> DataBase:
+    return DataBase(
+        db_path,
+        common.TONARINOYJ_TABLE_NAME,
+        common.ALL_COLUMNS["tonarinoyj"],
+        common.UPDATABLE_COLUMNS["tonarinoyj"],
+        TABLE_INFO,
+        connection_manager=manager,
+    )
+
+
+def crawl(
+    db_path: str, manager: ConnectionManager, worker: int, transactions: int, batch: int, errors: list[str]
+) -> None:
+    try:
+        db = open_database(db_path, manager)
+    # NOTE: 接続時の PRAGMA もロックを待つので、ここで失敗した場合はこのスレッドのトランザクションを全て失敗として数える
+    except sqlite3.OperationalError as e:
+        errors.extend([str(e)] * transactions)
+        return
+    for i in range(transactions):
+        titles = [f"title_{worker}_{(i * batch + j) % 500}" for j in range(batch)]
+        try:
+            with db.transaction():
+                db.select_in("title", titles, ("latest_episode_url",))
+                db.upsert_many(
+                    [
+                        {
+                            "title": title,
+                            "latest_episode_title": f"[第{i}話] {title}",
+                            "latest_episode_url": f"https://example.com/{title}/{i}",
+                        }
+                        for title in titles
+                    ],
+                    ("title",),
+                )
+        except sqlite3.OperationalError as e:
+            errors.append(str(e))
+    db.close()
+
+
+def measure(settings: ConnectionSettings, threads: int, transactions: int, batch: int) -> tuple[float, int, int]:
+    """(秒, 成功したトランザクション数, 失敗したトランザクション数) を返す。"""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench.db")
+        manager = ConnectionManager(db_path, settings)
+        # テーブルを作っておく
+        open_database(db_path, manager).close()
+
+        errors: list[str] = []
+        workers = [
+            threading.Thread(target=crawl, args=(db_path, manager, worker, transactions, batch, errors))
+            for worker in range(threads)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        manager.close_all()
+    return elapsed, threads * transactions - len(errors), len(errors)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--transactions", type=int, default=100, help="1スレッドあたりのトランザクション数")
+    parser.add_argument("--batch", type=int, default=10, help="1トランザクションで書き込む行数")
+    parser.add_argument("--settings", nargs="+", choices=list(SETTINGS), default=list(SETTINGS))
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'settings':<8} {'seconds':>9} {'tx/s':>9} {'ok':>6} {'locked':>7}")
+    for threads in args.threads:
+        for name in args.settings:
+            elapsed, ok, failed = measure(SETTINGS[name], threads, args.transactions, args.batch)
+            print(f"{threads:>7} {name:<8} {elapsed:>9.3f} {ok / elapsed:>9,.0f} {ok:>6} {failed:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""1行ずつの INSERT とまとめた INSERT の速度を比較する。
+
+Usage:
+    python -m benchmarks.db_insert
+    python -m benchmarks.db_insert --rows 10000 100000 --strategies transaction insert_many
+NOTE: "row_by_row" は1行ごとに fsync が走るため、ストレージによっては 100000 行で数十分かかる。
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable
+
+from libs import common
+from libs.db.db import DataBase
+
+TABLE_INFO = """
+id integer unique primary key autoincrement,
+title string unique,
+latest_episode_title string,
+latest_episode_url string
+"""
+
+
+def generate_records(number_of_rows: int) -> list[common.TonarinoyjChangeableValues]:
+    return [
+        {
+            "title": f"title_{i}",
+            "latest_episode_title": f"[第{i}話] title_{i}",
+            "latest_episode_url": f"https://example.com/episode/{i}",
+        }
+        for i in range(number_of_rows)
+    ]
+
+
+def open_database(directory: str, name: str) -> DataBase:
+    return DataBase(
+        os.path.join(directory, f"{name}.db"),
+        common.TONARINOYJ_TABLE_NAME,
+        common.ALL_COLUMNS["tonarinoyj"],
+        common.UPDATABLE_COLUMNS["tonarinoyj"],
+        TABLE_INFO,
+    )
+
+
+def insert_row_by_row(db: DataBase, records: list[common.TonarinoyjChangeableValues]) -> None:
+    for record in records:
+        db.insert(record)
+
+
+def insert_in_transaction(db: DataBase, records: list[common.TonarinoyjChangeableValues]) -> None:
+    with db.transaction():
+        for record in records:
+            db.insert(record)
+
+
+def insert_many(db: DataBase, records: list[common.TonarinoyjChangeableValues]) -> None:
+    db.insert_many(records)
+
+
+def upsert_many(db: DataBase, records: list[common.TonarinoyjChangeableValues]) -> None:
+    db.upsert_many(records, ("title",))
+
+
+def measure(
+    directory: str,
+    name: str,
+    insert: Callable[[DataBase, list[common.TonarinoyjChangeableValues]], None],
+    records: list[common.TonarinoyjChangeableValues],
+) -> float:
+    db = open_database(directory, name)
+    start = time.perf_counter()
+    insert(db, records)
+    elapsed = time.perf_counter() - start
+    db.close()
+    db.connection_manager.close_all()
+    return elapsed
+
+
+STRATEGIES: dict[str, Callable[[DataBase, list[common.TonarinoyjChangeableValues]], None]] = {
+    "row_by_row": insert_row_by_row,
+    "transaction": insert_in_transaction,
+    "insert_many": insert_many,
+    "upsert_many": upsert_many,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES))
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'strategy':<12} {'seconds':>9} {'rows/s':>12}")
+    for number_of_rows in args.rows:
+        records = generate_records(number_of_rows)
+        with tempfile.TemporaryDirectory() as directory:
+            for name in args.strategies:
+                elapsed = measure(directory, name, STRATEGIES[name], records)
+                print(f"{number_of_rows:>8} {name:<12} {elapsed:>9.3f} {number_of_rows / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""select の結果の形式 (dict / tuple / row / namedtuple) ごとの速度と、
+fetchall (select) と fetchmany (iter_select) のピークメモリを比較する。
+
+dict_factory は行ごとに cursor.description を走査して辞書を作るので、以前の実装として一緒に計測する。
+
+Usage:
+    python -m benchmarks.db_row_format
+    python -m benchmarks.db_row_format --rows 1000000 --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable
+
+from libs import common
+from libs.db.db import ROW_FORMAT, DataBase, dict_factory
+
+TABLE_INFO = """
+id integer unique primary key autoincrement,
+title string unique,
+latest_episode_title string,
+latest_episode_url string
+"""
+
+
+def open_database(number_of_rows: int) -> DataBase:
+    db = DataBase(
+        ":memory:",
+        common.TONARINOYJ_TABLE_NAME,
+        common.ALL_COLUMNS["tonarinoyj"],
+        common.UPDATABLE_COLUMNS["tonarinoyj"],
+        TABLE_INFO,
+    )
+    db.insert_many(
+        [
+            {
+                "title": f"title_{i}",
+                "latest_episode_title": f"[第{i}話] title_{i}",
+                "latest_episode_url": f"https://example.com/episode/{i}",
+            }
+            for i in range(number_of_rows)
+        ]
+    )
+    return db
+
+
+def select_by_dict_factory(db: DataBase) -> int:
+    """以前の実装と同じく、接続の row_factory に dict_factory を設定して fetchall する。"""
+    cursor = db.connection.cursor()
+    cursor.row_factory = dict_factory
+    cursor.execute(f"SELECT * FROM {db.table_name}")
+    rows = cursor.fetchall()
+    cursor.close()
+    return len(rows)
+
+
+def select_by(row_format: ROW_FORMAT) -> Callable[[DataBase], int]:
+    def select(db: DataBase) -> int:
+        return len(db.select(("*",), row_format=row_format))
+
+    return select
+
+
+def iter_select_by(row_format: ROW_FORMAT) -> Callable[[DataBase], int]:
+    def iter_select(db: DataBase) -> int:
+        return sum(1 for _ in db.iter_select(("*",), row_format=row_format))
+
+    return iter_select
+
+
+STRATEGIES: dict[str, Callable[[DataBase], int]] = {
+    "dict_factory": select_by_dict_factory,
+    "dict": select_by("dict"),
+    "tuple": select_by("tuple"),
+    "row": select_by("row"),
+    "namedtuple": select_by("namedtuple"),
+    "iter dict": iter_select_by("dict"),
+    "iter tuple": iter_select_by("tuple"),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db = open_database(args.rows)
+    print(f"{'strategy':<13} {'seconds':>9} {'rows/s':>12} {'peak MiB':>9}")
+    for name, select in STRATEGIES.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            select(db)
+        elapsed = (time.perf_counter() - start) / args.repeat
+
+        # NOTE: tracemalloc は計測対象を遅くするので、時間とは別に1回だけ計測する
+        tracemalloc.start()
+        select(db)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:<13} {elapsed:>9.3f} {args.rows / elapsed:>12,.0f} {peak / 2**20:>9.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""タイトルごとの SELECT をリテラル埋め込みのクエリとプレースホルダのクエリで比較する。
+
+main.find_latest_url_in_* と同じく、タイトルを1件ずつ WHERE title=... で検索する。
+リテラル埋め込みは値ごとに別のクエリ文字列になるため、sqlite3 のステートメントキャッシュにヒットしない。
+
+    seconds:      --rounds 回計測した中で最も短い時間
+    cache hits:   sqlite3 のステートメントキャッシュにヒットした回数 (prepare を省略出来た回数)
+    cache misses: ヒットせずに prepare し直した回数
+
+NOTE: タイトル1件の SELECT は prepare の時間が小さいので、速度の差は数十%程度になる。
+主な効果は prepare し直しが無くなること (cache misses) と、キャッシュが値ごとのクエリで埋まらないこと (distinct SQL) 。
+タイトルの数が cached_statements (デフォルト128) 以下の場合は、リテラル埋め込みでも2周目以降はヒットする。
+
+Usage:
+    python -m benchmarks.db_select
+    python -m benchmarks.db_select --titles 1000 --repeat 20
+    python -m benchmarks.db_select --titles 100
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import sqlite3
+import time
+from typing import Any, Callable
+
+from libs import common
+from libs.db.db import DataBase
+
+TABLE_INFO = """
+id integer unique primary key autoincrement,
+title string unique,
+latest_episode_title string,
+latest_episode_url string
+"""
+
+
+def open_database(number_of_titles: int) -> DataBase:
+    db = DataBase(
+        ":memory:",
+        common.TONARINOYJ_TABLE_NAME,
+        common.ALL_COLUMNS["tonarinoyj"],
+        common.UPDATABLE_COLUMNS["tonarinoyj"],
+        TABLE_INFO,
+    )
+    db.insert_many(
+        [
+            {
+                "title": f"title_{i}",
+                "latest_episode_title": f"[第{i}話] title_{i}",
+                "latest_episode_url": f"https://example.com/episode/{i}",
+            }
+            for i in range(number_of_titles)
+        ]
+    )
+    return db
+
+
+def select_by_literal(db: DataBase, titles: list[str]) -> set[str]:
+    """以前の実装と同じく、値をクエリ文字列に埋め込んで検索する。"""
+    queries = set()
+    for title in titles:
+        query = f"SELECT latest_episode_url, latest_episode_title FROM {db.table_name} WHERE title='{title}'"
+        queries.add(query)
+        db.cursor.execute(query)
+        db.cursor.fetchall()
+    return queries
+
+
+def select_by_placeholder(db: DataBase, titles: list[str]) -> set[str]:
+    columns = ("latest_episode_url", "latest_episode_title")
+    for title in titles:
+        db.select(columns, where={"title": title})
+    return {DataBase._select_query(db.table_name, columns, ("title",), "AND", False)}
+
+
+def statement_cache_info(connection: sqlite3.Connection) -> Any | None:
+    """接続のステートメントキャッシュの cache_info() を返す。
+
+    NOTE: sqlite3 はステートメントキャッシュを公開していないが、CPython 3.11 では functools の LRU キャッシュで実装されている。
+    見つからない場合 (他の実装・バージョン) は None 。
+    """
+    for referent in gc.get_referents(connection):
+        if type(referent).__name__ == "_lru_cache_wrapper":
+            return referent.cache_info()
+    return None
+
+
+def measure(
+    db: DataBase, select: Callable[[DataBase, list[str]], set[str]], titles: list[str], repeat: int
+) -> tuple[float, set[str], int | None, int | None]:
+    """(秒, 実行したクエリ文字列, キャッシュのヒット数, キャッシュのミス数) を返す。"""
+    before = statement_cache_info(db.cursor.connection)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        queries = select(db, titles)
+    elapsed = time.perf_counter() - start
+    after = statement_cache_info(db.cursor.connection)
+    if before is None or after is None:
+        return elapsed, queries, None, None
+    return elapsed, queries, after.hits - before.hits, after.misses - before.misses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    db = open_database(args.titles)
+    titles = [f"title_{i}" for i in range(args.titles)]
+    lookups = args.titles * args.repeat
+
+    print(f"{'strategy':<12} {'seconds':>9} {'lookups/s':>12} {'distinct SQL':>13} {'cache hits':>11} {'cache misses':>13}")
+    for name, select in (("literal", select_by_literal), ("placeholder", select_by_placeholder)):
+        elapsed = float("inf")
+        for _ in range(args.rounds):
+            DataBase._select_query.cache_clear()
+            # NOTE: 前の計測で残ったステートメントにヒットしないよう、計測の前にキャッシュを追い出しておく
+            for i in range(200):
+                db.cursor.execute(f"SELECT {i}")
+            round_elapsed, queries, hits, misses = measure(db, select, titles, args.repeat)
+            elapsed = min(elapsed, round_elapsed)
+        hits_text = "-" if hits is None else f"{hits:,}"
+        misses_text = "-" if misses is None else f"{misses:,}"
+        print(
+            f"{name:<12} {elapsed:>9.3f} {lookups / elapsed:>12,.0f} {len(queries):>13,}"
+            f" {hits_text:>11} {misses_text:>13}"
+        )
+
+    # NOTE: sqlite3 のステートメントキャッシュはクエリ文字列をキーにするので、
+    # distinct SQL が cached_statements (デフォルト128) を超えると毎回 prepare し直しになる
+    print(f"query builder cache: {DataBase._select_query.cache_info()}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
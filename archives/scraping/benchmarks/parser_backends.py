@@ -0,0 +1,87 @@
+"""保存したページを使って、パーサ (html.parser / lxml) と部分パースの有無によるパース速度を比較する。
+
+ファイル名の先頭でどのパーサを使うかを判定する。
+    tonarinoyj*.html -> TonarinoyjParser
+    jumpplus*.html   -> JumpplusParser
+    shosetsu*.html   -> ShosetsuParser
+
+ページを指定しない場合は fixtures/pages 以下の全てのページを使う。
+
+Usage:
+    python -m benchmarks.parser_backends
+    python -m benchmarks.parser_backends ./pages/tonarinoyj_series.html ./pages/shosetsu_n2267be.html
+    python -m benchmarks.parser_backends ./pages/*.html --repeat 50
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import importlib.util
+import os
+import time
+from typing import Callable
+
+from libs.parser.base import BaseParser, ParserBackend
+from libs.parser.providers import JumpplusParser, ShosetsuParser, TonarinoyjParser
+
+FIXTURE_PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "pages")
+
+PARSERS: dict[str, tuple[type[BaseParser], Callable[[BaseParser], object]]] = {
+    "tonarinoyj": (TonarinoyjParser, lambda parser: parser.parse_ongoing_titles()),  # type: ignore
+    "jumpplus": (JumpplusParser, lambda parser: parser.parse_latest_episode_url()),  # type: ignore
+    "shosetsu": (ShosetsuParser, lambda parser: parser.parse_latest_episode_number_and_title()),  # type: ignore
+}
+
+
+def find_parser(filepath: str) -> tuple[type[BaseParser], Callable[[BaseParser], object]]:
+    filename = os.path.basename(filepath)
+    for provider, parser in PARSERS.items():
+        if filename.startswith(provider):
+            return parser
+    raise ValueError(f"Unknown provider page: {filepath}")
+
+
+def measure(
+    html: str,
+    parser_class: type[BaseParser],
+    parse: Callable[[BaseParser], object],
+    backend: ParserBackend,
+    partial: bool,
+    repeat: int,
+) -> float:
+    """1ページあたりのパース時間(秒)を返す。"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(parser_class(html, backend=backend, partial=partial))
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", default=sorted(glob.glob(os.path.join(FIXTURE_PAGES_DIR, "*.html"))))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    backends: list[ParserBackend] = ["html.parser"]
+    if importlib.util.find_spec("lxml") is not None:
+        backends.append("lxml")
+
+    print(f"{'page':<32} {'backend':<12} {'partial':<8} {'ms/page':>9} {'speedup':>8}")
+    for filepath in args.pages:
+        with open(filepath, encoding="utf-8") as f:
+            html = f.read()
+        parser_class, parse = find_parser(filepath)
+
+        baseline = None
+        for backend in backends:
+            for partial in (False, True):
+                elapsed = measure(html, parser_class, parse, backend, partial, args.repeat)
+                baseline = baseline or elapsed
+                print(
+                    f"{os.path.basename(filepath):<32} {backend:<12} {str(partial):<8} "
+                    f"{elapsed * 1000:>9.2f} {baseline / elapsed:>7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""作品数・話数を増やしたページで、各パーサのスループットとメモリ使用量を計測する。
+
+ページは tools.fixture_generator で生成するので、実際のWebサイトにアクセスせずに計測出来る。
+    tonarinoyj: 連載作品一覧の作品数を sizes にする
+    jumpplus:   話一覧の話数を sizes にする
+    shosetsu:   目次の話数を sizes にする (ページ分割無し)。目次の末尾だけを読む高速パス
+    shosetsu-list: shosetsu と同じページで、目次全体をパースする (高速パスが失敗した場合の処理)
+
+Usage:
+    python -m benchmarks.parser_throughput
+    python -m benchmarks.parser_throughput --sizes 100 1000 5000 --providers shosetsu --backend html.parser
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable
+
+from libs.parser.base import DEFAULT_BACKEND, ParserBackend
+from libs.parser.providers import JumpplusParser, ShosetsuParser, TonarinoyjParser
+from tools import fixture_generator
+
+# Webサイト: (ページを生成する関数, パースする関数)
+PROVIDERS: dict[str, tuple[Callable[[int], str], Callable[[str, ParserBackend, bool], object]]] = {
+    "tonarinoyj": (
+        fixture_generator.tonarinoyj_series_page,
+        lambda html, backend, partial: TonarinoyjParser(html, backend, partial).parse_ongoing_titles(),
+    ),
+    "jumpplus": (
+        fixture_generator.jumpplus_episode_page,
+        lambda html, backend, partial: JumpplusParser(html, backend, partial).parse_latest_episode_url(),
+    ),
+    "shosetsu": (
+        lambda size: fixture_generator.shosetsu_toc_page("n0000aa", size),
+        lambda html, backend, partial: ShosetsuParser(html, backend, partial).parse_latest_episode_number_and_title(),
+    ),
+    "shosetsu-list": (
+        lambda size: fixture_generator.shosetsu_toc_page("n0000aa", size),
+        lambda html, backend, partial: ShosetsuParser(html, backend, partial).parse_latest_episode_from_list(),
+    ),
+}
+
+# 1つの計測にかける時間の目安(秒)。小さいページは繰り返し回数を増やす
+TARGET_SECONDS = 1.0
+
+
+def measure_time(parse: Callable[[], object], max_repeat: int) -> tuple[float, int]:
+    """(1ページあたりの秒数, 繰り返した回数) を返す。"""
+    start = time.perf_counter()
+    parse()
+    first = time.perf_counter() - start
+    repeat = max(1, min(max_repeat, int(TARGET_SECONDS / max(first, 1e-6))))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse()
+    return (time.perf_counter() - start) / repeat, repeat
+
+
+def measure_peak_memory(parse: Callable[[], object]) -> int:
+    """1回パースする間のピークメモリ(バイト)を返す。"""
+    tracemalloc.start()
+    try:
+        parse()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--providers", nargs="+", choices=list(PROVIDERS), default=list(PROVIDERS))
+    parser.add_argument("--backend", choices=["lxml", "html.parser"], default=DEFAULT_BACKEND)
+    parser.add_argument("--full", action="store_true", help="部分パースせずに全体をパースする")
+    parser.add_argument("--max-repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"backend={args.backend} partial={not args.full}")
+    print(
+        f"{'provider':<13} {'size':>6} {'KiB':>8} {'ms/page':>9} {'pages/s':>8} {'MiB/s':>7} "
+        f"{'us/item':>8} {'peak MiB':>9} {'x html':>7}"
+    )
+    for provider in args.providers:
+        generate, parse_page = PROVIDERS[provider]
+        for size in args.sizes:
+            html = generate(size)
+            html_bytes = len(html.encode("utf-8"))
+
+            def parse() -> object:
+                return parse_page(html, args.backend, not args.full)
+
+            elapsed, _ = measure_time(parse, args.max_repeat)
+            peak = measure_peak_memory(parse)
+            print(
+                f"{provider:<13} {size:>6} {html_bytes / 1024:>8.0f} {elapsed * 1000:>9.2f} {1 / elapsed:>8.1f} "
+                f"{html_bytes / 2**20 / elapsed:>7.1f} {elapsed / size * 1e6:>8.1f} {peak / 2**20:>9.1f} "
+                f"{peak / html_bytes:>6.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Final, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_CACHE_TTL: Final = 10 * 60
+
+
+class PageCache:
+    """URL をキーにページのパース結果を保持するキャッシュ。
+
+    1回の実行の中で同じページを何度も読み込み・パースしないために使う。
+    """
+
+    def __init__(self, ttl: float = DEFAULT_PAGE_CACHE_TTL) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            ttl (float, optional): キャッシュの有効期間(秒)。デフォルトは DEFAULT_PAGE_CACHE_TTL 。
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # url: (有効期限, パース結果)
+        self._entries: dict[str, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Any | None:
+        """キャッシュされたパース結果を取得する。
+
+        Args:
+            url (str): 対象ページのURL。
+
+        Returns:
+            Any | None: パース結果。キャッシュが無い、または期限切れの場合は None 。
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(url, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def set(self, url: str, value: Any) -> None:
+        """パース結果をキャッシュする。
+
+        Args:
+            url (str): 対象ページのURL。
+            value (Any): パース結果。
+        """
+        with self._lock:
+            self._entries[url] = (time.monotonic() + self.ttl, value)
+
+    def get_or_parse(self, url: str, parse: Callable[[], T]) -> T:
+        """キャッシュがあればそれを返し、無ければ parse を呼んだ結果をキャッシュして返す。
+
+        Args:
+            url (str): 対象ページのURL。
+            parse (Callable[[], T]): ページを読み込みパースする関数。
+
+        Returns:
+            T: パース結果。
+        """
+        cached = self.get(url)
+        if cached is not None:
+            return cached
+        value = parse()
+        self.set(url, value)
+        return value
+
+    def clear(self) -> None:
+        """キャッシュとカウンタをリセットする。"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def summary(self) -> str:
+        """ヒット数・ミス数をまとめた文字列を返す。"""
+        return f"page cache: hits={self.hits} misses={self.misses} entries={len(self._entries)}"
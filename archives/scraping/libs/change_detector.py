@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import threading
+
+from libs import common
+from libs.db.db import DataBase
+
+PAGE_STATES_TABLE_INFO = """
+id integer unique primary key autoincrement,
+url string unique,
+etag string,
+last_modified string,
+content_hash string,
+checked_at string
+"""
+
+
+def hash_content(content: str) -> str:
+    """ページ(またはその一部)の内容のハッシュ値を返す。"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ChangeDetector:
+    """ページの内容が前回の実行から変わったかどうかを判定する。
+
+    URL ごとに ETag / Last-Modified と内容のハッシュ値を DB (page_states テーブル) に保存しておき、
+    条件付き GET のヘッダを作ったり、取得した内容が前回と同じかどうかを判定したりする。
+    変わっていないページはパースを省略できる。
+
+    NOTE: 複数のスレッドから使うため、DB には load() / save() の中でだけ接続する。
+    判定結果は save() を呼ぶまで DB に書き込まれないので、パース結果を DB に反映した後に呼ぶこと。
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            db_path (str): DBのパス。
+        """
+        self.db_path = db_path
+        # 判定したページ数、そのうち変わっていなかった(パースを省略した)ページ数
+        self.checked = 0
+        self.skipped = 0
+        # skipped のうち 304 Not Modified が返ってきたページ数
+        self.not_modified = 0
+        # url: 前回保存した状態
+        self._states: dict[str, common.PageStateChangeableValues] = {}
+        # url: 次に保存する状態
+        self._pending: dict[str, common.PageStateChangeableValues] = {}
+        # url: 代わりに変更を判定するページの URL (redirect() を参照)
+        self._redirects: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _open_db(self) -> DataBase:
+        return DataBase(
+            self.db_path,
+            common.PAGE_STATES_TABLE_NAME,
+            common.ALL_COLUMNS["page_states"],
+            common.UPDATABLE_COLUMNS["page_states"],
+            PAGE_STATES_TABLE_INFO,
+        )
+
+    def load(self, urls: list[str]) -> None:
+        """対象ページの前回の状態を DB からまとめて読み込む。
+
+        Args:
+            urls (list[str]): 対象ページの URL 。
+        """
+        db = self._open_db()
+        try:
+            states = db.select_in("url", urls)
+        finally:
+            db.close()
+        with self._lock:
+            self._states.update(states)  # type: ignore
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """条件付き GET に使うヘッダを返す。
+
+        Args:
+            url (str): 対象ページの URL 。
+
+        Returns:
+            dict[str, str]: If-None-Match / If-Modified-Since のヘッダ。前回の状態が無ければ空の辞書。
+        """
+        with self._lock:
+            state = self._states.get(url)
+        if state is None:
+            return {}
+
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]  # type: ignore
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]  # type: ignore
+        return headers
+
+    def has_changed(
+        self, url: str, content: str, etag: str | None = None, last_modified: str | None = None
+    ) -> bool:
+        """ページの内容が前回から変わったかどうかを判定する。
+
+        Args:
+            url (str): 対象ページの URL 。
+            content (str): ページの内容。ページ全体でなく、パースに使う部分だけでもよい。
+            etag (str | None, optional): レスポンスの ETag 。デフォルトは None 。
+            last_modified (str | None, optional): レスポンスの Last-Modified 。デフォルトは None 。
+
+        Returns:
+            bool: 変わっていれば True 。前回の状態が無い場合も True 。
+        """
+        content_hash = hash_content(content)
+        with self._lock:
+            state = self._states.get(url)
+            changed = state is None or state.get("content_hash") != content_hash
+            self._record(url, content_hash, etag, last_modified, changed)
+        return changed
+
+    def mark_not_modified(self, url: str) -> None:
+        """304 Not Modified が返ってきたページを、変わっていないページとして記録する。
+
+        Args:
+            url (str): 対象ページの URL 。
+        """
+        with self._lock:
+            state = self._states.get(url, {})
+            self.not_modified += 1
+            self._record(
+                url, state.get("content_hash", ""), state.get("etag"), state.get("last_modified"), changed=False
+            )
+
+    def redirect(self, url: str, to_url: str) -> None:
+        """url の変更を to_url の内容で判定するようにする。
+
+        小説家になろうの目次のようにページ分割されている場合、最初のページは新しい話が追加されても変わらないことがある。
+        その場合は最初のページの状態を保存せず (次回も必ず取得する)、最後のページで変更を判定する。
+        save() で url を指定すると to_url の状態を保存する。
+
+        Args:
+            url (str): 呼び出し側が対象にしているページの URL 。
+            to_url (str): 代わりに変更を判定するページの URL 。
+        """
+        with self._lock:
+            self._pending.pop(url, None)
+            self._redirects[url] = to_url
+
+    def _record(
+        self, url: str, content_hash: str, etag: str | None, last_modified: str | None, changed: bool
+    ) -> None:
+        # NOTE: self._lock を取得した状態で呼ぶこと
+        self.checked += 1
+        if not changed:
+            self.skipped += 1
+        self._pending[url] = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": content_hash,
+            "checked_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def save(self, urls: list[str] | None = None) -> None:
+        """判定したページの状態を DB に保存する。
+
+        Args:
+            urls (list[str] | None, optional): 保存するページの URL 。デフォルトは None (判定した全てのページ)。
+            NOTE: 他のWebサイトのクロールが失敗した場合に、その状態まで保存しないように指定する。
+        """
+        with self._lock:
+            if urls is not None:
+                urls = [self._redirects.get(url, url) for url in urls]
+            target_urls = list(self._pending.keys()) if urls is None else [url for url in urls if url in self._pending]
+            to_save = [self._pending.pop(url) for url in target_urls]
+            for state in to_save:
+                self._states[state["url"]] = state
+        if not to_save:
+            return
+
+        db = self._open_db()
+        try:
+            db.upsert_many(to_save, ("url",))  # type: ignore
+        finally:
+            db.close()
+
+    def summary(self) -> str:
+        """判定したページ数・省略したページ数をまとめた文字列を返す。"""
+        return (
+            f"change detection: checked={self.checked} skipped={self.skipped} "
+            f"(not modified={self.not_modified}, same hash={self.skipped - self.not_modified})"
+        )
@@ -8,9 +8,46 @@ PROVIDER_URLS: Final = {
     "shosetsu": "https://ncode.syosetu.com/",
 }
 
+# 各Webサイトのページ取得方法
+# selenium: ヘッドレスブラウザで取得する。JavaScript で描画されるページ向け。
+# http: requests で直接HTMLを取得する。静的なページ向け。
+FETCH_BACKEND = Literal["selenium", "http"]
+FETCH_BACKENDS: Final[dict[str, FETCH_BACKEND]] = {
+    "jumpplus": "selenium",
+    "tonarinoyj": "http",
+    "shosetsu": "http",
+}
+
+# selenium で取得する場合にヘッドレスで起動するかどうか
+# NOTE: ジャンププラスはヘッドレスだと話一覧が読み込まれないことがある
+HEADLESS_BROWSER: Final = {
+    "jumpplus": False,
+    "tonarinoyj": True,
+    "shosetsu": True,
+}
+
+# 常駐モード (main.py --daemon) でクロールする間隔(秒)
+# NOTE: となりのヤングジャンプ・ジャンププラスは決まった時刻にまとめて更新されるので、小説家になろうより間隔を空ける
+CRAWL_INTERVALS: Final = {
+    "jumpplus": 60 * 60,
+    "tonarinoyj": 60 * 60,
+    "shosetsu": 30 * 60,
+}
+
+# 通知に使うWebサイトの名前
+PROVIDER_NAMES: Final = {
+    "tonarinoyj": "となりのヤングジャンプ",
+    "jumpplus": "少年ジャンププラス",
+    "shosetsu": "小説家になろう",
+}
+
 SHOSETSU_TABLE_NAME: Final = "shosetsu"
 JUMPPLUS_TABLE_NAME: Final = "jumpplus"
 TONARINOYJ_TABLE_NAME: Final = "tonarinoyj"
+# ページの変更検知に使うテーブル (全てのWebサイトで共通)
+PAGE_STATES_TABLE_NAME: Final = "page_states"
+# 見つけたエピソードの履歴 (追記のみ。全てのWebサイトで共通)
+EPISODE_HISTORY_TABLE_NAME: Final = "episode_history"
 
 ALL_COLUMNS: Final = {
     "jumpplus": ("id", "title", "first_episode_url", "latest_episode_title", "latest_episode_url"),
@@ -22,6 +59,8 @@ ALL_COLUMNS: Final = {
         "latest_episode_number",
         "latest_episode_title",
     ),
+    "page_states": ("id", "url", "etag", "last_modified", "content_hash", "checked_at"),
+    "episode_history": ("id", "provider", "title", "episode_title", "episode_url", "episode_number", "seen_at"),
 }
 
 UPDATABLE_COLUMNS: Final = {
@@ -33,6 +72,9 @@ UPDATABLE_COLUMNS: Final = {
         "latest_episode_number",
         "latest_episode_title",
     ),
+    "page_states": ("url", "etag", "last_modified", "content_hash", "checked_at"),
+    # NOTE: 追記のみなので更新するカラムは無いが、insert の検証用に挿入するカラムを持っておく
+    "episode_history": ("provider", "title", "episode_title", "episode_url", "episode_number", "seen_at"),
 }
 
 LOGICAL_OPERATOR = Literal["AND", "OR"]
@@ -63,4 +105,27 @@ class ShosetsuChangeableValues(TypedDict, total=False):
     latest_episode_title: str
 
 
-CHANGEABLE_VALUES = Union[JumpplusChangeableValues, TonarinoyjChangeableValues, ShosetsuChangeableValues]
+class PageStateChangeableValues(TypedDict, total=False):
+    url: str
+    etag: str | None
+    last_modified: str | None
+    content_hash: str
+    checked_at: str
+
+
+class EpisodeHistoryValues(TypedDict, total=False):
+    provider: str
+    title: str
+    episode_title: str
+    episode_url: str
+    episode_number: int | None
+    seen_at: str
+
+
+CHANGEABLE_VALUES = Union[
+    JumpplusChangeableValues,
+    TonarinoyjChangeableValues,
+    ShosetsuChangeableValues,
+    PageStateChangeableValues,
+    EpisodeHistoryValues,
+]
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Final
+
+DEFAULT_BUSY_TIMEOUT_MS: Final = 5000
+# 負の値は KiB 単位 (約 16MB)
+DEFAULT_CACHE_SIZE_KIB: Final = -16 * 1024
+
+
+@dataclass(frozen=True)
+class ConnectionSettings:
+    """接続を開く時に設定する PRAGMA など。
+
+    NOTE: デフォルトは複数のスレッドから同時に書き込む用途に合わせている。
+    journal_mode が WAL だと読み込みと書き込みが互いをブロックしない。
+    synchronous は WAL なら NORMAL でもコミット済みのデータは壊れない。(電源断で直前のコミットが失われることはある)
+    """
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size: int = DEFAULT_CACHE_SIZE_KIB
+    busy_timeout: int = DEFAULT_BUSY_TIMEOUT_MS
+    temp_store: str = "MEMORY"
+    # NOTE: 暗黙のトランザクションを BEGIN IMMEDIATE で始め、書き込みロックを最初に取る。
+    # DEFERRED だと読み込みから書き込みへの昇格時に他の書き込みと衝突し、busy_timeout を待たずに "database is locked" になる
+    isolation_level: str = "IMMEDIATE"
+
+
+# sqlite3.connect() のデフォルトに近い設定 (比較用)
+LEGACY_SETTINGS: Final = ConnectionSettings(
+    journal_mode="DELETE", synchronous="FULL", cache_size=-2000, busy_timeout=5000, temp_store="DEFAULT", isolation_level=""
+)
+
+
+class Connection(sqlite3.Connection):
+    """トランザクションのネストの深さを持つ sqlite3.Connection 。
+
+    同じスレッドの複数の DataBase インスタンスで接続を共有するため、深さは接続側で持つ。
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.transaction_depth = 0
+
+
+class ConnectionManager:
+    """1つの DB ファイルへの接続をスレッドごとに1つ保持して使い回す。
+
+    sqlite3 の接続は作成したスレッドでしか使えないので、スレッドごとに接続を作りプールする。
+    同じスレッドでは DataBase を何度作っても同じ接続を使う。
+
+    Usage:
+        manager = get_connection_manager("./db/DATA.db")
+        connection = manager.connection()
+        ...
+        manager.close_all()
+    """
+
+    def __init__(self, db_path: str, settings: ConnectionSettings | None = None) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            db_path (str): DBのパス。
+            settings (ConnectionSettings | None, optional): 接続の設定。デフォルトは None (ConnectionSettings())。
+        """
+        self.db_path = db_path
+        self.settings = settings if settings is not None else ConnectionSettings()
+        self._local = threading.local()
+        # close_all() で閉じるために、全てのスレッドの接続を保持しておく
+        self._connections: list[Connection] = []
+        self._lock = threading.Lock()
+
+    def connection(self) -> Connection:
+        """このスレッド用の接続を返す。無ければ作成する。
+
+        Returns:
+            Connection: 接続。
+        """
+        connection: Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _connect(self) -> Connection:
+        settings = self.settings
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=settings.busy_timeout / 1000,
+            isolation_level=settings.isolation_level,
+            # NOTE: 接続は作成したスレッドでしか使わないが、close_all() で他のスレッドから閉じられるようにする
+            check_same_thread=False,
+            factory=Connection,
+        )
+        # NOTE: journal_mode の変更はロックが必要で、他の接続が書き込み中だと失敗するので変わる場合だけ設定する
+        # (WAL はファイルに保存されるので、2つ目以降の接続では設定不要)
+        current_journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+        if current_journal_mode.lower() != settings.journal_mode.lower():
+            connection.execute(f"PRAGMA journal_mode={settings.journal_mode}")
+        connection.execute(f"PRAGMA synchronous={settings.synchronous}")
+        connection.execute(f"PRAGMA cache_size={settings.cache_size}")
+        connection.execute(f"PRAGMA busy_timeout={settings.busy_timeout}")
+        connection.execute(f"PRAGMA temp_store={settings.temp_store}")
+        return connection  # type: ignore
+
+    @property
+    def number_of_connections(self) -> int:
+        return len(self._connections)
+
+    def close_all(self) -> None:
+        """全てのスレッドの接続を閉じる。
+        NOTE: 他のスレッドで使用中の接続も閉じるので、全ての処理が終わってから呼ぶこと。
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+            # NOTE: 閉じた接続を使わないように、以降は各スレッドで新しく接続を作る
+            self._local = threading.local()
+        for connection in connections:
+            connection.close()
+
+
+_managers: dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: str, settings: ConnectionSettings | None = None) -> ConnectionManager:
+    """DB ファイルごとに共有される ConnectionManager を返す。
+
+    Args:
+        db_path (str): DBのパス。
+        settings (ConnectionSettings | None, optional): 初めて作成する場合の接続の設定。
+        NOTE: 既に作成済みの場合は無視される。デフォルトは None 。
+
+    Returns:
+        ConnectionManager: db_path に対応する ConnectionManager 。
+    """
+    # ":memory:" は接続ごとに別の DB になるので共有しない
+    if db_path == ":memory:":
+        return ConnectionManager(db_path, settings)
+
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = ConnectionManager(db_path, settings)
+            _managers[key] = manager
+        return manager
+
+
+def close_all_connections() -> None:
+    """get_connection_manager() で作成した全ての接続を閉じる。"""
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        manager.close_all()
@@ -26,7 +26,7 @@ def create_shosetsu_table(database_path: str, insert_values: list[common.Shosets
         table_info,
     )
 
-    [db.insert(i) for i in insert_values]
+    db.insert_many(insert_values)
 
 
 def create_tonarinoyj_table(database_path: str, insert_values: list[common.TonarinoyjChangeableValues]) -> None:
@@ -52,7 +52,7 @@ def create_tonarinoyj_table(database_path: str, insert_values: list[common.Tonar
         table_info,
     )
 
-    [db.insert(i) for i in insert_values]
+    db.insert_many(insert_values)
 
 
 def create_jumpplus_table(database_path: str, insert_values: list[common.JumpplusChangeableValues]) -> None:
@@ -79,4 +79,4 @@ def create_jumpplus_table(database_path: str, insert_values: list[common.Jumpplu
         table_info,
     )
 
-    [db.insert(i) for i in insert_values]
+    db.insert_many(insert_values)
@@ -1,9 +1,28 @@
 from __future__ import annotations
 
+import collections
+import functools
 import sqlite3
-from typing import Literal
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Literal, Union
 
 from libs import common
+from libs.profiler import profiler
+
+from .connection import Connection, ConnectionManager, get_connection_manager
+
+# NOTE: SQLITE_MAX_VARIABLE_NUMBER は古いバージョンだと 999 なので、それを超えないように分割する
+MAX_PLACEHOLDERS_PER_QUERY = 900
+# iter_select で1度に fetchmany する行数
+DEFAULT_FETCH_SIZE = 1000
+
+# select の結果の形式
+# dict: カラム名をキーとする辞書 (デフォルト)
+# tuple: sqlite3 が返すタプルのまま。変換しないので最も速い
+# row: sqlite3.Row 。インデックスとカラム名の両方でアクセス出来る
+# namedtuple: カラムの組み合わせごとにキャッシュした namedtuple 。属性でアクセス出来る
+ROW_FORMAT = Literal["dict", "tuple", "row", "namedtuple"]
+Record = Union[common.CHANGEABLE_VALUES, tuple, sqlite3.Row]
 
 
 class DBError(Exception):
@@ -24,6 +43,41 @@ def dict_factory(cursor: sqlite3.Cursor, row: sqlite3.Row) -> dict:
     return result
 
 
+@functools.lru_cache(maxsize=128)
+def namedtuple_class(columns: tuple[str, ...]) -> type:
+    """カラムの組み合わせに対応する namedtuple のクラスを返す。(組み合わせごとにキャッシュする)
+
+    Args:
+        columns (tuple[str, ...]): カラム名。
+        NOTE: 識別子として使えないカラム名 (COUNT(*) など) は _0, _1 ... に置き換えられる。
+
+    Returns:
+        type: namedtuple のクラス。
+    """
+    return collections.namedtuple("Record", columns, rename=True)
+
+
+def convert_rows(description: tuple, rows: Iterable[tuple], row_format: ROW_FORMAT) -> list[Any]:
+    """sqlite3 が返したタプルの行を row_format の形式に変換する。
+    NOTE: dict_factory と違い、カラム名の取得は行ごとでなく1回だけ行う。
+
+    Args:
+        description (tuple): cursor.description 。
+        rows (Iterable[tuple]): 変換する行。
+        NOTE: カーソルをそのまま渡すと、タプルのリストを作らずに変換するのでピークメモリが減る。
+        row_format (ROW_FORMAT): 変換後の形式。"row" の場合は cursor.row_factory で変換済みなのでそのまま返す。
+
+    Returns:
+        list[Any]: 変換した行。
+    """
+    if row_format in ("tuple", "row"):
+        return list(rows)
+    columns = tuple(column[0] for column in description)
+    if row_format == "namedtuple":
+        return list(map(namedtuple_class(columns)._make, rows))
+    return [dict(zip(columns, row)) for row in rows]
+
+
 class DataBase:
     """データベースを抽象化するクラス。"""
 
@@ -34,6 +88,8 @@ class DataBase:
         columns: tuple[str, ...],
         updatable_columns: tuple[str, ...],
         table_info: str | None = None,
+        connection_manager: ConnectionManager | None = None,
+        row_format: ROW_FORMAT = "dict",
     ) -> None:
         """インスタンスの初期化。
 
@@ -43,15 +99,24 @@ class DataBase:
             columns (tuple[str, ...]): 全てのカラム名。
             updatable_columns (tuple[str, ...]): 更新可能なカラム名。
             table_info (str | None, optional): 作成するテーブルのカラム情報を持つクエリ。デフォルトは None 。
+            connection_manager (ConnectionManager | None, optional): 接続を取得するマネージャ。
+            デフォルトは None (get_connection_manager(db_path) で db_path ごとに共有されるものを使う)。
+            row_format (ROW_FORMAT, optional): select / iter_select の結果の形式。デフォルトは "dict" 。
         """
-        self.connection = sqlite3.connect(db_path)
-        # select の結果を辞書に変更する
-        self.connection.row_factory = dict_factory
+        self.connection_manager = (
+            connection_manager if connection_manager is not None else get_connection_manager(db_path)
+        )
+        # NOTE: 同じスレッドの他のインスタンスと接続を共有する
+        self.connection: Connection = self.connection_manager.connection()
         self.cursor = self.connection.cursor()
+        # select の結果を辞書に変更する
+        # NOTE: 接続は共有しているので、接続ではなくカーソルに設定する
+        self.cursor.row_factory = dict_factory
 
         self.table_name = table_name
         self.columns = columns
         self.updatable_columns = updatable_columns
+        self.row_format = row_format
 
         self.create_table_if_not_exists(table_name, table_info)
 
@@ -82,26 +147,65 @@ class DataBase:
         Returns:
             bool: テーブルが存在するかどうかを表す真偽値。
         """
-        self.cursor.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE TYPE='table' AND name='{table_name}'")
+        self.cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE TYPE='table' AND name=?", (table_name,))
         # NOTE: 返り値は {クエリ: 値} の辞書
         return False if self.cursor.fetchone()["COUNT(*)"] == 0 else True
 
     def close(self) -> None:
-        """接続を閉じる。"""
+        """カーソルを閉じる。
+        NOTE: 接続は他のインスタンスと共有しているので閉じない。接続を閉じる場合は connection_manager.close_all() を呼ぶこと。
+        """
         self.cursor.close()
-        self.connection.close()
+
+    @property
+    def _transaction_depth(self) -> int:
+        # NOTE: 接続を共有する他のインスタンスの transaction() の中でもコミットを遅延させるため、接続側で持つ
+        return self.connection.transaction_depth
+
+    @_transaction_depth.setter
+    def _transaction_depth(self, depth: int) -> None:
+        self.connection.transaction_depth = depth
 
     def _commit(self) -> None:
-        """DBに加えた変更をコミットする。"""
+        """DBに加えた変更をコミットする。
+        NOTE: transaction() の中ではコミットせず、ブロックを抜ける時にまとめてコミットする。
+        """
+        if self._transaction_depth > 0:
+            return
         self.connection.commit()
 
+    @contextmanager
+    def transaction(self) -> Iterator[DataBase]:
+        """ブロック内の変更を1つのトランザクションとして扱う。
+
+        ブロック内で呼ばれた insert / update / delete はコミットされず、
+        ブロックを正常に抜けた時に1度だけコミットする。例外が発生した場合はロールバックする。
+        NOTE: ネストした場合は最も外側のブロックでコミットする。
+
+        Yields:
+            DataBase: 自身のインスタンス。
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self.connection.rollback()
+            raise
+        else:
+            self._transaction_depth -= 1
+            self._commit()
+
+    @profiler.profiled("db.select")
     def select(
         self,
         columns: tuple[str, ...],
         where: dict[str, str | int] | None = None,
         limit: int | None = None,
         where_logical_operator: common.LOGICAL_OPERATOR = "AND",
-    ) -> list[common.CHANGEABLE_VALUES]:
+        row_format: ROW_FORMAT | None = None,
+    ) -> list[Record]:
         """SELECT クエリを実行する。
 
         Args:
@@ -111,34 +215,130 @@ class DataBase:
             NOTE: WHERE column = value にしか対応していない。
             limit (int | None, optional): 取得するデータ数。 デフォルトは None.
             where_logical_operator (common.LOGICAL_OPERATOR, optional): WHERE につかう論理演算子。 デフォルトは "AND" 。
+            row_format (ROW_FORMAT | None, optional): 結果の形式。デフォルトは None (self.row_format)。
 
         Returns:
-            list[common.CHANGEABLE_VALUES]: 取得したデータ(辞書形式)のリスト。
+            list[Record]: 取得したデータ(row_format の形式)のリスト。
+        """
+        row_format = row_format or self.row_format
+        cursor = self._execute_select(columns, where, limit, where_logical_operator, row_format)
+        try:
+            return convert_rows(cursor.description, cursor, row_format)
+        finally:
+            cursor.close()
+
+    def iter_select(
+        self,
+        columns: tuple[str, ...],
+        where: dict[str, str | int] | None = None,
+        where_logical_operator: common.LOGICAL_OPERATOR = "AND",
+        row_format: ROW_FORMAT | None = None,
+        fetch_size: int = DEFAULT_FETCH_SIZE,
+    ) -> Iterator[Record]:
+        """SELECT クエリを実行し、結果を fetch_size 行ずつ取得しながら1行ずつ返す。
+        NOTE: fetchall() と違い全ての行を一度にメモリに載せないので、大きなテーブルを走査する場合に使う。
+
+        Args:
+            columns (tuple[str, ...]): 取得したいカラム名。
+            where (dict[str, str  |  int] | None, optional): WHERE の条件。デフォルトは None 。
+            where_logical_operator (common.LOGICAL_OPERATOR, optional): WHERE につかう論理演算子。 デフォルトは "AND" 。
+            row_format (ROW_FORMAT | None, optional): 結果の形式。デフォルトは None (self.row_format)。
+            fetch_size (int, optional): 1度に fetchmany する行数。デフォルトは DEFAULT_FETCH_SIZE 。
+
+        Yields:
+            Record: 取得したデータ(row_format の形式)。
+        """
+        row_format = row_format or self.row_format
+        cursor = self._execute_select(columns, where, None, where_logical_operator, row_format)
+        try:
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    return
+                yield from convert_rows(cursor.description, rows, row_format)
+        finally:
+            cursor.close()
+
+    def _execute_select(
+        self,
+        columns: tuple[str, ...],
+        where: dict[str, str | int] | None,
+        limit: int | None,
+        where_logical_operator: common.LOGICAL_OPERATOR,
+        row_format: ROW_FORMAT,
+    ) -> sqlite3.Cursor:
+        """SELECT クエリを実行したカーソルを返す。
+        NOTE: self.cursor とは別のカーソルを使う。iter_select の途中で他のクエリを実行しても結果が壊れないようにするため。
         """
         if where:
             self.verify_where_statements(where)
 
-        query = f"SELECT {self.column_to_query(columns)} FROM {self.table_name}"
-        # オプショナルな引数を渡されたていた場合queryに追加していく
-        # NOTE: 間の空白を忘れないこと
-        query = (
-            query + f" WHERE {self.to_where_statements(where, where_logical_operator)}" if where is not None else query
+        # NOTE: 値はプレースホルダで渡すので、クエリ文字列は (カラム, WHERE のキー, 演算子) が同じなら常に同一になる
+        query = self._select_query(
+            self.table_name,
+            columns,
+            tuple(where.keys()) if where else (),
+            where_logical_operator,
+            bool(limit),
         )
-        query = query + f" LIMIT {limit}" if limit else query
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        parameters = list(where.values()) if where else []
+        if limit:
+            parameters.append(limit)
+
+        cursor = self.connection.cursor()
+        # NOTE: 変換はまとめて convert_rows で行うので、sqlite3.Row 以外はタプルのまま取得する
+        cursor.row_factory = sqlite3.Row if row_format == "row" else None
+        cursor.execute(query, parameters)
+        return cursor
+
+    @profiler.profiled("db.select_in")
+    def select_in(
+        self,
+        column: str,
+        values: list[str] | list[int],
+        columns: tuple[str, ...] = ("*",),
+    ) -> dict[str | int, common.CHANGEABLE_VALUES]:
+        """WHERE column IN (...) で複数のレコードを1度に取得する。
+
+        Args:
+            column (str): 検索対象のカラム。返り値の辞書のキーにもなるので、UNIQUE なカラムを指定すること。
+            values (list[str] | list[int]): 検索対象値のリスト。
+            columns (tuple[str, ...], optional): 取得したいカラム名。デフォルトは ("*",) 。
+            NOTE: column が含まれていなければ追加して取得する。
 
-    def select_last(self, columns: tuple[str, ...]) -> common.CHANGEABLE_VALUES:
+        Raises:
+            InvalidColumnError: 無効なカラムが指定された時。
+
+        Returns:
+            dict[str | int, common.CHANGEABLE_VALUES]: column の値をキー、取得したデータ(辞書形式)を値とする辞書。
+            NOTE: 見つからなかった値はキーに含まれない。
+        """
+        self.verify_where_statements({column: ""})
+        if "*" not in columns and column not in columns:
+            columns = (*columns, column)
+
+        records: dict[str | int, common.CHANGEABLE_VALUES] = {}
+        unique_values = list(dict.fromkeys(values))
+        for i in range(0, len(unique_values), MAX_PLACEHOLDERS_PER_QUERY):
+            chunk = unique_values[i : i + MAX_PLACEHOLDERS_PER_QUERY]
+            self.cursor.execute(self._select_in_query(self.table_name, columns, column, len(chunk)), chunk)
+            for record in self.cursor.fetchall():
+                records[record[column]] = record
+        return records
+
+    def select_last(self, columns: tuple[str, ...], row_format: ROW_FORMAT | None = None) -> Record:
         """対象カラムの最後のレコードを取得。
 
         Args:
             columns (str): 対象カラム。
+            row_format (ROW_FORMAT | None, optional): 結果の形式。デフォルトは None (self.row_format)。
 
         Returns:
-            tuple: 取得したデータ。
+            Record: 取得したデータ。
         """
-        return self.select(columns, limit=1)[0]
+        return self.select(columns, limit=1, row_format=row_format)[0]
 
+    @profiler.profiled("db.insert")
     def insert(self, to_insert_values: common.CHANGEABLE_VALUES) -> None:
         """レコードをテーブルに挿入する。
 
@@ -166,6 +366,92 @@ class DataBase:
         self.cursor.execute(query, insert_data)
         self._commit()
 
+    @profiler.profiled("db.insert_many")
+    def insert_many(self, to_insert_values: list[common.CHANGEABLE_VALUES], ignore_duplicates: bool = False) -> int:
+        """複数のレコードをまとめてテーブルに挿入する。
+        NOTE: 全てのレコードは同じカラムを持つ必要がある。
+
+        Args:
+            to_insert_values (list[common.CHANGEABLE_VALUES]): 挿入するデータのリスト。
+            ignore_duplicates (bool, optional): UNIQUE 制約に違反するレコードを無視するかどうか。(INSERT OR IGNORE)
+            デフォルトは False 。
+
+        Raises:
+            InvalidColumnError: レコード間でカラムが揃っていない場合。
+
+        Returns:
+            int: 挿入したレコード数。
+        """
+        if not to_insert_values:
+            return 0
+
+        columns = tuple(to_insert_values[0].keys())
+        placeholders = ",".join("?" * len(columns))
+        insert = "INSERT OR IGNORE" if ignore_duplicates else "INSERT"
+        query = f"{insert} INTO {self.table_name}({self.column_to_query(columns)}) VALUES({placeholders})"
+
+        self.cursor.executemany(query, self._to_parameters(columns, to_insert_values))
+        self._commit()
+        # NOTE: executemany の rowcount は各行の変更数の合計なので、無視されたレコードは含まれない
+        return self.cursor.rowcount
+
+    @profiler.profiled("db.execute")
+    def execute(self, query: str, parameters: tuple[str | int, ...] | list[str | int] = ()) -> int:
+        """任意の変更クエリ (DELETE / CREATE INDEX など) を実行する。
+        NOTE: 値は必ずプレースホルダで渡すこと。
+
+        Args:
+            query (str): 実行するクエリ。
+            parameters (tuple[str | int, ...] | list[str | int], optional): プレースホルダに渡す値。デフォルトは () 。
+
+        Returns:
+            int: 変更したレコード数。
+        """
+        self.cursor.execute(query, parameters)
+        self._commit()
+        return self.cursor.rowcount
+
+    @profiler.profiled("db.upsert_many")
+    def upsert_many(
+        self, to_upsert_values: list[common.CHANGEABLE_VALUES], conflict_columns: tuple[str, ...]
+    ) -> None:
+        """複数のレコードをまとめて挿入し、既に存在するレコードは更新する。
+        NOTE: conflict_columns には UNIQUE 制約を持つカラムを指定すること。
+
+        Args:
+            to_upsert_values (list[common.CHANGEABLE_VALUES]): 挿入/更新するデータのリスト。
+            conflict_columns (tuple[str, ...]): 重複を判定するカラム。
+
+        Raises:
+            InvalidColumnError: 無効なカラムが含まれていた時、またはレコード間でカラムが揃っていない場合。
+        """
+        if not to_upsert_values:
+            return
+
+        columns = tuple(to_upsert_values[0].keys())
+        self.verify_value_to_update(to_upsert_values[0])
+        for column in conflict_columns:
+            if column not in columns:
+                raise InvalidColumnError(f"The conflict column '{column}' is doesn't exist in {columns}.")
+
+        placeholders = ",".join("?" * len(columns))
+        # 重複した場合は conflict_columns 以外のカラムを挿入しようとした値で更新する
+        # query: INSERT INTO table(c1, c2) VALUES(?, ?) ON CONFLICT(c1) DO UPDATE SET c2=excluded.c2
+        to_update_columns = [column for column in columns if column not in conflict_columns]
+        on_conflict = (
+            "DO UPDATE SET " + ", ".join(f"{column}=excluded.{column}" for column in to_update_columns)
+            if to_update_columns
+            else "DO NOTHING"
+        )
+        query = (
+            f"INSERT INTO {self.table_name}({self.column_to_query(columns)}) VALUES({placeholders})"
+            f" ON CONFLICT({self.column_to_query(conflict_columns)}) {on_conflict}"
+        )
+
+        self.cursor.executemany(query, self._to_parameters(columns, to_upsert_values))
+        self._commit()
+
+    @profiler.profiled("db.update")
     def update(
         self,
         to_update: common.CHANGEABLE_VALUES,
@@ -184,15 +470,47 @@ class DataBase:
         self.verify_value_to_update(to_update)
         self.verify_where_statements(where)
 
-        query = f"""
-            UPDATE {self.table_name}
-            SET {self.to_set_statements(to_update)}
-            WHERE {self.to_where_statements(where, where_logical_operator)}
-            """
-        self.connection.execute(query)
+        query = self._update_query(
+            self.table_name, tuple(to_update.keys()), tuple(where.keys()), where_logical_operator
+        )
+        self.cursor.execute(query, [*to_update.values(), *where.values()])
 
         self._commit()
 
+    @profiler.profiled("db.update_many")
+    def update_many(self, to_updates: list[common.CHANGEABLE_VALUES], where_column: str) -> None:
+        """複数のレコードを1つのトランザクションでまとめて更新する。
+
+        Args:
+            to_updates (list[common.CHANGEABLE_VALUES]): 更新する値の辞書のリスト。
+            NOTE: 各辞書は where_column の値を含むこと。where_column 以外の値で WHERE where_column = 値 のレコードを更新する。
+            where_column (str): 更新対象のレコードを特定するカラム。
+
+        Raises:
+            InvalidColumnError: 無効なカラムが含まれていた時、または where_column の値が含まれていない時。
+        """
+        # 更新するカラムの組み合わせごとにまとめて executemany する
+        parameters_by_columns: dict[tuple[str, ...], list[tuple[str | int, ...]]] = {}
+        for to_update in to_updates:
+            self.verify_value_to_update(to_update)
+            try:
+                where_value = to_update[where_column]  # type: ignore
+            except KeyError:
+                raise InvalidColumnError(f"The column '{where_column}' is doesn't exist in {to_update}.")
+            set_columns = tuple(key for key in to_update.keys() if key != where_column)
+            if not set_columns:
+                continue
+            parameters_by_columns.setdefault(set_columns, []).append(
+                (*(to_update[key] for key in set_columns), where_value)  # type: ignore
+            )
+
+        self.verify_where_statements({where_column: ""})
+        with self.transaction():
+            for set_columns, parameters in parameters_by_columns.items():
+                query = self._update_query(self.table_name, set_columns, (where_column,), "AND")
+                self.cursor.executemany(query, parameters)
+
+    @profiler.profiled("db.delete")
     def delete(self, where: dict[str, str | int], where_logical_operator: common.LOGICAL_OPERATOR = "AND") -> None:
         """レコードを削除する。
 
@@ -204,14 +522,37 @@ class DataBase:
         """
         self.verify_where_statements(where)
 
-        query = f"""
-            DELETE FROM {self.table_name}
-            WHERE {self.to_where_statements(where, where_logical_operator)}
-            """
-        self.connection.execute(query)
+        query = self._delete_query(self.table_name, tuple(where.keys()), where_logical_operator)
+        self.cursor.execute(query, list(where.values()))
 
         self._commit()
 
+    @classmethod
+    def _to_parameters(
+        cls, columns: tuple[str, ...], records: list[common.CHANGEABLE_VALUES]
+    ) -> list[tuple[str | int, ...]]:
+        """レコードのリストを executemany に渡せるパラメータのリストに変換する。
+
+        Args:
+            columns (tuple[str, ...]): パラメータに並べるカラムの順番。
+            records (list[common.CHANGEABLE_VALUES]): 変換するレコードのリスト。
+
+        Raises:
+            InvalidColumnError: レコード間でカラムが揃っていない場合。
+
+        Returns:
+            list[tuple[str | int, ...]]: columns の順に値を並べたタプルのリスト。
+        """
+        parameters = []
+        for record in records:
+            if len(record) != len(columns):
+                raise InvalidColumnError(f"The columns of {record} don't match {columns}.")
+            try:
+                parameters.append(tuple(record[column] for column in columns))  # type: ignore
+            except KeyError as e:
+                raise InvalidColumnError(f"The column {e} is doesn't exist in {record}.")
+        return parameters
+
     @classmethod
     def column_to_query(cls, columns: tuple[str, ...]) -> str:
         """Tuple形式のカラムをSQLクエリで使える文字列にフォーマットする。
@@ -233,42 +574,107 @@ class DataBase:
         return query.translate(str.maketrans({"'": None, "(": None, ")": None}))
 
     @classmethod
-    def to_set_statements(cls, to_update: common.CHANGEABLE_VALUES) -> str:
-        """辞書をクエリで使える SET 句文字列にフォーマットする。
+    def to_set_statements(cls, columns: tuple[str, ...]) -> str:
+        """カラムをクエリで使える SET 句文字列にフォーマットする。
+        NOTE: 値はプレースホルダ `?` になるので、カラムの順に値をパラメータとして渡すこと。
 
         Args:
-            to_update (common.CHANGEABLE_VALUES): 更新する値の辞書。
+            columns (tuple[str, ...]): 更新するカラム。
 
         Returns:
-            str: key = value, key2 = value2, ... 形式の文字列。
+            str: key=?, key2=?, ... 形式の文字列。
         """
-        queries = []
-        for key, value in to_update.items():
-            # value が文字列型なら ''シングルクォーテーション で囲み、そうでないならそのまま
-            query = f"{key}='{value}'" if type(value) == str else f"{key}={value}"
-            queries.append(query)
-        return ", ".join(queries)
+        return ", ".join(f"{column}=?" for column in columns)
 
     @classmethod
-    def to_where_statements(
-        cls, to_where: dict[str, str | int], where_logical_operator: Literal["AND", "OR"] = "AND"
-    ) -> str:
-        """辞書をクエリで使える WHERE 句文字列にフォーマットする。
-        NOTE: `=` にしか対応していない。
+    def to_where_statements(cls, columns: tuple[str, ...], where_logical_operator: Literal["AND", "OR"] = "AND") -> str:
+        """カラムをクエリで使える WHERE 句文字列にフォーマットする。
+        NOTE: `=` にしか対応していない。値はプレースホルダ `?` になるので、カラムの順に値をパラメータとして渡すこと。
 
         Args:
-            to_where (dict[str, str  |  int]): WHERE の条件。キーを対象カラム、値を検索対象値とした辞書で指定する。 デフォルトは None.
-            where_logical_operator (Literal[&quot;AND&quot;, &quot;OR&quot;], optional)\n
-                :WHERE につかう論理演算子。 デフォルトは "AND" 。
+            columns (tuple[str, ...]): WHERE の条件に使うカラム。
+            where_logical_operator (Literal["AND", "OR"], optional): WHERE につかう論理演算子。 デフォルトは "AND" 。
+
+        Returns:
+            str: key=? AND/OR key2=? 形式の文字列。
+        """
+        return f" {where_logical_operator} ".join(f"{column}=?" for column in columns)
+
+    # NOTE: 以下のクエリはクエリの形 (テーブル, カラム, WHERE のキー, 演算子) ごとにキャッシュする。
+    # 同じ形なら同一のクエリ文字列が返るため、sqlite3 のステートメントキャッシュ (Connection の cached_statements) にもヒットする。
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _select_query(
+        cls,
+        table_name: str,
+        columns: tuple[str, ...],
+        where_columns: tuple[str, ...],
+        where_logical_operator: common.LOGICAL_OPERATOR,
+        has_limit: bool,
+    ) -> str:
+        """SELECT クエリを組み立てる。
+
+        Returns:
+            str: SELECT columns FROM table [WHERE key=? ...] [LIMIT ?] 形式の文字列。
+        """
+        query = f"SELECT {cls.column_to_query(columns)} FROM {table_name}"
+        # NOTE: 間の空白を忘れないこと
+        if where_columns:
+            query += f" WHERE {cls.to_where_statements(where_columns, where_logical_operator)}"
+        if has_limit:
+            query += " LIMIT ?"
+        return query
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _select_in_query(
+        cls,
+        table_name: str,
+        columns: tuple[str, ...],
+        where_column: str,
+        number_of_values: int,
+    ) -> str:
+        """WHERE column IN (...) の SELECT クエリを組み立てる。
+
+        Returns:
+            str: SELECT columns FROM table WHERE column IN (?, ?, ...) 形式の文字列。
+        """
+        placeholders = ",".join("?" * number_of_values)
+        return f"SELECT {cls.column_to_query(columns)} FROM {table_name} WHERE {where_column} IN ({placeholders})"
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _update_query(
+        cls,
+        table_name: str,
+        set_columns: tuple[str, ...],
+        where_columns: tuple[str, ...],
+        where_logical_operator: common.LOGICAL_OPERATOR,
+    ) -> str:
+        """UPDATE クエリを組み立てる。
+
+        Returns:
+            str: UPDATE table SET key=?, ... WHERE key=? ... 形式の文字列。
+        """
+        return (
+            f"UPDATE {table_name} SET {cls.to_set_statements(set_columns)}"
+            f" WHERE {cls.to_where_statements(where_columns, where_logical_operator)}"
+        )
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _delete_query(
+        cls,
+        table_name: str,
+        where_columns: tuple[str, ...],
+        where_logical_operator: common.LOGICAL_OPERATOR,
+    ) -> str:
+        """DELETE クエリを組み立てる。
 
         Returns:
-            str: key=value AND/OR key2=value2 形式の文字列。
+            str: DELETE FROM table WHERE key=? ... 形式の文字列。
         """
-        queries = []
-        for key, value in to_where.items():
-            query = f"{key}='{value}'" if type(value) == str else f"{key}={value}"
-            queries.append(query)
-        return f" {where_logical_operator} ".join(queries)
+        return f"DELETE FROM {table_name} WHERE {cls.to_where_statements(where_columns, where_logical_operator)}"
 
     def verify_where_statements(self, where_statements: dict[str, str | int]) -> None:
         """WHERE の条件を指定する辞書が無効なカラムを含んでいないか検証する。
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import datetime
+from typing import Final
+
+from libs import common
+
+from .db import DataBase
+
+EPISODE_HISTORY_TABLE_INFO: Final = """
+id integer unique primary key autoincrement,
+provider string not null,
+title string not null,
+episode_title string,
+episode_url string not null,
+episode_number integer,
+seen_at string not null,
+unique(provider, title, episode_url)
+"""
+# 履歴を残す日数。これより古い履歴は compact() で削除する
+DEFAULT_RETENTION_DAYS: Final = 365
+# 古い履歴を削除する場合も、作品ごとに最新の何件は残すか
+DEFAULT_KEEP_LATEST: Final = 1
+
+
+def now() -> str:
+    """seen_at に保存する形式の現在時刻。(文字列のまま大小比較出来る ISO 8601 形式)"""
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class EpisodeHistory:
+    """見つけたエピソードの履歴 (episode_history テーブル) を扱う。
+
+    各Webサイトのテーブルは作品ごとに最新話だけを持つが、履歴は見つけたエピソードを追記していく。
+    同じエピソードは2回記録しないので、since() で実行開始時刻以降の履歴を取得すれば、その実行で新しく見つけたエピソードだけが分かる。
+
+    NOTE: 複数のスレッドから使うため、DB にはメソッドの中でだけ接続する。(接続はスレッドごとに使い回される)
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            db_path (str): DBのパス。
+        """
+        self.db_path = db_path
+        self._index_created = False
+
+    def _open_db(self) -> DataBase:
+        db = DataBase(
+            self.db_path,
+            common.EPISODE_HISTORY_TABLE_NAME,
+            common.ALL_COLUMNS["episode_history"],
+            common.UPDATABLE_COLUMNS["episode_history"],
+            EPISODE_HISTORY_TABLE_INFO,
+        )
+        if not self._index_created:
+            table = common.EPISODE_HISTORY_TABLE_NAME
+            # NOTE: since() は絞り込む条件ごとに、seen_at の範囲を最後に指定できる索引を使う。(履歴の全件を走査しない)
+            # (provider, title, seen_at) は作品を指定した since() と、作品ごとに並べる compact() で使う
+            db.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_provider_title_seen_at ON {table}(provider, title, seen_at)"
+            )
+            # Webサイトだけを指定した since() で使う
+            db.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_provider_seen_at ON {table}(provider, seen_at)")
+            # 何も指定しない since() で使う
+            db.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_seen_at ON {table}(seen_at)")
+            self._index_created = True
+        return db
+
+    def record(self, provider: str, episodes: list[common.EpisodeHistoryValues], seen_at: str | None = None) -> int:
+        """見つけたエピソードを履歴に追記する。既に記録済みのエピソードは無視する。
+
+        Args:
+            provider (str): 対象のWebサイト。
+            episodes (list[common.EpisodeHistoryValues]): 見つけたエピソード。
+            NOTE: title / episode_title / episode_url は必須。episode_number は無ければ None になる。
+            seen_at (str | None, optional): 見つけた時刻。デフォルトは None (現在時刻)。
+
+        Returns:
+            int: 新しく記録したエピソードの数。
+        """
+        seen_at = seen_at or now()
+        to_insert: list[common.CHANGEABLE_VALUES] = [
+            {
+                "provider": provider,
+                "title": episode["title"],  # type: ignore
+                "episode_title": episode["episode_title"],  # type: ignore
+                "episode_url": episode["episode_url"],  # type: ignore
+                "episode_number": episode.get("episode_number"),
+                "seen_at": seen_at,
+            }
+            for episode in episodes
+        ]
+        db = self._open_db()
+        try:
+            return db.insert_many(to_insert, ignore_duplicates=True)
+        finally:
+            db.close()
+
+    def since(
+        self, seen_at: str, provider: str | None = None, title: str | None = None
+    ) -> list[common.EpisodeHistoryValues]:
+        """seen_at 以降に見つけたエピソードを古い順に取得する。
+
+        Args:
+            seen_at (str): この時刻以降 (この時刻を含む) の履歴を取得する。now() と同じ形式で指定する。
+            provider (str | None, optional): 対象のWebサイト。デフォルトは None (全て)。
+            title (str | None, optional): 対象作品のタイトル。provider と一緒に指定する。デフォルトは None (全て)。
+
+        Returns:
+            list[common.EpisodeHistoryValues]: 見つけたエピソードのリスト。
+        """
+        conditions = ["seen_at >= ?"]
+        parameters: list[str] = [seen_at]
+        if provider is not None:
+            conditions.append("provider = ?")
+            parameters.append(provider)
+        if title is not None:
+            conditions.append("title = ?")
+            parameters.append(title)
+        query = (
+            f"SELECT provider, title, episode_title, episode_url, episode_number, seen_at"
+            f" FROM {common.EPISODE_HISTORY_TABLE_NAME} WHERE {' AND '.join(conditions)} ORDER BY seen_at, id"
+        )
+
+        db = self._open_db()
+        try:
+            db.cursor.execute(query, parameters)
+            return db.cursor.fetchall()
+        finally:
+            db.close()
+
+    def compact(
+        self,
+        retention_days: int = DEFAULT_RETENTION_DAYS,
+        keep_latest: int = DEFAULT_KEEP_LATEST,
+        vacuum: bool = False,
+    ) -> int:
+        """古い履歴を削除して DB が大きくなり続けないようにする。
+
+        Args:
+            retention_days (int, optional): 履歴を残す日数。デフォルトは DEFAULT_RETENTION_DAYS 。
+            keep_latest (int, optional): 古い履歴でも作品ごとに残す最新の件数。デフォルトは DEFAULT_KEEP_LATEST 。
+            vacuum (bool, optional): 削除後に VACUUM してファイルサイズを縮めるかどうか。
+            NOTE: DB 全体を書き直すので時間がかかる。毎回ではなく、たまに実行すること。デフォルトは False 。
+
+        Returns:
+            int: 削除した履歴の数。
+        """
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=retention_days)).isoformat(timespec="seconds")
+        table = common.EPISODE_HISTORY_TABLE_NAME
+        # 作品ごとに新しい順に番号を振り、cutoff より古く、かつ keep_latest 件より後のものを削除する
+        query = f"""
+            DELETE FROM {table} WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, seen_at,
+                        ROW_NUMBER() OVER (PARTITION BY provider, title ORDER BY seen_at DESC, id DESC) AS rank
+                    FROM {table}
+                )
+                WHERE seen_at < ? AND rank > ?
+            )
+            """
+        db = self._open_db()
+        try:
+            deleted = db.execute(query, (cutoff, keep_latest))
+            if vacuum and deleted:
+                db.execute("VACUUM")
+        finally:
+            db.close()
+        return deleted
@@ -1,4 +1,8 @@
-import requests
+from __future__ import annotations
+
+from typing import Final
+from urllib.parse import urljoin
+
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -8,46 +12,149 @@ from selenium.webdriver.support.wait import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
 from libs import common
+from libs.cache import PageCache
+from libs.change_detector import ChangeDetector
 from libs.parser.providers import JumpplusParser, ShosetsuParser, TonarinoyjParser
+from libs.profiler import profiler
+
+# lean モードで読み込みをブロックするリソース
+LEAN_BLOCKED_URL_PATTERNS: Final = ("*.woff", "*.woff2", "*.ttf", "*.otf")
 
 
 class WebDriver:
-    def __init__(self, headless: bool = True) -> None:
+    def __init__(
+        self,
+        headless: bool = True,
+        page_cache: PageCache | None = None,
+        driver_path: str | None = None,
+        lean: bool = False,
+        change_detector: ChangeDetector | None = None,
+    ) -> None:
+        """インスタンスの初期化。(ブラウザを起動する)
+
+        Args:
+            headless (bool, optional): ヘッドレスで起動するかどうか。デフォルトは True 。
+            page_cache (PageCache | None, optional): パース結果のキャッシュ。デフォルトは None (新しく作成する)。
+            driver_path (str | None, optional): chromedriver のパス。
+            NOTE: None の場合は ChromeDriverManager でインストールする。毎回確認が走るので、複数起動する場合は渡すこと。
+            lean (bool, optional): 画像・フォントを読み込まず、DOM の構築が終わった時点で読み込み完了とするかどうか。
+            デフォルトは False 。
+            change_detector (ChangeDetector | None, optional): 前回から変わっていないページを判定する。
+            渡した場合、変わっていないページはパースしない。デフォルトは None 。
+        """
         options = Options()
         if headless:
             options.add_argument("--headless")
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        if lean:
+            # DOMContentLoaded で get() から戻る
+            options.page_load_strategy = "eager"
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+        with profiler.span("driver.launch"):
+            service = Service(driver_path if driver_path is not None else ChromeDriverManager().install())
+            self.driver = webdriver.Chrome(service=service, options=options)
+        if lean:
+            # フォントは設定で無効化出来ないので DevTools Protocol でブロックする
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(LEAN_BLOCKED_URL_PATTERNS)})
         # 待機時間の指定
         self.wait = WebDriverWait(self.driver, 30)
+        # 一覧ページなど、1回の実行で何度も参照するページのパース結果を保持する
+        self.page_cache = page_cache if page_cache is not None else PageCache()
+        self.change_detector = change_detector
 
     def parse_ongoing_titles_in_tonarinoyj(self) -> dict[str, str]:
-        self.get(common.PROVIDER_URLS["tonarinoyj"])
-        parser = TonarinoyjParser(self.current_page_source)
-        return parser.parse_ongoing_titles()
+        url = common.PROVIDER_URLS["tonarinoyj"]
+
+        def parse() -> dict[str, str]:
+            self.get(url)
+            return TonarinoyjParser(self.current_page_source).parse_ongoing_titles()
+
+        return self.page_cache.get_or_parse(url, parse)
+
+    def parse_latest_episode_url_in_jumpplus(self, first_episode_url: str) -> str | None:
+        """ジャンププラスの作品ページから最新話の URL を取得する。
 
-    def parse_latest_episode_url_in_jumpplus(self, first_episode_url: str) -> str:
+        Args:
+            first_episode_url (str): 作品の1話の URL 。
+
+        Returns:
+            str | None: 最新話の URL 。change_detector で前回から変わっていないと判定された場合は None 。
+        """
         self.get(first_episode_url)
         self.scroll_by_y(500)
 
-        self.wait.until(
+        episode_list = self.wait.until(
             expected_conditions.presence_of_element_located((By.CSS_SELECTOR, "a.series-episode-list-container"))
         )
+        # NOTE: ページ全体は広告などで毎回変わるので、パースに使う話一覧の要素だけで判定する
+        if self.change_detector is not None and not self.change_detector.has_changed(
+            first_episode_url, episode_list.get_attribute("outerHTML")
+        ):
+            return None
         parser = JumpplusParser(self.current_page_source)
         return parser.parse_latest_episode_url()
 
-    def parse_tracking_title_in_shosetsu(self, novel_code: str) -> tuple[int, str]:
+    def parse_tracking_title_in_shosetsu(self, novel_code: str) -> tuple[int, str] | None:
+        """小説家になろうの作品ページから最新話の番号とタイトルを取得する。
+
+        Args:
+            novel_code (str): 対象作品の Nコード 。
+
+        Returns:
+            tuple[int, str] | None: (最新話の番号, 最新話のタイトル) 。
+            change_detector で前回から変わっていないと判定された場合は None 。
+        """
         url = common.PROVIDER_URLS["shosetsu"] + novel_code
         self.get(url)
+        page_source = self.current_page_source
+
+        # 目次がページ分割されている場合は、最後のページで最新話を取得する
+        last_page_url = ShosetsuParser(page_source).parse_last_page_url()
+        if last_page_url is not None:
+            last_page_url = urljoin(url, last_page_url)
+            # NOTE: 最初のページは新しい話が追加されても変わらないことがあるので、最後のページで変更を判定する
+            if self.change_detector is not None:
+                self.change_detector.redirect(url, last_page_url)
+                self.change_detector.load([last_page_url])
+            self.get(last_page_url)
+            url, page_source = last_page_url, self.current_page_source
 
-        parser = ShosetsuParser(self.current_page_source)
+        if self.change_detector is not None and not self.change_detector.has_changed(url, page_source):
+            return None
+        parser = ShosetsuParser(page_source)
         return parser.parse_latest_episode_number_and_title()
 
+    def parse_tracking_titles_in_shosetsu(self, novel_codes: list[str]) -> dict[str, tuple[int, str]]:
+        # NOTE: HttpFetcher と同じインターフェースにするためのメソッド。ブラウザは1つなので順番に取得する
+        latest_episodes = {}
+        for novel_code in novel_codes:
+            latest_episode = self.parse_tracking_title_in_shosetsu(novel_code)
+            if latest_episode is not None:
+                latest_episodes[novel_code] = latest_episode
+        return latest_episodes
+
+    def parse_page_titles(self, urls: list[str]) -> dict[str, str]:
+        # NOTE: HttpFetcher と同じインターフェースにするためのメソッド。ブラウザは1つなので順番に取得する
+        page_titles = {}
+        for url in urls:
+            self.get(url)
+            page_titles[url] = self.current_title
+        return page_titles
+
     def get(self, url: str) -> None:
-        self.driver.get(url)
+        with profiler.span("driver.get"):
+            self.driver.get(url)
 
     def quit(self) -> None:
         self.driver.quit()
 
+    def reset(self) -> None:
+        """別の処理で使い回せるように、Cookie と開いているページをリセットする。"""
+        self.driver.delete_all_cookies()
+        self.driver.get("about:blank")
+
     def scroll_by_y(self, height: int) -> None:
         self.driver.execute_script("window.scrollTo(0, " + str(height) + ");")
 
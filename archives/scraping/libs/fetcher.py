@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Final, Mapping
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from libs import common
+from libs.cache import PageCache
+from libs.change_detector import ChangeDetector
+from libs.parser.providers import PageTitleParser, ShosetsuParser, TonarinoyjParser
+from libs.profiler import profiler
+
+DEFAULT_MAX_CONCURRENCY: Final = 4
+DEFAULT_TIMEOUT: Final = 30
+# NOTE: requests のデフォルトの User-Agent だと弾かれるサイトがあるため、ブラウザと同じものを使う
+DEFAULT_HEADERS: Final = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/112.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "ja,en-US;q=0.9,en;q=0.8",
+}
+
+
+class FetchError(Exception):
+    """ページの取得に失敗した場合"""
+
+    pass
+
+
+class HttpFetcher:
+    """静的なページをブラウザを使わずに取得する。
+
+    requests.Session のコネクションプールで keep-alive しつつ、asyncio で同時に複数のページを取得する。
+    同時に取得するページ数は max_concurrency までに制限する。
+    NOTE: JavaScript で描画されるページは取得出来ないので WebDriver を使うこと。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        page_cache: PageCache | None = None,
+        provider_urls: Mapping[str, str] = common.PROVIDER_URLS,
+        change_detector: ChangeDetector | None = None,
+    ) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            max_concurrency (int, optional): 同時に取得するページ数の上限。デフォルトは DEFAULT_MAX_CONCURRENCY 。
+            timeout (float, optional): 1リクエストのタイムアウト(秒)。デフォルトは DEFAULT_TIMEOUT 。
+            page_cache (PageCache | None, optional): パース結果のキャッシュ。デフォルトは None (新しく作成する)。
+            provider_urls (Mapping[str, str], optional): 各Webサイトの URL 。
+            NOTE: テスト時にローカルのスタブサーバを向けるために差し替える。デフォルトは common.PROVIDER_URLS 。
+            change_detector (ChangeDetector | None, optional): 前回から変わっていないページを判定する。
+            渡した場合、作品ページは条件付き GET で取得し、変わっていなければパースしない。デフォルトは None 。
+        """
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.page_cache = page_cache if page_cache is not None else PageCache()
+        self.provider_urls = provider_urls
+        self.change_detector = change_detector
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def parse_ongoing_titles_in_tonarinoyj(self) -> dict[str, str]:
+        url = self.provider_urls["tonarinoyj"]
+        return self.page_cache.get_or_parse(
+            url, lambda: TonarinoyjParser(self.get_page_source(url)).parse_ongoing_titles()
+        )
+
+    def parse_tracking_title_in_shosetsu(self, novel_code: str) -> tuple[int, str] | None:
+        """小説家になろうの作品ページから最新話の番号とタイトルを取得する。
+
+        Args:
+            novel_code (str): 対象作品の Nコード 。
+
+        Returns:
+            tuple[int, str] | None: (最新話の番号, 最新話のタイトル) 。
+            change_detector で前回から変わっていないと判定された場合は None 。
+        """
+        return self.parse_tracking_titles_in_shosetsu([novel_code]).get(novel_code)
+
+    def parse_tracking_titles_in_shosetsu(self, novel_codes: list[str]) -> dict[str, tuple[int, str]]:
+        """小説家になろうの作品ページを同時に取得し、最新話の番号とタイトルを取得する。
+
+        Args:
+            novel_codes (list[str]): 対象作品の Nコード 。
+
+        Returns:
+            dict[str, tuple[int, str]]: Nコード をキー、(最新話の番号, 最新話のタイトル) を値とする辞書。
+            NOTE: change_detector で前回から変わっていないと判定された作品はパースせず、キーに含めない。
+            目次がページ分割されている作品は、最後のページで判定する。
+        """
+        urls = {novel_code: self.provider_urls["shosetsu"] + novel_code for novel_code in novel_codes}
+        page_sources = self.get_page_sources(list(urls.values()), skip_unchanged=True)
+
+        # 目次がページ分割されている場合は、最後のページだけを追加で取得する
+        last_page_urls = {}
+        for novel_code, url in urls.items():
+            if url not in page_sources:
+                continue
+            last_page_url = ShosetsuParser(page_sources[url]).parse_last_page_url()
+            if last_page_url is None:
+                continue
+            last_page_urls[novel_code] = urljoin(url, last_page_url)
+            # NOTE: 最初のページは新しい話が追加されても変わらないことがあるので、最後のページで変更を判定する
+            if self.change_detector is not None:
+                self.change_detector.redirect(url, last_page_urls[novel_code])
+        if last_page_urls:
+            if self.change_detector is not None:
+                self.change_detector.load(list(last_page_urls.values()))
+            last_page_sources = self.get_page_sources(list(last_page_urls.values()), skip_unchanged=True)
+            for novel_code, last_page_url in last_page_urls.items():
+                page_sources.pop(urls[novel_code])
+                if last_page_url in last_page_sources:
+                    page_sources[urls[novel_code]] = last_page_sources[last_page_url]
+
+        return {
+            novel_code: ShosetsuParser(page_sources[url]).parse_latest_episode_number_and_title()
+            for novel_code, url in urls.items()
+            if url in page_sources
+        }
+
+    def parse_page_titles(self, urls: list[str]) -> dict[str, str]:
+        """ページを同時に取得し、それぞれの <title> を取得する。
+
+        Args:
+            urls (list[str]): 対象ページの URL 。
+
+        Returns:
+            dict[str, str]: URL をキー、ページのタイトルを値とする辞書。
+        """
+        page_sources = self.get_page_sources(urls)
+        return {url: PageTitleParser(page_source).parse_title() for url, page_source in page_sources.items()}
+
+    def get_page_source(self, url: str) -> str:
+        return self.get_page_sources([url])[url]
+
+    def get_page_sources(self, urls: list[str], skip_unchanged: bool = False) -> dict[str, str]:
+        """複数のページを同時に取得する。
+
+        Args:
+            urls (list[str]): 対象ページの URL 。
+            skip_unchanged (bool, optional): change_detector で前回から変わっていないと判定されたページを
+            返り値から除くかどうか。デフォルトは False 。
+
+        Raises:
+            FetchError: いずれかのページの取得に失敗した場合。
+
+        Returns:
+            dict[str, str]: URL をキー、ページの HTML を値とする辞書。
+        """
+        return asyncio.run(self.fetch_all(urls, skip_unchanged))
+
+    async def fetch_all(self, urls: list[str], skip_unchanged: bool = False) -> dict[str, str]:
+        """複数のページを同時に取得する。(コルーチン版)
+
+        Args:
+            urls (list[str]): 対象ページの URL 。
+            skip_unchanged (bool, optional): 前回から変わっていないページを返り値から除くかどうか。デフォルトは False 。
+
+        Returns:
+            dict[str, str]: URL をキー、ページの HTML を値とする辞書。
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        unique_urls = list(dict.fromkeys(urls))
+
+        async def fetch_with_limit(url: str) -> str | None:
+            async with semaphore:
+                return await self.fetch(url, skip_unchanged)
+
+        page_sources = await asyncio.gather(*(fetch_with_limit(url) for url in unique_urls))
+        return {url: page_source for url, page_source in zip(unique_urls, page_sources) if page_source is not None}
+
+    async def fetch(self, url: str, skip_unchanged: bool = False) -> str | None:
+        """1つのページを取得する。(コルーチン版)
+
+        Args:
+            url (str): 対象ページの URL 。
+            skip_unchanged (bool, optional): 前回から変わっていない場合に None を返すかどうか。デフォルトは False 。
+
+        Returns:
+            str | None: ページの HTML 。変わっていないページを除く場合は None 。
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._get, url, skip_unchanged)
+
+    def _get(self, url: str, skip_unchanged: bool = False) -> str | None:
+        detector = self.change_detector if skip_unchanged else None
+        headers = detector.conditional_headers(url) if detector is not None else None
+        try:
+            with profiler.span("http.get"):
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise FetchError(f"Failed to fetch {url}: {e}") from e
+
+        if detector is not None and response.status_code == 304:
+            detector.mark_not_modified(url)
+            return None
+
+        # NOTE: Content-Type に charset が無いと ISO-8859-1 として扱われ文字化けするので推測したものを使う
+        if response.encoding is None or response.encoding.lower() == "iso-8859-1":
+            response.encoding = response.apparent_encoding
+        # NOTE: ETag / Last-Modified を返さないサーバもあるので、内容のハッシュ値でも判定する
+        if detector is not None and not detector.has_changed(
+            url, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified")
+        ):
+            return None
+        return response.text
+
+    def quit(self) -> None:
+        self._executor.shutdown()
+        self.session.close()
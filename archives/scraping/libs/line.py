@@ -1,9 +1,30 @@
 from __future__ import annotations
 
+import queue
+import threading
+import time
+from dataclasses import dataclass
 from typing import Final
 
 import requests
-from credentials import credentials
+from requests.adapters import HTTPAdapter
+
+from libs.profiler import profiler
+
+# LINE Notify の message の上限文字数
+MAX_MESSAGE_LENGTH: Final = 1000
+DEFAULT_MAX_RETRIES: Final = 3
+DEFAULT_BACKOFF: Final = 1.0
+# 最初のメッセージを受け取ってから、まとめて送るために後続のメッセージを待つ時間(秒)
+DEFAULT_LINGER: Final = 0.5
+DEFAULT_TIMEOUT: Final = 10
+
+
+def _default_token() -> str:
+    # NOTE: credentials はリポジトリに含まれないので、トークンを渡さなかった場合にだけ読み込む
+    from credentials import credentials
+
+    return credentials.LINE_NOTIFY_TOKEN
 
 
 class LineNotification:
@@ -12,13 +33,233 @@ class LineNotification:
     API_URL: Final = "https://notify-api.line.me/api/notify"
 
     @classmethod
+    @profiler.profiled("line.post")
     def send_notification(cls, message: str) -> None:
         """Lineに通知する。
 
         Args:
             message (str): 通知するメッセージ。
         """
-        headers = {"Authorization": f"Bearer {credentials.LINE_NOTIFY_TOKEN}"}
+        headers = {"Authorization": f"Bearer {_default_token()}"}
         # 末尾の改行を消しておく
         data = {"message": "\n" + message.strip()}
         requests.post(cls.API_URL, headers=headers, data=data)
+
+
+def coalesce_messages(messages: list[str], max_length: int = MAX_MESSAGE_LENGTH) -> list[str]:
+    """メッセージを上限文字数に収まる範囲でまとめる。
+
+    メッセージの順番は保ったまま、空行で区切って1つにまとめる。
+    1つで上限を超えるメッセージは行単位で(1行で超える場合は文字数で)分割する。
+
+    Args:
+        messages (list[str]): まとめるメッセージ。
+        max_length (int, optional): 1つのメッセージの上限文字数。デフォルトは MAX_MESSAGE_LENGTH 。
+        NOTE: 送信時に先頭に付ける改行の分を含む。
+
+    Returns:
+        list[str]: まとめたメッセージ。
+    """
+    # 送信時に先頭に改行を1つ付けるので、その分を引いておく
+    limit = max_length - 1
+    pieces: list[str] = []
+    for message in messages:
+        message = message.strip()
+        if not message:
+            continue
+        if len(message) <= limit:
+            pieces.append(message)
+            continue
+        chunk = ""
+        for line in message.splitlines():
+            for i in range(0, max(len(line), 1), limit):
+                part = line[i : i + limit]
+                if chunk and len(chunk) + 1 + len(part) <= limit:
+                    chunk += "\n" + part
+                else:
+                    if chunk:
+                        pieces.append(chunk)
+                    chunk = part
+        if chunk:
+            pieces.append(chunk)
+
+    # メッセージの区切りが分かるように空行を挟んでまとめる
+    separator = "\n\n"
+    coalesced: list[str] = []
+    for piece in pieces:
+        if coalesced and len(coalesced[-1]) + len(separator) + len(piece) <= limit:
+            coalesced[-1] += separator + piece
+        else:
+            coalesced.append(piece)
+    return coalesced
+
+
+@dataclass
+class DispatcherMetrics:
+    """NotificationDispatcher の送信状況。"""
+
+    messages: int = 0
+    posts: int = 0
+    retries: int = 0
+    failures: int = 0
+
+    def summary(self) -> str:
+        """送信状況をまとめた文字列を返す。"""
+        return (
+            f"notification: messages={self.messages} posts={self.posts} "
+            f"retries={self.retries} failures={self.failures}"
+        )
+
+
+class NotificationDispatcher:
+    """Line通知をまとめて、別スレッドで送信する。
+
+    submit() したメッセージはキューに積まれ、すぐに戻る。(クロールを通知の送信で待たせない)
+    送信用のスレッドはキューに溜まったメッセージを上限文字数に収まる範囲でまとめて送信する。
+    コネクションは requests.Session で使い回し、送信に失敗した場合は指数関数的に間隔を空けて再送する。
+
+    Usage:
+        with NotificationDispatcher() as dispatcher:
+            dispatcher.submit("message")
+        # ブロックを抜けると、残っているメッセージを全て送信してからスレッドを終了する
+    """
+
+    def __init__(
+        self,
+        token: str | None = None,
+        api_url: str = LineNotification.API_URL,
+        max_message_length: int = MAX_MESSAGE_LENGTH,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        min_interval: float = 0.0,
+        linger: float = DEFAULT_LINGER,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            token (str | None, optional): LINE Notify のアクセストークン。デフォルトは None (credentials から読み込む)。
+            api_url (str, optional): 送信先の URL 。
+            NOTE: テスト時にローカルの偽のエンドポイントを向けるために差し替える。デフォルトは LineNotification.API_URL 。
+            max_message_length (int, optional): 1回で送信するメッセージの上限文字数。デフォルトは MAX_MESSAGE_LENGTH 。
+            max_retries (int, optional): 1回の送信を再送する回数の上限。デフォルトは DEFAULT_MAX_RETRIES 。
+            backoff (float, optional): 最初の再送までの待ち時間(秒)。再送する度に2倍にする。デフォルトは DEFAULT_BACKOFF 。
+            min_interval (float, optional): 送信の最小間隔(秒)。デフォルトは 0.0 。
+            linger (float, optional): まとめて送るために後続のメッセージを待つ時間(秒)。デフォルトは DEFAULT_LINGER 。
+            timeout (float, optional): 1リクエストのタイムアウト(秒)。デフォルトは DEFAULT_TIMEOUT 。
+        """
+        self.api_url = api_url
+        self.max_message_length = max_message_length
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.min_interval = min_interval
+        self.linger = linger
+        self.timeout = timeout
+        self.metrics = DispatcherMetrics()
+        # 再送しても送信出来なかったメッセージ
+        self.failed_messages: list[str] = []
+
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"Bearer {token if token is not None else _default_token()}"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # None はスレッドを終了する合図
+        self._queue: queue.Queue[str | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._last_post = 0.0
+
+    def __enter__(self) -> NotificationDispatcher:
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """送信用のスレッドを起動する。"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="NotificationDispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, message: str) -> None:
+        """メッセージを送信キューに積む。(送信を待たずに戻る)
+
+        Args:
+            message (str): 通知するメッセージ。
+        """
+        self._queue.put(message)
+
+    def close(self, timeout: float | None = None) -> None:
+        """キューに残っているメッセージを全て送信し、スレッドを終了する。
+
+        Args:
+            timeout (float | None, optional): スレッドの終了を待つ時間(秒)。デフォルトは None (終わるまで待つ)。
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+        else:
+            # スレッドを起動していない場合はこのスレッドで送信する
+            self._send_batch([message for message in self._drain() if message is not None])
+        self.session.close()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            messages = [self._queue.get()]
+            # 続けて submit されるメッセージをまとめて送るために少し待つ
+            if messages[0] is not None:
+                time.sleep(self.linger)
+            messages += self._drain()
+            stop = None in messages
+            self._send_batch([message for message in messages if message is not None])
+
+    def _drain(self) -> list[str | None]:
+        messages = []
+        while True:
+            try:
+                messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def _send_batch(self, messages: list[str]) -> None:
+        if not messages:
+            return
+        self.metrics.messages += len(messages)
+        for message in coalesce_messages(messages, self.max_message_length):
+            if not self._post(message):
+                self.failed_messages.append(message)
+                self.metrics.failures += 1
+
+    def _post(self, message: str) -> bool:
+        for attempt in range(self.max_retries + 1):
+            wait = self.min_interval - (time.monotonic() - self._last_post)
+            if wait > 0:
+                time.sleep(wait)
+            self._last_post = time.monotonic()
+
+            retry_after = None
+            try:
+                with profiler.span("line.post"):
+                    response = self.session.post(self.api_url, data={"message": "\n" + message}, timeout=self.timeout)
+                self.metrics.posts += 1
+                if response.ok:
+                    return True
+                # NOTE: 4xx はリクエストが間違っているので再送しない (429 Too Many Requests を除く)
+                if response.status_code < 500 and response.status_code != 429:
+                    return False
+                retry_after = response.headers.get("Retry-After")
+            except requests.RequestException:
+                pass
+
+            if attempt == self.max_retries:
+                break
+            self.metrics.retries += 1
+            time.sleep(
+                float(retry_after) if retry_after and retry_after.isdigit() else self.backoff * 2**attempt
+            )
+        return False
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+from libs import common
+
+Pipeline = Callable[[], common.UpdatedTitlesAndUrls]
+
+
+@dataclass
+class ProviderResult:
+    """Webサイト1つ分のクロール結果。"""
+
+    provider: str
+    updated_titles_and_urls: common.UpdatedTitlesAndUrls
+    wall_time: float
+    error: Exception | None = None
+
+
+@dataclass
+class RunReport:
+    """全てのWebサイトのクロール結果。"""
+
+    results: dict[str, ProviderResult]
+    wall_time: float
+    concurrent: bool
+
+    @property
+    def sequential_wall_time(self) -> float:
+        """順番に実行した場合にかかる時間。(各Webサイトの所要時間の合計)"""
+        return sum(result.wall_time for result in self.results.values())
+
+    def summary(self) -> str:
+        """所要時間をまとめた文字列を返す。"""
+        lines = [f"{'provider':<12} {'seconds':>9}  status"]
+        for provider, result in self.results.items():
+            status = "ok" if result.error is None else f"error: {result.error!r}"
+            lines.append(f"{provider:<12} {result.wall_time:>9.2f}  {status}")
+
+        mode = "concurrent" if self.concurrent else "sequential"
+        lines.append(f"{'total':<12} {self.wall_time:>9.2f}  ({mode})")
+        if self.concurrent and self.wall_time > 0:
+            lines.append(
+                f"{'sequential':<12} {self.sequential_wall_time:>9.2f}  "
+                f"(sum of providers, x{self.sequential_wall_time / self.wall_time:.2f})"
+            )
+        return "\n".join(lines)
+
+
+def _run_pipeline(provider: str, pipeline: Pipeline) -> ProviderResult:
+    start = time.perf_counter()
+    try:
+        updated_titles_and_urls = pipeline()
+        error = None
+    # NOTE: 1つのWebサイトで失敗しても他のWebサイトの結果は通知したいので、例外は結果として返す
+    except Exception as e:
+        updated_titles_and_urls = {"title": [], "url": []}
+        error = e
+    return ProviderResult(provider, updated_titles_and_urls, time.perf_counter() - start, error)
+
+
+def run_providers(pipelines: dict[str, Pipeline], max_workers: int | None = None) -> RunReport:
+    """各Webサイトのクロールを同時に実行し、全て終わるまで待つ。
+
+    Args:
+        pipelines (dict[str, Pipeline]): Webサイトをキー、クロールする関数を値とする辞書。
+        max_workers (int | None, optional): 同時に実行する数の上限。デフォルトは None (Webサイトの数)。
+
+    Returns:
+        RunReport: クロール結果。results は pipelines と同じ順番になる。
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(pipelines), 1)) as executor:
+        futures = {
+            provider: executor.submit(_run_pipeline, provider, pipeline) for provider, pipeline in pipelines.items()
+        }
+        results = {provider: future.result() for provider, future in futures.items()}
+    return RunReport(results, time.perf_counter() - start, concurrent=True)
+
+
+def run_providers_sequentially(pipelines: dict[str, Pipeline]) -> RunReport:
+    """各Webサイトのクロールを順番に実行する。(比較用)
+
+    Args:
+        pipelines (dict[str, Pipeline]): Webサイトをキー、クロールする関数を値とする辞書。
+
+    Returns:
+        RunReport: クロール結果。
+    """
+    start = time.perf_counter()
+    results = {provider: _run_pipeline(provider, pipeline) for provider, pipeline in pipelines.items()}
+    return RunReport(results, time.perf_counter() - start, concurrent=False)
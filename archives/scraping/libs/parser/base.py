@@ -1,7 +1,32 @@
 from __future__ import annotations
 
+import functools
+import importlib.util
+from typing import Final, Literal
+
 import bs4
-from bs4.element import ResultSet, Tag
+import soupsieve
+from bs4.element import Tag
+
+from libs.profiler import profiler
+
+ParserBackend = Literal["lxml", "html.parser"]
+
+# NOTE: lxml はオプショナルな依存。インストールされていれば C 実装で高速な lxml を使う
+DEFAULT_BACKEND: Final[ParserBackend] = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+
+@functools.lru_cache(maxsize=None)
+def compile_selector(selector: str) -> soupsieve.SoupSieve:
+    """CSSセレクタをコンパイルする。同じセレクタは1度だけコンパイルしてキャッシュする。
+
+    Args:
+        selector (str): CSSセレクタ。
+
+    Returns:
+        soupsieve.SoupSieve: コンパイルしたセレクタ。
+    """
+    return soupsieve.compile(selector)
 
 
 class ParserError(Exception):
@@ -17,19 +42,47 @@ class TagNotFoundError(ParserError):
 
 
 class BaseParser:
-    def __init__(self, html: str) -> None:
-        self._soup: bs4.BeautifulSoup = bs4.BeautifulSoup(html, "html.parser")
+    # 部分的にパースする場合に残す要素。None の場合は常に全体をパースする
+    # NOTE: サブクラスでパースに必要な要素だけを指定することで、不要な部分の木を構築しないようにする
+    PARSE_ONLY: bs4.SoupStrainer | None = None
+
+    def __init__(self, html: str, backend: ParserBackend | None = None, partial: bool = True) -> None:
+        """インスタンスの初期化。
+        NOTE: HTML のパースは最初に _soup を参照した時に行う。
+
+        Args:
+            html (str): パースするHTML。
+            backend (ParserBackend | None, optional): 使用するパーサ。デフォルトは None (DEFAULT_BACKEND)。
+            partial (bool, optional): PARSE_ONLY に一致する要素だけをパースするかどうか。デフォルトは True 。
+        """
+        self._html = html
+        self._backend: ParserBackend = backend or DEFAULT_BACKEND
+        self._partial = partial
+        self._parsed_soup: bs4.BeautifulSoup | None = None
+
+    @property
+    def _soup(self) -> bs4.BeautifulSoup:
+        """パースした木。最初に参照した時にパースする。
+        NOTE: 文字列の検索だけで済む場合 (ShosetsuParser の高速パスなど) は木を構築しない。
+        """
+        if self._parsed_soup is None:
+            # NOTE: パースの時間の大半は木の構築なので、ここをパーサごとの区間として計測する
+            with profiler.span(f"parser.{type(self).__name__}"):
+                self._parsed_soup = bs4.BeautifulSoup(
+                    self._html, self._backend, parse_only=self.PARSE_ONLY if self._partial else None
+                )
+        return self._parsed_soup
 
     def _select_tag(self, selector: str, tag: Tag | None = None) -> Tag:
         # tag が引数として渡されなかった場合は self._soup を使う
-        result_tag = self._soup.select_one(selector) if tag is None else tag.select_one(selector)
+        result_tag = compile_selector(selector).select_one(self._soup if tag is None else tag)
         if result_tag is None:
             raise TagNotFoundError(f"{selector} is invalid selector")
         return result_tag
 
-    def _select_tags(self, selector: str, tag: Tag | None = None) -> ResultSet[Tag]:
+    def _select_tags(self, selector: str, tag: Tag | None = None) -> list[Tag]:
         # tag が引数として渡されなかった場合は self._soup を使う
-        result_tags = self._soup.select(selector) if tag is None else tag.select(selector)
+        result_tags = compile_selector(selector).select(self._soup if tag is None else tag)
         if result_tags is None:
             raise TagNotFoundError(f"{selector} is invalid selector")
         return result_tags
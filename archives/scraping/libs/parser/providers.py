@@ -1,13 +1,31 @@
 from __future__ import annotations
 
+import html as html_module
+import re
+from typing import Final
+
+from bs4 import SoupStrainer
 from bs4.element import Tag
 
-from .base import BaseParser, TagNotFoundError
+from .base import BaseParser, ParserBackend, TagNotFoundError
+
+
+class PageTitleParser(BaseParser):
+    PARSE_ONLY = SoupStrainer("title")
+
+    def __init__(self, html: str, backend: ParserBackend | None = None, partial: bool = True) -> None:
+        super().__init__(html, backend, partial)
+
+    def parse_title(self) -> str:
+        """ページの <title> を取得する。(WebDriver.current_title 相当)"""
+        return self._select_tag("title").get_text().strip()
 
 
 class TonarinoyjParser(BaseParser):
-    def __init__(self, html: str) -> None:
-        super().__init__(html)
+    PARSE_ONLY = SoupStrainer(class_="series-table-list")
+
+    def __init__(self, html: str, backend: ParserBackend | None = None, partial: bool = True) -> None:
+        super().__init__(html, backend, partial)
 
     def parse_ongoing_titles(self) -> dict[str, str]:
         ongoing_titles_and_latest_episode_url = {}
@@ -40,8 +58,10 @@ class TonarinoyjParser(BaseParser):
 
 
 class JumpplusParser(BaseParser):
-    def __init__(self, html: str) -> None:
-        super().__init__(html)
+    PARSE_ONLY = SoupStrainer("a", class_="series-episode-list-container")
+
+    def __init__(self, html: str, backend: ParserBackend | None = None, partial: bool = True) -> None:
+        super().__init__(html, backend, partial)
 
     def parse_latest_episode_url(self) -> str:
         link_tag = self._select_tag("a.series-episode-list-container")
@@ -55,16 +75,81 @@ class JumpplusParser(BaseParser):
         return latest_episode_url
 
 
+# 目次の各話のリンク。href は "/{Nコード}/{話数}/" の形式
+SHOSETSU_EPISODE_LINK_PATTERN: Final = re.compile(r'<a\s[^>]*?href="/?[^"/]+/(\d+)/?"[^>]*>(.*?)</a>', re.DOTALL)
+SHOSETSU_EPISODE_HREF_PATTERN: Final = re.compile(r"/(\d+)/?$")
+SHOSETSU_HREF_PATTERN: Final = re.compile(r'href="([^"]*)"')
+
+
 class ShosetsuParser(BaseParser):
-    def __init__(self, html: str) -> None:
-        super().__init__(html)
+    PARSE_ONLY = SoupStrainer(class_="novel_sublist2")
+
+    def __init__(self, html: str, backend: ParserBackend | None = None, partial: bool = True) -> None:
+        super().__init__(html, backend, partial)
 
     def parse_latest_episode_number_and_title(self) -> tuple[int, str]:
+        """最新話の番号とタイトルを取得する。
+
+        NOTE: まず目次の末尾だけを文字列として読み、失敗した場合だけ目次全体をパースする。
+        目次がページ分割されている場合は、最後のページ (parse_last_page_url) の HTML を渡すこと。
+
+        Returns:
+            tuple[int, str]: (最新話の番号, 最新話のタイトル) 。
+        """
+        latest_episode = self.parse_latest_episode_from_tail()
+        if latest_episode is not None:
+            return latest_episode
+        return self.parse_latest_episode_from_list()
+
+    def parse_latest_episode_from_tail(self) -> tuple[int, str] | None:
+        """目次の最後の .novel_sublist2 だけを読み、最新話の番号とタイトルを取得する。
+
+        木を構築せずに HTML の末尾から探すので、話数が多い作品でもほぼ一定の時間で終わる。
+
+        Returns:
+            tuple[int, str] | None: (最新話の番号, 最新話のタイトル) 。想定と違う構造の場合は None 。
+        """
+        index = self._html.rfind("novel_sublist2")
+        if index == -1:
+            return None
+        # NOTE: 最後の話の要素の中だけを探す。(フッタなどのリンクを話と間違えないようにする)
+        end = self._html.find("</dl>", index)
+        if end == -1:
+            return None
+        match = SHOSETSU_EPISODE_LINK_PATTERN.search(self._html, index, end)
+        if match is None:
+            return None
+        # NOTE: タイトルにタグが含まれる場合 (<span> などで装飾されている場合) は、.text と同じ結果にならないので全体をパースする
+        if "<" in match.group(2):
+            return None
+        return int(match.group(1)), html_module.unescape(match.group(2))
+
+    def parse_latest_episode_from_list(self) -> tuple[int, str]:
+        """目次全体をパースし、最新話の番号とタイトルを取得する。"""
         novel_episode_list = self._select_tags(".novel_sublist2")
         try:
             latest_episode_title = self._select_tag("a", novel_episode_list[-1])
         except IndexError:
             raise TagNotFoundError(f"Link doesn't exist\n{novel_episode_list}")
 
-        latest_episode_number = len(novel_episode_list)
+        # NOTE: ページ分割されている場合は一覧の数が話数にならないので、リンクから話数を取得する
+        href = latest_episode_title.get("href")
+        match = SHOSETSU_EPISODE_HREF_PATTERN.search(href) if isinstance(href, str) else None
+        latest_episode_number = int(match.group(1)) if match else len(novel_episode_list)
         return latest_episode_number, latest_episode_title.text
+
+    def parse_last_page_url(self) -> str | None:
+        """目次がページ分割されている場合に、最後のページへのリンクを取得する。
+
+        Returns:
+            str | None: 最後のページの URL (相対パス)。ページ分割されていないか、最後のページの場合は None 。
+        """
+        index = self._html.find("c-pager__item--last")
+        if index == -1:
+            return None
+        start = self._html.rfind("<a", 0, index)
+        end = self._html.find(">", index)
+        match = SHOSETSU_HREF_PATTERN.search(self._html, start, end) if start != -1 and end != -1 else None
+        if match is None:
+            return None
+        return html_module.unescape(match.group(1))
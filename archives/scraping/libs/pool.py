@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Final, Iterator
+
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+from libs.change_detector import ChangeDetector
+from libs.driver import WebDriver
+
+DEFAULT_POOL_SIZE: Final = 2
+
+
+@dataclass
+class PoolMetrics:
+    """WebDriverPool の利用状況。"""
+
+    launches: int = 0
+    leases: int = 0
+    resets: int = 0
+    discards: int = 0
+    total_lease_wait: float = 0.0
+    max_lease_wait: float = 0.0
+
+    @property
+    def average_lease_wait(self) -> float:
+        return self.total_lease_wait / self.leases if self.leases else 0.0
+
+    def summary(self) -> str:
+        """利用状況をまとめた文字列を返す。"""
+        return (
+            f"driver pool: launches={self.launches} leases={self.leases} resets={self.resets} "
+            f"discards={self.discards} lease wait avg={self.average_lease_wait:.2f}s max={self.max_lease_wait:.2f}s"
+        )
+
+
+class WebDriverPool:
+    """WebDriver (ブラウザ) を使い回すためのプール。
+
+    同時に起動するブラウザの数を max_size までに制限する。
+    空きが無い場合は他の処理が返却するまで待機する。
+    返却されたブラウザは Cookie と開いているページをリセットしてから次の処理に貸し出す。
+    """
+
+    def __init__(
+        self, max_size: int = DEFAULT_POOL_SIZE, lean: bool = False, change_detector: ChangeDetector | None = None
+    ) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            max_size (int, optional): 同時に起動するブラウザの上限。デフォルトは DEFAULT_POOL_SIZE 。
+            lean (bool, optional): 画像・フォントを読み込まない軽量モードで起動するかどうか。デフォルトは False 。
+            change_detector (ChangeDetector | None, optional): 起動したブラウザに渡す変更検知。デフォルトは None 。
+        """
+        self.max_size = max_size
+        self.lean = lean
+        self.change_detector = change_detector
+        self.metrics = PoolMetrics()
+        # headless かどうかで起動オプションが異なるので分けて保持する
+        self._idle: dict[bool, list[WebDriver]] = {True: [], False: []}
+        self._number_of_drivers = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._driver_path: str | None = None
+        self._driver_path_lock = threading.Lock()
+
+    @property
+    def driver_path(self) -> str:
+        """chromedriver のパス。最初に参照した時に1度だけ ChromeDriverManager でインストールする。"""
+        with self._driver_path_lock:
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+            return self._driver_path
+
+    def warm_up(self, number_of_drivers: int | None = None, headless: bool = True) -> None:
+        """ブラウザを前もって起動しておく。
+
+        Args:
+            number_of_drivers (int | None, optional): 起動する数。デフォルトは None (max_size まで起動する)。
+            headless (bool, optional): ヘッドレスで起動するかどうか。デフォルトは True 。
+        """
+        with self._condition:
+            available = self.max_size - self._number_of_drivers
+            number_of_drivers = min(available, number_of_drivers if number_of_drivers is not None else available)
+            self._number_of_drivers += number_of_drivers
+        if number_of_drivers <= 0:
+            return
+
+        # NOTE: ブラウザの起動は1つ数秒かかるので同時に行う
+        with ThreadPoolExecutor(max_workers=number_of_drivers) as executor:
+            futures = [executor.submit(self._launch, headless) for _ in range(number_of_drivers)]
+        for future in futures:
+            if future.exception() is None:
+                self._release(future.result(), headless, reset=False)
+            else:
+                with self._condition:
+                    self._number_of_drivers -= 1
+                    self._condition.notify()
+
+    @contextmanager
+    def lease(self, headless: bool = True) -> Iterator[WebDriver]:
+        """ブラウザを借りる。ブロックを抜けるとプールに返却される。
+
+        Args:
+            headless (bool, optional): ヘッドレスで起動したブラウザを借りるかどうか。デフォルトは True 。
+
+        Yields:
+            WebDriver: 借りたブラウザ。
+        """
+        driver = self._acquire(headless)
+        try:
+            yield driver
+        finally:
+            self._release(driver, headless)
+
+    def _launch(self, headless: bool) -> WebDriver:
+        driver = WebDriver(
+            headless=headless, driver_path=self.driver_path, lean=self.lean, change_detector=self.change_detector
+        )
+        with self._condition:
+            self.metrics.launches += 1
+        return driver
+
+    def _acquire(self, headless: bool) -> WebDriver:
+        start = time.perf_counter()
+        # 起動オプションが異なるために終了させるブラウザ
+        stale_driver: WebDriver | None = None
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("WebDriverPool is already closed.")
+                if self._idle[headless]:
+                    self._record_lease(time.perf_counter() - start)
+                    return self._idle[headless].pop()
+                if self._number_of_drivers < self.max_size:
+                    self._number_of_drivers += 1
+                    break
+                # 起動オプションが異なるブラウザしか空いていない場合は、それを終了して枠を空ける
+                if self._idle[not headless]:
+                    stale_driver = self._idle[not headless].pop()
+                    self.metrics.discards += 1
+                    break
+                self._condition.wait()
+
+        # NOTE: ブラウザの終了・起動には時間がかかるのでロックの外で行う
+        if stale_driver is not None:
+            self._quit(stale_driver)
+        try:
+            driver = self._launch(headless)
+        except BaseException:
+            with self._condition:
+                self._number_of_drivers -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._record_lease(time.perf_counter() - start)
+        return driver
+
+    def _record_lease(self, wait: float) -> None:
+        # NOTE: self._condition を取得した状態で呼ぶこと
+        self.metrics.leases += 1
+        self.metrics.total_lease_wait += wait
+        self.metrics.max_lease_wait = max(self.metrics.max_lease_wait, wait)
+
+    def _release(self, driver: WebDriver, headless: bool, reset: bool = True) -> None:
+        if reset and not self._closed:
+            try:
+                driver.reset()
+            # ブラウザが落ちている場合は使い回さずに捨てる
+            except WebDriverException:
+                self._discard(driver)
+                return
+
+        with self._condition:
+            if reset:
+                self.metrics.resets += 1
+            if not self._closed:
+                self._idle[headless].append(driver)
+                self._condition.notify()
+                return
+            self._number_of_drivers -= 1
+        self._quit(driver)
+
+    @staticmethod
+    def _quit(driver: WebDriver) -> None:
+        # NOTE: ブラウザの終了には時間がかかるので、self._condition を取得していない状態で呼ぶこと
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def _discard(self, driver: WebDriver) -> None:
+        self._quit(driver)
+        with self._condition:
+            self.metrics.discards += 1
+            self._number_of_drivers -= 1
+            self._condition.notify()
+
+    def close(self) -> None:
+        """空いているブラウザを全て終了する。貸出中のブラウザは返却時に終了する。"""
+        with self._condition:
+            self._closed = True
+            idle_drivers = [driver for drivers in self._idle.values() for driver in drivers]
+            for drivers in self._idle.values():
+                drivers.clear()
+            self._number_of_drivers -= len(idle_drivers)
+            self._condition.notify_all()
+        for driver in idle_drivers:
+            self._quit(driver)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Final, Iterator, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_PROFILE_DIR: Final = "./profiles"
+# 環境変数で有効にする場合 (main.py の --profile と同じ)
+PROFILE_ENV_VAR: Final = "SCRAPING_PROFILE"
+
+
+@dataclass
+class SpanStats:
+    """同じ名前の区間の集計。"""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+
+
+class Profiler:
+    """処理時間を区間 (span) ごとに集計する。
+
+    WebDriver.get やパース、DB 操作、通知などを span() で囲んでおき、有効にした場合だけ時間を計測する。
+    無効な場合の span() はフラグを見て何もせずに戻るだけなので、常に埋め込んでおいてよい。
+    区間名は "カテゴリ.処理" (driver.get, db.select など) にする。summary() ではカテゴリごとの合計も表示する。
+
+    NOTE: 複数のスレッドで同時に計測した区間はそれぞれ加算するので、合計が実行時間を超えることがある。
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.started_at: str | None = None
+        self._start = 0.0
+        self._stats: dict[str, SpanStats] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """計測を有効にし、集計をリセットする。"""
+        with self._lock:
+            self._stats.clear()
+            self.started_at = datetime.datetime.now().isoformat(timespec="seconds")
+            self._start = time.perf_counter()
+            self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """ブロックの処理時間を name の区間として計測する。
+
+        Args:
+            name (str): 区間名。"カテゴリ.処理" の形式にする。
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def profiled(self, name: str) -> Callable[[F], F]:
+        """関数の処理時間を name の区間として計測するデコレータ。
+
+        Args:
+            name (str): 区間名。"カテゴリ.処理" の形式にする。
+        """
+
+        def decorator(func: F) -> F:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+
+            return wrapper  # type: ignore
+
+        return decorator
+
+    def record(self, name: str, elapsed: float) -> None:
+        """計測した時間を加算する。
+
+        Args:
+            name (str): 区間名。
+            elapsed (float): 処理時間(秒)。
+        """
+        with self._lock:
+            self._stats.setdefault(name, SpanStats()).add(elapsed)
+
+    def report(self) -> dict[str, Any]:
+        """集計結果を JSON に変換出来る辞書で返す。"""
+        with self._lock:
+            spans = {name: {**asdict(stats), "mean": stats.mean} for name, stats in sorted(self._stats.items())}
+        return {
+            "started_at": self.started_at,
+            "wall_time": time.perf_counter() - self._start if self.started_at else 0.0,
+            "spans": spans,
+        }
+
+    def save(self, directory: str = DEFAULT_PROFILE_DIR) -> dict[str, Any]:
+        """集計結果を directory/latest.json に保存し、directory/history.jsonl に追記する。
+
+        Args:
+            directory (str, optional): 保存先のディレクトリ。デフォルトは DEFAULT_PROFILE_DIR 。
+
+        Returns:
+            dict[str, Any]: 保存した集計結果。
+        """
+        report = self.report()
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "latest.json"), "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        with open(os.path.join(directory, "history.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, ensure_ascii=False) + "\n")
+        return report
+
+
+def load_previous_report(directory: str = DEFAULT_PROFILE_DIR) -> dict[str, Any] | None:
+    """history.jsonl から最後に保存した集計結果を読み込む。
+
+    Args:
+        directory (str, optional): 保存先のディレクトリ。デフォルトは DEFAULT_PROFILE_DIR 。
+
+    Returns:
+        dict[str, Any] | None: 集計結果。履歴が無い場合は None 。
+    """
+    path = os.path.join(directory, "history.jsonl")
+    if not os.path.exists(path):
+        return None
+    last_line = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                last_line = line
+    return json.loads(last_line) if last_line else None
+
+
+def summarize(report: dict[str, Any], previous: dict[str, Any] | None = None) -> str:
+    """集計結果を表形式の文字列にする。
+
+    Args:
+        report (dict[str, Any]): Profiler.report() の集計結果。
+        previous (dict[str, Any] | None, optional): 比較する前回の集計結果。合計時間の差を表示する。デフォルトは None 。
+
+    Returns:
+        str: 区間ごと、カテゴリごとの集計を並べた表。
+    """
+    previous_spans = previous["spans"] if previous else {}
+    lines = [f"{'span':<28} {'count':>6} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'vs prev':>9}"]
+
+    categories: dict[str, float] = {}
+    for name, stats in report["spans"].items():
+        categories[name.split(".")[0]] = categories.get(name.split(".")[0], 0.0) + stats["total"]
+        diff = ""
+        if name in previous_spans:
+            diff = f"{stats['total'] - previous_spans[name]['total']:+.2f}s"
+        lines.append(
+            f"{name:<28} {stats['count']:>6} {stats['total']:>9.3f} "
+            f"{stats['mean'] * 1000:>9.1f} {stats['max'] * 1000:>9.1f} {diff:>9}"
+        )
+
+    lines.append("")
+    for category, total in sorted(categories.items(), key=lambda item: -item[1]):
+        lines.append(f"{category + ' (total)':<28} {'':>6} {total:>9.3f}")
+    lines.append(f"{'wall time':<28} {'':>6} {report['wall_time']:>9.3f}")
+    return "\n".join(lines)
+
+
+# NOTE: モジュール全体で共有するインスタンス。各モジュールはこれを import して span() で囲む
+profiler = Profiler()
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import random
+import threading
+from dataclasses import dataclass
+from typing import Callable, Final
+
+# 間隔をずらす割合。interval * (1 ± jitter) の範囲でランダムに待つ
+DEFAULT_JITTER: Final = 0.1
+# 更新が無くても毎回確認する回数。これを超えて更新が無い作品は確認を間引く
+DEFAULT_GRACE: Final = 2
+# 間引く場合に続けて飛ばす回数の上限
+DEFAULT_MAX_SKIP: Final = 7
+
+Tick = Callable[[str], None]
+
+
+@dataclass(frozen=True)
+class ProviderSchedule:
+    """Webサイト1つ分のクロールの間隔。"""
+
+    interval: float
+    jitter: float = DEFAULT_JITTER
+
+    def next_delay(self, rng: random.Random) -> float:
+        """次のクロールまで待つ秒数を返す。
+
+        NOTE: 毎回同じ時刻にアクセスしないように、interval を jitter の割合だけランダムにずらす。
+        """
+        return max(self.interval * (1 + rng.uniform(-self.jitter, self.jitter)), 0.0)
+
+
+@dataclass
+class _TitleState:
+    # 続けて更新が無かった回数
+    misses: int = 0
+    # あと何回確認を飛ばすか
+    skips_remaining: int = 0
+
+
+class TitleBackoff:
+    """作品ごとに、更新が無い回数に応じて確認を間引く。
+
+    更新が無い回数が grace を超えると、2, 4, 8 ... 回に1回 (max_skip + 1 回に1回まで) だけ確認する。
+    更新が見つかれば毎回の確認に戻す。
+    NOTE: 状態はメモリ上にだけ持つので、常駐モードを再起動すると全ての作品を毎回確認する状態に戻る。
+    """
+
+    def __init__(self, grace: int = DEFAULT_GRACE, max_skip: int = DEFAULT_MAX_SKIP) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            grace (int, optional): 更新が無くても毎回確認する回数。デフォルトは DEFAULT_GRACE 。
+            max_skip (int, optional): 続けて飛ばす回数の上限。デフォルトは DEFAULT_MAX_SKIP 。
+        """
+        self.grace = grace
+        self.max_skip = max_skip
+        self._states: dict[tuple[str, str], _TitleState] = {}
+        self._lock = threading.Lock()
+
+    def due(self, provider: str, titles: list[str]) -> list[str]:
+        """今回確認する作品を返す。確認しない作品は飛ばした回数を数える。
+
+        Args:
+            provider (str): 対象のWebサイト。
+            titles (list[str]): 対象作品のタイトル。
+
+        Returns:
+            list[str]: 今回確認する作品のタイトル。titles と同じ順番になる。
+        """
+        due_titles = []
+        with self._lock:
+            for title in titles:
+                state = self._states.setdefault((provider, title), _TitleState())
+                if state.skips_remaining > 0:
+                    state.skips_remaining -= 1
+                else:
+                    due_titles.append(title)
+        return due_titles
+
+    def observe(self, provider: str, checked_titles: list[str], updated_titles: set[str]) -> None:
+        """確認した結果を記録し、次に確認するまでに飛ばす回数を決める。
+
+        Args:
+            provider (str): 対象のWebサイト。
+            checked_titles (list[str]): 今回確認した作品のタイトル。
+            updated_titles (set[str]): そのうち更新が見つかった作品のタイトル。
+        """
+        with self._lock:
+            for title in checked_titles:
+                state = self._states.setdefault((provider, title), _TitleState())
+                if title in updated_titles:
+                    state.misses = 0
+                    state.skips_remaining = 0
+                    continue
+                state.misses += 1
+                if state.misses > self.grace:
+                    state.skips_remaining = min(2 ** (state.misses - self.grace) - 1, self.max_skip)
+
+    def summary(self) -> str:
+        """間引いている作品の数をまとめた文字列を返す。"""
+        with self._lock:
+            backing_off = sum(1 for state in self._states.values() if state.misses > self.grace)
+            return f"title backoff: titles={len(self._states)} backing off={backing_off}"
+
+
+class Scheduler:
+    """Webサイトごとの間隔でクロールを繰り返す。(常駐モード用)
+
+    Webサイトごとに専用のスレッドで tick を繰り返す。同じWebサイトのクロールが重なることは無い。
+    NOTE: DB の接続はスレッドごとに使い回されるので、スレッドを使い続けることで tick の度に接続し直さずに済む。
+    """
+
+    def __init__(self, schedules: dict[str, ProviderSchedule], tick: Tick, seed: int | None = None) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            schedules (dict[str, ProviderSchedule]): Webサイトをキー、クロールの間隔を値とする辞書。
+            tick (Tick): Webサイトを引数に、1回分のクロールを行う関数。
+            NOTE: 例外は捕捉してログに出すだけなので、通知が必要な場合は tick の中で処理すること。
+            seed (int | None, optional): 間隔をずらす乱数のシード。デフォルトは None 。
+        """
+        self.schedules = schedules
+        self.tick = tick
+        self.ticks: dict[str, int] = {provider: 0 for provider in schedules}
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def _next_delay(self, provider: str) -> float:
+        with self._rng_lock:
+            return self.schedules[provider].next_delay(self._rng)
+
+    def _initial_delay(self, provider: str) -> float:
+        # NOTE: 全てのWebサイトが同時に始まらないように、最初の1回も jitter の分だけずらす
+        schedule = self.schedules[provider]
+        with self._rng_lock:
+            return self._rng.uniform(0, schedule.interval * schedule.jitter)
+
+    def _run(self, provider: str) -> None:
+        delay = self._initial_delay(provider)
+        while not self._stop_event.wait(delay):
+            try:
+                self.tick(provider)
+            except Exception as e:
+                print(f"{provider}: tick failed: {e!r}")
+            self.ticks[provider] += 1
+            delay = self._next_delay(provider)
+
+    def start(self) -> None:
+        """Webサイトごとのスレッドを起動する。"""
+        for provider in self.schedules:
+            thread = threading.Thread(target=self._run, args=(provider,), name=f"scheduler-{provider}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """次の tick を行わないようにする。実行中の tick は終わるまで待たない。(join() で待つ)"""
+        self._stop_event.set()
+
+    def join(self, timeout: float | None = None) -> None:
+        """全てのスレッドが終わるまで待つ。"""
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run_forever(self) -> None:
+        """スレッドを起動し、Ctrl+C で止めるまで待つ。
+
+        NOTE: Thread.join() はシグナルで中断出来ないので、短い間隔で待ちを繰り返す。
+        """
+        self.start()
+        try:
+            while not self._stop_event.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+            self.join()
@@ -1,22 +1,84 @@
 from __future__ import annotations
 
-from libs import common
+import argparse
+import functools
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Final, Iterator
+
+from libs import common, orchestrator
+from libs.change_detector import ChangeDetector
+from libs.db.connection import close_all_connections
 from libs.db.db import DataBase
+from libs.db.history import DEFAULT_RETENTION_DAYS, EpisodeHistory, now
 from libs.driver import WebDriver
-from libs.line import LineNotification
+from libs.fetcher import HttpFetcher
+from libs.line import NotificationDispatcher
+from libs.pool import WebDriverPool
+from libs.profiler import DEFAULT_PROFILE_DIR, PROFILE_ENV_VAR, load_previous_report, profiler, summarize
+from libs.scheduler import DEFAULT_JITTER, DEFAULT_MAX_SKIP, ProviderSchedule, Scheduler, TitleBackoff
 
+# 常駐モードで古い履歴を削除する間隔(秒)
+COMPACTION_INTERVAL: Final = 24 * 60 * 60
 
-def find_latest_url_in_tonarinoyj(manga_titles: list[str]) -> common.UpdatedTitlesAndUrls:
+
+@contextmanager
+def open_fetcher(
+    provider: str,
+    driver_pool: WebDriverPool,
+    change_detector: ChangeDetector | None = None,
+    http_fetcher: HttpFetcher | None = None,
+) -> Iterator[WebDriver | HttpFetcher]:
+    """Webサイトごとに設定された方法 (common.FETCH_BACKENDS) でページを取得するインスタンスを用意する。
+
+    Args:
+        provider (str): 対象のWebサイト。
+        driver_pool (WebDriverPool): selenium を使う場合にブラウザを借りるプール。
+        change_detector (ChangeDetector | None, optional): HttpFetcher に渡す変更検知。デフォルトは None 。
+        NOTE: selenium の場合は driver_pool に渡したものが使われる。
+        http_fetcher (HttpFetcher | None, optional): 使い回す HttpFetcher 。渡した場合は終了しない。
+        デフォルトは None (毎回作成して終了する)。
+
+    Yields:
+        WebDriver | HttpFetcher: ページを取得するインスタンス。
+    """
+    if common.FETCH_BACKENDS[provider] == "selenium":
+        with driver_pool.lease(headless=common.HEADLESS_BROWSER[provider]) as driver:
+            yield driver
+        return
+
+    if http_fetcher is not None:
+        yield http_fetcher
+        return
+
+    fetcher = HttpFetcher(change_detector=change_detector)
+    try:
+        yield fetcher
+    finally:
+        fetcher.quit()
+
+
+def find_latest_url_in_tonarinoyj(
+    manga_titles: list[str],
+    driver_pool: WebDriverPool,
+    history: EpisodeHistory | None = None,
+    http_fetcher: HttpFetcher | None = None,
+) -> common.UpdatedTitlesAndUrls:
     """となりのヤングジャンプから最新話のタイトルとURLを取得する。
 
     Args:
         manga_titles (list[str]): 対象作品のタイトル。
+        driver_pool (WebDriverPool): ブラウザのプール。
+        history (EpisodeHistory | None, optional): 見つけた最新話を追記する履歴。デフォルトは None 。
+        http_fetcher (HttpFetcher | None, optional): 使い回す HttpFetcher 。デフォルトは None 。
 
     Returns:
         common.UpdatedTitlesAndUrls: 対象作品のタイトルとURL。
     """
     updated_titles_and_urls: common.UpdatedTitlesAndUrls = {"title": [], "url": []}
-    driver = WebDriver()
     db = DataBase(
         "./db/DATA.db",
         "tonarinoyj",
@@ -24,41 +86,61 @@ def find_latest_url_in_tonarinoyj(manga_titles: list[str]) -> common.UpdatedTitl
         ("title", "latest_episode_title", "latest_episode_url"),
     )
 
-    for manga_title in manga_titles:
-        record_before_update = db.select(("latest_episode_url", "latest_episode_title"), where={"title": manga_title})[
-            0
-        ]
-
-        ongoing_titles_and_latest_episode_url = driver.parse_ongoing_titles_in_tonarinoyj()
-        latest_episode_url = ongoing_titles_and_latest_episode_url[manga_title]
-
-        driver.get(latest_episode_url)
-        latest_episode_title = driver.current_title
-
-        if latest_episode_url != record_before_update["latest_episode_url"]:  # type: ignore
-            db.update(
-                {"latest_episode_url": latest_episode_url, "latest_episode_title": latest_episode_title},
-                {"title": manga_title},
-            )
-
-            updated_titles_and_urls["title"].append(latest_episode_title)
-            updated_titles_and_urls["url"].append(latest_episode_url)
-
-    driver.quit()
+    # 対象作品のレコードをまとめて取得しておき、変更があったレコードは最後にまとめて更新する
+    records_before_update = db.select_in("title", manga_titles, ("latest_episode_url", "latest_episode_title"))
+    records_to_update: list[common.CHANGEABLE_VALUES] = []
+
+    with open_fetcher("tonarinoyj", driver_pool, http_fetcher=http_fetcher) as fetcher:
+        # NOTE: 連載中の作品一覧は全作品で共通なので、ループの外で1度だけ取得する
+        ongoing_titles_and_latest_episode_url = fetcher.parse_ongoing_titles_in_tonarinoyj()
+
+        # 最新話が変わった作品だけ、最新話のページからタイトルを取得する
+        updated_latest_episode_urls = {
+            manga_title: ongoing_titles_and_latest_episode_url[manga_title]
+            for manga_title in manga_titles
+            if ongoing_titles_and_latest_episode_url[manga_title]
+            != records_before_update[manga_title]["latest_episode_url"]  # type: ignore
+        }
+        latest_episode_titles = fetcher.parse_page_titles(list(updated_latest_episode_urls.values()))
+
+    for manga_title, latest_episode_url in updated_latest_episode_urls.items():
+        latest_episode_title = latest_episode_titles[latest_episode_url]
+        records_to_update.append(
+            {
+                "title": manga_title,
+                "latest_episode_url": latest_episode_url,
+                "latest_episode_title": latest_episode_title,
+            }
+        )
+
+        updated_titles_and_urls["title"].append(latest_episode_title)
+        updated_titles_and_urls["url"].append(latest_episode_url)
+
+    db.update_many(records_to_update, "title")
+    if history is not None:
+        history.record("tonarinoyj", to_episode_history(records_to_update))
     return updated_titles_and_urls
 
 
-def find_latest_url_in_jumpplus(manga_titles: list[str]) -> common.UpdatedTitlesAndUrls:
+def find_latest_url_in_jumpplus(
+    manga_titles: list[str],
+    driver_pool: WebDriverPool,
+    change_detector: ChangeDetector | None = None,
+    history: EpisodeHistory | None = None,
+) -> common.UpdatedTitlesAndUrls:
     """ジャンププラスから最新話のタイトルとURLを取得する。
 
     Args:
         manga_titles (list[str]): 対象作品のタイトル。
+        driver_pool (WebDriverPool): ブラウザのプール。
+        change_detector (ChangeDetector | None, optional): 話一覧が前回から変わっていない作品を飛ばすための変更検知。
+        NOTE: driver_pool に渡したものと同じインスタンスを渡すこと。デフォルトは None 。
+        history (EpisodeHistory | None, optional): 見つけた最新話を追記する履歴。デフォルトは None 。
 
     Returns:
         common.UpdatedTitlesAndUrls: 対象作品のタイトルとURL。
     """
     updated_titles_and_urls: common.UpdatedTitlesAndUrls = {"title": [], "url": []}
-    driver = WebDriver(headless=False)
     db = DataBase(
         "./db/DATA.db",
         common.JUMPPLUS_TABLE_NAME,
@@ -66,36 +148,65 @@ def find_latest_url_in_jumpplus(manga_titles: list[str]) -> common.UpdatedTitles
         common.UPDATABLE_COLUMNS["jumpplus"],
     )
 
-    for manga_title in manga_titles:
-        record_before_update = db.select(("*",), {"title": manga_title})[0]
-
-        latest_episode_url = driver.parse_latest_episode_url_in_jumpplus(record_before_update["first_episode_url"])  # type: ignore
-        driver.get(latest_episode_url)
-        latest_episode_title = driver.current_title
-
-        if latest_episode_url != record_before_update["latest_episode_url"]:  # type: ignore
-            db.update(
-                {"latest_episode_url": latest_episode_url, "latest_episode_title": latest_episode_title},
-                {"title": manga_title},
+    records_before_update = db.select_in("title", manga_titles)
+    records_to_update: list[common.CHANGEABLE_VALUES] = []
+    first_episode_urls = [records_before_update[manga_title]["first_episode_url"] for manga_title in manga_titles]  # type: ignore
+    if change_detector is not None:
+        change_detector.load(first_episode_urls)
+
+    # NOTE: 話一覧は JavaScript で描画されるので selenium を使う
+    with driver_pool.lease(headless=common.HEADLESS_BROWSER["jumpplus"]) as driver:
+        for manga_title in manga_titles:
+            record_before_update = records_before_update[manga_title]
+
+            latest_episode_url = driver.parse_latest_episode_url_in_jumpplus(record_before_update["first_episode_url"])  # type: ignore
+            # NOTE: None は話一覧が前回から変わっていない場合
+            if latest_episode_url is None or latest_episode_url == record_before_update["latest_episode_url"]:  # type: ignore
+                continue
+
+            driver.get(latest_episode_url)
+            latest_episode_title = driver.current_title
+            records_to_update.append(
+                {
+                    "title": manga_title,
+                    "latest_episode_url": latest_episode_url,
+                    "latest_episode_title": latest_episode_title,
+                }
             )
             updated_titles_and_urls["title"].append(latest_episode_title)
             updated_titles_and_urls["url"].append(latest_episode_url)
 
-    driver.quit()
+    db.update_many(records_to_update, "title")
+    if history is not None:
+        history.record("jumpplus", to_episode_history(records_to_update))
+    # NOTE: DB の更新が終わってから保存する。途中で失敗した場合は次回もパースし直す
+    if change_detector is not None:
+        change_detector.save(first_episode_urls)
     return updated_titles_and_urls
 
 
-def find_latest_url_in_shosetsu(novel_titles: list[str]) -> common.UpdatedTitlesAndUrls:
+def find_latest_url_in_shosetsu(
+    novel_titles: list[str],
+    driver_pool: WebDriverPool,
+    change_detector: ChangeDetector | None = None,
+    history: EpisodeHistory | None = None,
+    http_fetcher: HttpFetcher | None = None,
+) -> common.UpdatedTitlesAndUrls:
     """小説家になろうから最新話のタイトルとURLを取得する。
 
     Args:
         novel_titles (list[str]): 対象作品のタイトル。
+        driver_pool (WebDriverPool): ブラウザのプール。
+        change_detector (ChangeDetector | None, optional): 作品ページが前回から変わっていない作品を飛ばすための変更検知。
+        デフォルトは None 。
+        history (EpisodeHistory | None, optional): 見つけた最新話を追記する履歴。デフォルトは None 。
+        http_fetcher (HttpFetcher | None, optional): 使い回す HttpFetcher 。change_detector を渡して作成したものにすること。
+        デフォルトは None 。
 
     Returns:
         common.UpdatedTitlesAndUrls: 対象作品のタイトルとURL。
     """
     updated_titles_and_urls: common.UpdatedTitlesAndUrls = {"title": [], "url": []}
-    driver = WebDriver()
     db = DataBase(
         "./db/DATA.db",
         common.SHOSETSU_TABLE_NAME,
@@ -103,21 +214,94 @@ def find_latest_url_in_shosetsu(novel_titles: list[str]) -> common.UpdatedTitles
         common.UPDATABLE_COLUMNS["shosetsu"],
     )
 
+    records_before_update = db.select_in("title", novel_titles)
+    records_to_update: list[common.CHANGEABLE_VALUES] = []
+    new_episodes: list[common.EpisodeHistoryValues] = []
+    novel_codes = [records_before_update[novel_title]["ncode"] for novel_title in novel_titles]  # type: ignore
+    novel_urls = [common.PROVIDER_URLS["shosetsu"] + novel_code for novel_code in novel_codes]
+    if change_detector is not None:
+        change_detector.load(novel_urls)
+
+    with open_fetcher("shosetsu", driver_pool, change_detector, http_fetcher) as fetcher:
+        latest_episodes = fetcher.parse_tracking_titles_in_shosetsu(novel_codes)
+
     for novel_title in novel_titles:
-        record_before_update = db.select(("*",), {"title": novel_title})[0]
-        latest_episode_number, latest_episode_title = driver.parse_tracking_title_in_shosetsu(record_before_update["ncode"])  # type: ignore
+        record_before_update = records_before_update[novel_title]
+        # NOTE: 作品ページが前回から変わっていない場合は含まれない
+        if record_before_update["ncode"] not in latest_episodes:  # type: ignore
+            continue
+        latest_episode_number, latest_episode_title = latest_episodes[record_before_update["ncode"]]  # type: ignore
 
         if latest_episode_number != record_before_update["latest_episode_number"]:  # type: ignore
-            db.update(
-                {"latest_episode_number": latest_episode_number, "latest_episode_title": latest_episode_title},
-                {"title": novel_title},
+            records_to_update.append(
+                {
+                    "title": novel_title,
+                    "latest_episode_number": latest_episode_number,
+                    "latest_episode_title": latest_episode_title,
+                }
             )
-            # エピソードのタイトルに作品のタイトルが含まれないので別途追加しておく
-            updated_titles_and_urls["title"].append(f"title: {novel_title}\n{latest_episode_title}")
-            updated_titles_and_urls["url"].append(
+            latest_episode_url = (
                 rf"{common.PROVIDER_URLS['shosetsu']}/{record_before_update['ncode']}/{latest_episode_number}"
             )
+            new_episodes.append(
+                {
+                    "title": novel_title,
+                    "episode_title": latest_episode_title,
+                    "episode_url": latest_episode_url,
+                    "episode_number": latest_episode_number,
+                }
+            )
+            # エピソードのタイトルに作品のタイトルが含まれないので別途追加しておく
+            updated_titles_and_urls["title"].append(f"title: {novel_title}\n{latest_episode_title}")
+            updated_titles_and_urls["url"].append(latest_episode_url)
+
+    db.update_many(records_to_update, "title")
+    if history is not None:
+        history.record("shosetsu", new_episodes)
+    if change_detector is not None:
+        change_detector.save(novel_urls)
+    return updated_titles_and_urls
+
+
+def to_episode_history(records_to_update: list[common.CHANGEABLE_VALUES]) -> list[common.EpisodeHistoryValues]:
+    """最新話を更新したレコードを、履歴に追記する形式に変換する。(ジャンププラス・となりのヤングジャンプ用)
+
+    Args:
+        records_to_update (list[common.CHANGEABLE_VALUES]): title / latest_episode_title / latest_episode_url を持つレコード。
+
+    Returns:
+        list[common.EpisodeHistoryValues]: 履歴に追記するエピソード。
+    """
+    return [
+        {
+            "title": record["title"],  # type: ignore
+            "episode_title": record["latest_episode_title"],  # type: ignore
+            "episode_url": record["latest_episode_url"],  # type: ignore
+        }
+        for record in records_to_update
+    ]
+
+
+def to_updated_titles_and_urls(
+    provider: str, new_episodes: list[common.EpisodeHistoryValues]
+) -> common.UpdatedTitlesAndUrls:
+    """履歴に新しく追記されたエピソードを、更新を通知する形式に変換する。
+
+    Args:
+        provider (str): 対象のWebサイト。
+        new_episodes (list[common.EpisodeHistoryValues]): EpisodeHistory.since() で取得したエピソード。
 
+    Returns:
+        common.UpdatedTitlesAndUrls: 更新された作品のタイトルとURL。
+    """
+    updated_titles_and_urls: common.UpdatedTitlesAndUrls = {"title": [], "url": []}
+    for episode in new_episodes:
+        if provider == "shosetsu":
+            # エピソードのタイトルに作品のタイトルが含まれないので別途追加しておく
+            updated_titles_and_urls["title"].append(f"title: {episode['title']}\n{episode['episode_title']}")  # type: ignore
+        else:
+            updated_titles_and_urls["title"].append(episode["episode_title"])  # type: ignore
+        updated_titles_and_urls["url"].append(episode["episode_url"])  # type: ignore
     return updated_titles_and_urls
 
 
@@ -143,30 +327,224 @@ def message_of_works_update(provider: str, updated_work_title_and_url: common.Up
     return message
 
 
-def main() -> None:
-    tonarinoyj_manga_titles = ["ワンパンマン", "超人X"]
-    jumpplus_manga_titles = [
-        "ダンダダン",
-        "マリッジトキシン",
-        "エクソシストを堕とせない",
-        "【推しの子】",
-        "君のことが大大大大大好きな100人の彼女",
-        "ハイパーインフレーション",
-        "左ききのエレン",
-        "2.5次元の誘惑",
-        "ドラゴンクエスト ダイの大冒険 勇者アバンと獄炎の魔王",
-    ]
-    shosetsu_novel_titles = ["Ｒｅ：ゼロから始める異世界生活", "シャングリラ・フロンティア〜クソゲーハンター、神ゲーに挑まんとす〜"]
+def message_of_crawl_failure(provider: str, error: Exception) -> str:
+    """作品の更新の取得に失敗したことを通知するためのメッセージを生成する。
+
+    Args:
+        provider (str): 対象のWebサイト。
+        error (Exception): 発生した例外。
+
+    Returns:
+        str: 生成したメッセージ。
+    """
+    return f"★ {provider}の更新\n取得に失敗しました: {error!r}\n"
+
+
+def build_pipeline(
+    provider: str,
+    titles: list[str],
+    driver_pool: WebDriverPool,
+    change_detector: ChangeDetector,
+    history: EpisodeHistory,
+    http_fetcher: HttpFetcher | None = None,
+) -> orchestrator.Pipeline:
+    """Webサイト1つ分のクロールを行う関数を作る。
+
+    Args:
+        provider (str): 対象のWebサイト。
+        titles (list[str]): 対象作品のタイトル。
+        driver_pool (WebDriverPool): ブラウザのプール。
+        change_detector (ChangeDetector): 変更検知。
+        history (EpisodeHistory): 見つけた最新話を追記する履歴。
+        http_fetcher (HttpFetcher | None, optional): 使い回す HttpFetcher 。デフォルトは None 。
 
-    LineNotification.send_notification(
-        message_of_works_update("となりのヤングジャンプ", find_latest_url_in_tonarinoyj(tonarinoyj_manga_titles))
+    Returns:
+        orchestrator.Pipeline: クロールする関数。
+    """
+    if provider == "tonarinoyj":
+        return functools.partial(find_latest_url_in_tonarinoyj, titles, driver_pool, history, http_fetcher)
+    if provider == "jumpplus":
+        return functools.partial(find_latest_url_in_jumpplus, titles, driver_pool, change_detector, history)
+    if provider == "shosetsu":
+        return functools.partial(
+            find_latest_url_in_shosetsu, titles, driver_pool, change_detector, history, http_fetcher
+        )
+    raise ValueError(f"Unknown provider: {provider}")
+
+
+def run_once(tracking_titles: dict[str, list[str]], args: argparse.Namespace) -> None:
+    """全てのWebサイトを1回ずつクロールし、結果を通知する。"""
+    # 前回から変わっていないページはパースしない
+    change_detector = ChangeDetector("./db/DATA.db")
+    driver_pool = WebDriverPool(lean=True, change_detector=change_detector)
+    # 見つけた最新話は履歴に追記し、この実行で新しく見つけたものを since() で取得して通知する
+    history = EpisodeHistory("./db/DATA.db")
+    run_started_at = now()
+    pipelines: dict[str, orchestrator.Pipeline] = {
+        provider: build_pipeline(provider, titles, driver_pool, change_detector, history)
+        for provider, titles in tracking_titles.items()
+    }
+    try:
+        if args.sequential:
+            report = orchestrator.run_providers_sequentially(pipelines)
+        else:
+            report = orchestrator.run_providers(pipelines)
+        # NOTE: Webサイトごとに取得する。(provider, seen_at) の索引で、この実行の分だけを読む
+        new_episodes = {
+            provider: history.since(run_started_at, provider)
+            for provider, result in report.results.items()
+            if result.error is None
+        }
+        deleted_episodes = history.compact(args.retention_days)
+    finally:
+        driver_pool.close()
+        # NOTE: DB の接続は各スレッドで共有して使い回しているので、全てのクロールが終わってから閉じる
+        close_all_connections()
+
+    # 全てのWebサイトのクロールが終わってから、決まった順番で通知する
+    # NOTE: 送信は別スレッドで行い、文字数の上限に収まる範囲で1回の通知にまとめる
+    with NotificationDispatcher() as dispatcher:
+        for provider, result in report.results.items():
+            if result.error is None:
+                updated_titles_and_urls = to_updated_titles_and_urls(provider, new_episodes[provider])
+                message = message_of_works_update(common.PROVIDER_NAMES[provider], updated_titles_and_urls)
+            else:
+                message = message_of_crawl_failure(common.PROVIDER_NAMES[provider], result.error)
+            dispatcher.submit(message)
+
+        print(report.summary())
+        print(driver_pool.metrics.summary())
+        print(change_detector.summary())
+        number_of_new_episodes = sum(len(episodes) for episodes in new_episodes.values())
+        print(f"episode history: new={number_of_new_episodes} compacted={deleted_episodes}")
+    print(dispatcher.metrics.summary())
+
+
+def run_daemon(tracking_titles: dict[str, list[str]], args: argparse.Namespace) -> None:
+    """常駐し、Webサイトごとの間隔 (common.CRAWL_INTERVALS) でクロールを繰り返す。
+
+    ブラウザのプール・HttpFetcher の接続・DB の接続・通知の送信スレッドは tick をまたいで使い回す。
+    しばらく更新が無い作品は TitleBackoff で確認を間引く。
+    更新が見つかった場合とクロールに失敗した場合だけ通知する。(更新が無い場合は通知しない)
+    """
+    change_detector = ChangeDetector("./db/DATA.db")
+    driver_pool = WebDriverPool(lean=True, change_detector=change_detector)
+    history = EpisodeHistory("./db/DATA.db")
+    backoff = TitleBackoff(max_skip=args.max_skip)
+    schedules = {
+        provider: ProviderSchedule(common.CRAWL_INTERVALS[provider] * args.interval_scale, args.jitter)
+        for provider in tracking_titles
+    }
+    # NOTE: HttpFetcher は Webサイトごとに作成して使い回す。(それぞれの tick は別スレッドで同時に実行される)
+    http_fetchers = {
+        provider: HttpFetcher(change_detector=change_detector)
+        for provider in tracking_titles
+        if common.FETCH_BACKENDS[provider] == "http"
+    }
+    compaction_lock = threading.Lock()
+    last_compacted_at = 0.0
+
+    def compact_if_needed() -> None:
+        nonlocal last_compacted_at
+        with compaction_lock:
+            if time.monotonic() - last_compacted_at < COMPACTION_INTERVAL:
+                return
+            last_compacted_at = time.monotonic()
+        deleted_episodes = history.compact(args.retention_days)
+        print(f"episode history: compacted={deleted_episodes}")
+
+    def tick(provider: str) -> None:
+        titles = backoff.due(provider, tracking_titles[provider])
+        if not titles:
+            return
+        tick_started_at = now()
+        pipeline = build_pipeline(
+            provider, titles, driver_pool, change_detector, history, http_fetchers.get(provider)
+        )
+        result = orchestrator.run_providers_sequentially({provider: pipeline}).results[provider]
+        print(f"[{tick_started_at}] {provider}: checked={len(titles)} {result.wall_time:.2f}s")
+
+        if result.error is not None:
+            dispatcher.submit(message_of_crawl_failure(common.PROVIDER_NAMES[provider], result.error))
+            return
+        # NOTE: 更新された作品は、この tick で履歴に追記されたエピソードから判定する
+        new_episodes = history.since(tick_started_at, provider)
+        backoff.observe(provider, titles, {episode["title"] for episode in new_episodes})  # type: ignore
+        if new_episodes:
+            updated_titles_and_urls = to_updated_titles_and_urls(provider, new_episodes)
+            dispatcher.submit(message_of_works_update(common.PROVIDER_NAMES[provider], updated_titles_and_urls))
+        compact_if_needed()
+
+    scheduler = Scheduler(schedules, tick)
+    # NOTE: kill (SIGTERM) でも Ctrl+C と同じく、実行中の tick が終わってから終了する
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+    # NOTE: ブラウザの起動は数秒かかるので、最初の tick の前に起動しておく
+    if any(common.FETCH_BACKENDS[provider] == "selenium" for provider in tracking_titles):
+        driver_pool.warm_up(1, headless=common.HEADLESS_BROWSER["jumpplus"])
+
+    with NotificationDispatcher() as dispatcher:
+        try:
+            scheduler.run_forever()
+        finally:
+            for fetcher in http_fetchers.values():
+                fetcher.quit()
+            driver_pool.close()
+            close_all_connections()
+            print(driver_pool.metrics.summary())
+            print(change_detector.summary())
+            print(backoff.summary())
+    print(dispatcher.metrics.summary())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sequential", action="store_true", help="Webサイトを1つずつ順番にクロールする (所要時間の比較用)"
+    )
+    parser.add_argument(
+        "--retention-days", type=int, default=DEFAULT_RETENTION_DAYS, help="エピソードの履歴を残す日数"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"処理時間の内訳を計測し {DEFAULT_PROFILE_DIR} に保存する (環境変数 {PROFILE_ENV_VAR}=1 でも有効になる)",
     )
-    LineNotification.send_notification(
-        message_of_works_update("少年ジャンププラス", find_latest_url_in_jumpplus(jumpplus_manga_titles))
+    parser.add_argument("--daemon", action="store_true", help="常駐し、Webサイトごとの間隔でクロールを繰り返す")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER, help="常駐モードでクロールの間隔をずらす割合")
+    parser.add_argument(
+        "--interval-scale", type=float, default=1.0, help="常駐モードでクロールの間隔に掛ける倍率 (動作確認用)"
     )
-    LineNotification.send_notification(
-        message_of_works_update("小説家になろう", find_latest_url_in_shosetsu(shosetsu_novel_titles))
+    parser.add_argument(
+        "--max-skip", type=int, default=DEFAULT_MAX_SKIP, help="常駐モードで更新が無い作品の確認を続けて飛ばす回数の上限"
     )
+    args = parser.parse_args()
+    if args.profile or os.environ.get(PROFILE_ENV_VAR) == "1":
+        profiler.enable()
+
+    tracking_titles = {
+        "tonarinoyj": ["ワンパンマン", "超人X"],
+        "jumpplus": [
+            "ダンダダン",
+            "マリッジトキシン",
+            "エクソシストを堕とせない",
+            "【推しの子】",
+            "君のことが大大大大大好きな100人の彼女",
+            "ハイパーインフレーション",
+            "左ききのエレン",
+            "2.5次元の誘惑",
+            "ドラゴンクエスト ダイの大冒険 勇者アバンと獄炎の魔王",
+        ],
+        "shosetsu": ["Ｒｅ：ゼロから始める異世界生活", "シャングリラ・フロンティア〜クソゲーハンター、神ゲーに挑まんとす〜"],
+    }
+    if args.daemon:
+        run_daemon(tracking_titles, args)
+    else:
+        run_once(tracking_titles, args)
+
+    if profiler.enabled:
+        # 前回の実行と比べて遅くなった区間が分かるように、保存する前に前回の結果を読み込んでおく
+        previous_report = load_previous_report()
+        print(summarize(profiler.save(), previous_report))
 
 
 if __name__ == "__main__":
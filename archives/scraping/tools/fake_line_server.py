@@ -0,0 +1,97 @@
+"""LINE Notify の代わりに通知を受け取るローカルの偽のエンドポイント。
+
+NotificationDispatcher の api_url をこのサーバに向けることで、実際に通知を送らずに動作を確認出来る。
+受け取ったメッセージは server.received に溜まる。
+--fail-first を指定すると、最初の n 回のリクエストに 500 を返す。(再送の確認用)
+
+Usage:
+    python -m tools.fake_line_server --port 8001 --fail-first 2
+
+    dispatcher = NotificationDispatcher(token="dummy", api_url="http://127.0.0.1:8001/api/notify")
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class FakeLineServer(ThreadingHTTPServer):
+    def __init__(self, address: tuple[str, int], fail_first: int = 0, verbose: bool = False) -> None:
+        super().__init__(address, FakeLineRequestHandler)
+        self.fail_first = fail_first
+        self.verbose = verbose
+        self.requests = 0
+        self.received: list[str] = []
+        self.lock = threading.Lock()
+
+
+class FakeLineRequestHandler(BaseHTTPRequestHandler):
+    # NOTE: keep-alive を有効にするため HTTP/1.1 で応答する
+    protocol_version = "HTTP/1.1"
+    server: FakeLineServer
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        with self.server.lock:
+            self.server.requests += 1
+            fail = self.server.requests <= self.server.fail_first
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._respond(401, '{"status":401,"message":"Invalid access token"}')
+            return
+        if fail:
+            self._respond(500, '{"status":500,"message":"Internal Server Error"}')
+            return
+
+        message = parse_qs(body).get("message", [""])[0]
+        with self.server.lock:
+            self.server.received.append(message)
+        if self.server.verbose:
+            print(f"--- {len(message)} chars ---{message}")
+        self._respond(200, '{"status":200,"message":"ok"}')
+
+    def _respond(self, status: int, body: str) -> None:
+        encoded = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def serve_in_background(port: int = 0, fail_first: int = 0) -> FakeLineServer:
+    """偽のエンドポイントを別スレッドで起動する。
+
+    Args:
+        port (int, optional): 待ち受けるポート。デフォルトは 0 (空いているポートを使う)。
+        fail_first (int, optional): 500 を返すリクエストの数。デフォルトは 0 。
+
+    Returns:
+        FakeLineServer: 起動したサーバ。server.received で受け取ったメッセージを、server.shutdown() で停止出来る。
+    """
+    server = FakeLineServer(("127.0.0.1", port), fail_first)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--fail-first", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeLineServer(("127.0.0.1", args.port), args.fail_first, verbose=True)
+    print(f"Listening on http://127.0.0.1:{args.port}/api/notify")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""パーサの計測・確認用に、各Webサイトのページと同じ構造の HTML を生成する。
+
+実際のページと同じく、パースに使う一覧の他にヘッダ・フッタ・スクリプトなどの不要な部分も含める。
+(部分パースの効果を確認出来るようにするため)
+
+    tonarinoyj: 連載作品一覧 (.series-table-list) に series 件の作品を並べる
+    jumpplus:   作品のエピソードページ。話一覧 (a.series-episode-list-container) に episodes 件を新しい順に並べる
+    shosetsu:   作品の目次ページ。.novel_sublist2 に episodes 件を古い順に並べる
+                per_page を指定すると、そのページの分だけを並べてページャ (.c-pager) を付ける
+                decorated を指定すると、話のタイトルの一部をタグ (<span>) で囲む
+
+fixtures/pages 以下のページはこのスクリプトで生成したもの。
+
+Usage:
+    python -m tools.fixture_generator --out ./fixtures/pages --series 40 --episodes 120 --novel-episodes 600
+    python -m tools.fixture_generator --out /tmp/pages --series 5000 --episodes 5000 --novel-episodes 5000
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+from html import escape
+from typing import Final
+
+# ヘッダ・フッタなど、どのページにも含まれる部分の大きさの目安(バイト)
+DEFAULT_FILLER_BYTES: Final = 48 * 1024
+
+TONARINOYJ_BASE_URL: Final = "https://tonarinoyj.jp"
+JUMPPLUS_BASE_URL: Final = "https://shonenjumpplus.com"
+SHOSETSU_BASE_URL: Final = "https://ncode.syosetu.com"
+
+
+def _filler(size: int, seed: int) -> str:
+    """ナビゲーション・広告・インラインスクリプトなど、パースには不要な部分。"""
+    rng = random.Random(seed)
+    parts = ['<nav class="global-nav"><ul>']
+    for i in range(20):
+        parts.append(f'<li class="global-nav-item"><a href="/category/{i}">カテゴリ{i}</a></li>')
+    parts.append("</ul></nav>")
+    length = sum(len(part) for part in parts)
+    i = 0
+    while length < size:
+        words = " ".join(f"word{rng.randrange(10_000)}" for _ in range(12))
+        part = (
+            f'<div class="ad-container" data-slot="{i}"><div class="ad-inner"><span class="ad-label">PR</span>'
+            f"<p>{words}</p></div></div>"
+            f'<script type="application/json" data-id="{i}">{{"slot":{i},"keys":"{words}"}}</script>'
+        )
+        parts.append(part)
+        length += len(part)
+        i += 1
+    return "".join(parts)
+
+
+def _page(title: str, body: str, filler_bytes: int, seed: int) -> str:
+    half = _filler(filler_bytes // 2, seed)
+    return (
+        '<!DOCTYPE html><html lang="ja"><head><meta charset="utf-8">'
+        f"<title>{escape(title)}</title>"
+        '<link rel="stylesheet" href="/assets/app.css"><script src="/assets/app.js" defer></script></head>'
+        f'<body><header class="header">{half}</header><main class="main">{body}</main>'
+        f'<footer class="footer">{_filler(filler_bytes - len(half), seed + 1)}</footer></body></html>'
+    )
+
+
+def series_title(index: int) -> str:
+    return f"作品{index:05d}"
+
+
+def tonarinoyj_series_page(number_of_series: int, filler_bytes: int = DEFAULT_FILLER_BYTES, seed: int = 0) -> str:
+    """となりのヤングジャンプの連載作品一覧ページを生成する。
+
+    Args:
+        number_of_series (int): 作品数。
+        NOTE: 10作品に1つは1話のみの作品 (.link-latest が無く .link-first-episode だけがある) にする。
+        filler_bytes (int, optional): 一覧以外の部分の大きさ(バイト)。デフォルトは DEFAULT_FILLER_BYTES 。
+        seed (int, optional): 乱数のシード。デフォルトは 0 。
+
+    Returns:
+        str: 生成した HTML 。
+    """
+    rng = random.Random(seed)
+    items = []
+    for i in range(number_of_series):
+        episode_id = 3269754496000000000 + rng.randrange(10**12)
+        links = f'<p class="link-first-episode"><a href="{TONARINOYJ_BASE_URL}/episode/{episode_id - 1}">1話目を読む</a></p>'
+        if i % 10 != 9:
+            links += f'<p class="link-latest"><a href="{TONARINOYJ_BASE_URL}/episode/{episode_id}">最新話を読む</a></p>'
+        items.append(
+            '<li class="subpage-table-list-item">'
+            f'<a class="series-table-list-item-link" href="{TONARINOYJ_BASE_URL}/series/{i}">'
+            f'<img class="series-table-list-item-img" src="/images/series/{i}.jpg" alt=""></a>'
+            f'<div class="title-container"><div class="series-table-list-item-info"><h4>{series_title(i)}</h4>'
+            f'<p class="author">作者{i}</p><p class="description">{"あらすじ" * 20}</p></div></div>'
+            f'<div class="episode-link-container">{links}</div></li>'
+        )
+    body = f'<section class="series-section"><h2>連載中</h2><ul class="series-table-list">{"".join(items)}</ul></section>'
+    return _page("連載作品一覧 | となりのヤングジャンプ", body, filler_bytes, seed)
+
+
+def jumpplus_episode_page(number_of_episodes: int, filler_bytes: int = DEFAULT_FILLER_BYTES, seed: int = 0) -> str:
+    """ジャンププラスのエピソードページ (話一覧を含む) を生成する。
+
+    Args:
+        number_of_episodes (int): 話数。話一覧には新しい順に並べる。
+        filler_bytes (int, optional): 話一覧以外の部分の大きさ(バイト)。デフォルトは DEFAULT_FILLER_BYTES 。
+        seed (int, optional): 乱数のシード。デフォルトは 0 。
+
+    Returns:
+        str: 生成した HTML 。
+    """
+    items = []
+    for number in range(number_of_episodes, 0, -1):
+        items.append(
+            '<li class="episode">'
+            f'<a class="series-episode-list-container" href="{JUMPPLUS_BASE_URL}/episode/{3269632237310000000 + number}">'
+            f'<div class="series-episode-list-thumb-container"><img src="/images/episode/{number}.jpg" alt=""></div>'
+            f'<div class="series-episode-list-content"><h4 class="series-episode-list-title">[第{number}話]</h4>'
+            f'<span class="series-episode-list-date">2022/09/{number % 28 + 1:02d}</span></div></a></li>'
+        )
+    body = (
+        '<div class="episode-header"><h1 class="episode-header-title">[第1話]</h1></div>'
+        '<div class="viewer" data-episode-id="1"></div>'
+        f'<ul class="series-episode-list">{"".join(items)}</ul>'
+    )
+    return _page(f"[第{number_of_episodes}話]作品 - 少年ジャンプ＋", body, filler_bytes, seed)
+
+
+def shosetsu_toc_page(
+    novel_code: str,
+    number_of_episodes: int,
+    page: int = 1,
+    per_page: int | None = None,
+    decorated: bool = False,
+    filler_bytes: int = DEFAULT_FILLER_BYTES,
+    seed: int = 0,
+) -> str:
+    """小説家になろうの目次ページを生成する。
+
+    Args:
+        novel_code (str): 作品の Nコード 。
+        number_of_episodes (int): 全体の話数。
+        page (int, optional): 生成するページ番号 (1始まり)。per_page を指定した場合だけ使う。デフォルトは 1 。
+        per_page (int | None, optional): 1ページあたりの話数。デフォルトは None (ページ分割せず全話を並べる)。
+        decorated (bool, optional): 話のタイトルの「第N話」を <span> で囲むかどうか。デフォルトは `False` 。
+        NOTE: タイトルの .text は囲まない場合と同じになる。(目次の末尾だけを読む高速パスが失敗する場合の確認用)
+        filler_bytes (int, optional): 目次以外の部分の大きさ(バイト)。デフォルトは DEFAULT_FILLER_BYTES 。
+        seed (int, optional): 乱数のシード。デフォルトは 0 。
+
+    Returns:
+        str: 生成した HTML 。
+    """
+    if per_page is None:
+        first, last, number_of_pages = 1, number_of_episodes, 1
+    else:
+        number_of_pages = max(math.ceil(number_of_episodes / per_page), 1)
+        first = (page - 1) * per_page + 1
+        last = min(page * per_page, number_of_episodes)
+
+    items = []
+    for number in range(first, last + 1):
+        if number % 50 == 1:
+            items.append(f'<div class="chapter_title">第{number // 50 + 1}章</div>')
+        episode_number = f'<span class="episode_number">第{number}話</span>' if decorated else f"第{number}話"
+        items.append(
+            '<dl class="novel_sublist2">'
+            f'<dd class="subtitle"><a href="/{novel_code}/{number}/">{episode_number} エピソード{number}</a></dd>'
+            f'<dt class="long_update">2022/09/{number % 28 + 1:02d} 00:00</dt></dl>'
+        )
+
+    pager = ""
+    if number_of_pages > 1:
+        pager_items = []
+        if page > 1:
+            pager_items.append(f'<a href="/{novel_code}/" class="c-pager__item c-pager__item--first">最初へ</a>')
+            pager_items.append(
+                f'<a href="/{novel_code}/?p={page - 1}" class="c-pager__item c-pager__item--before">前へ</a>'
+            )
+        if page < number_of_pages:
+            pager_items.append(
+                f'<a href="/{novel_code}/?p={page + 1}" class="c-pager__item c-pager__item--next">次へ</a>'
+            )
+            pager_items.append(
+                f'<a href="/{novel_code}/?p={number_of_pages}" class="c-pager__item c-pager__item--last">最後へ</a>'
+            )
+        pager = f'<div class="c-pager">{"".join(pager_items)}</div>'
+
+    body = (
+        f'<p class="novel_title">{series_title(seed)}</p><div class="novel_writername">作者：作者{seed}</div>'
+        f'<div id="novel_ex">{"あらすじ" * 50}</div>'
+        f'{pager}<div class="index_box">{"".join(items)}</div>{pager}'
+    )
+    return _page(f"{series_title(seed)}", body, filler_bytes, seed)
+
+
+def write_corpus(
+    directory: str,
+    number_of_series: int,
+    number_of_episodes: int,
+    number_of_novel_episodes: int,
+    filler_bytes: int = DEFAULT_FILLER_BYTES,
+) -> list[str]:
+    """各Webサイトのページを1つずつ生成して保存する。
+
+    ファイル名の先頭を Webサイト名にする。(benchmarks.parser_backends でパーサの判定に使う)
+
+    Returns:
+        list[str]: 保存したファイルのパス。
+    """
+    os.makedirs(directory, exist_ok=True)
+    pages = {
+        "tonarinoyj_series.html": tonarinoyj_series_page(number_of_series, filler_bytes),
+        "jumpplus_episode.html": jumpplus_episode_page(number_of_episodes, filler_bytes),
+        "shosetsu_n0000aa.html": shosetsu_toc_page("n0000aa", number_of_novel_episodes, filler_bytes=filler_bytes),
+        "shosetsu_n0000ab_decorated.html": shosetsu_toc_page(
+            "n0000ab", number_of_novel_episodes, decorated=True, filler_bytes=filler_bytes
+        ),
+    }
+    filepaths = []
+    for filename, html in pages.items():
+        filepath = os.path.join(directory, filename)
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(html)
+        filepaths.append(filepath)
+    return filepaths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--series", type=int, default=40)
+    parser.add_argument("--episodes", type=int, default=120)
+    parser.add_argument("--novel-episodes", type=int, default=600)
+    parser.add_argument("--filler-bytes", type=int, default=DEFAULT_FILLER_BYTES)
+    args = parser.parse_args()
+
+    for filepath in write_corpus(args.out, args.series, args.episodes, args.novel_episodes, args.filler_bytes):
+        print(f"{filepath} ({os.path.getsize(filepath):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""保存したページを返すローカルのスタブサーバ。
+
+HttpFetcher の provider_urls をこのサーバに向けることで、実際のWebサイトにアクセスせずに動作を確認出来る。
+リクエストのパスに対して、以下の順でファイルを探して返す。
+    1. {root}/{path}
+    2. {root}/{path}.html
+    3. {root}/{path}/index.html
+クエリ文字列がある場合は、先に {root}/{path}/{query}.html を探す。(例: /n0000aa/?p=7 -> n0000aa/p=7.html)
+ファイルの更新日時とサイズから ETag を付けて返し、If-None-Match が一致すれば 304 を返す。
+
+Usage:
+    python -m tools.stub_server --root ./pages --port 8000
+
+    fetcher = HttpFetcher(
+        provider_urls={"tonarinoyj": "http://127.0.0.1:8000/series", "shosetsu": "http://127.0.0.1:8000/"}
+    )
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    # NOTE: keep-alive を有効にするため HTTP/1.1 で応答する
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, root: str, **kwargs) -> None:
+        self.root = os.path.abspath(root)
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        filepath = self._find_file(unquote(url.path), unquote(url.query))
+        if filepath is None:
+            self.send_error(404)
+            return
+
+        stat = os.stat(filepath)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        with open(filepath, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _find_file(self, path: str, query: str = "") -> str | None:
+        base = os.path.abspath(os.path.join(self.root, path.strip("/")))
+        candidates = [base, base + ".html", os.path.join(base, "index.html")]
+        if query:
+            candidates.insert(0, os.path.abspath(os.path.join(base, query + ".html")))
+        for candidate in candidates:
+            # root の外のファイルは返さない
+            if os.path.commonpath([self.root, candidate]) != self.root:
+                continue
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def serve_in_background(root: str, port: int = 0) -> ThreadingHTTPServer:
+    """スタブサーバを別スレッドで起動する。
+
+    Args:
+        root (str): 返すページを置いたディレクトリ。
+        port (int, optional): 待ち受けるポート。デフォルトは 0 (空いているポートを使う)。
+
+    Returns:
+        ThreadingHTTPServer: 起動したサーバ。server.server_address でポートを、server.shutdown() で停止出来る。
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), functools.partial(StubRequestHandler, root=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", required=True)
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), functools.partial(StubRequestHandler, root=args.root))
+    print(f"Serving {os.path.abspath(args.root)} on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import os
 import sqlite3
+import threading
+from dataclasses import dataclass
 from typing import Literal
 
 LOGICAL_OPERATOR = Literal["AND", "OR"]
@@ -24,6 +27,117 @@ def dict_factory(cursor: sqlite3.Cursor, row: sqlite3.Row) -> dict:
     return result
 
 
+@dataclass(frozen=True)
+class ConnectionSettings:
+    """接続を開く時に設定する PRAGMA など。
+
+    NOTE: デフォルトは複数のスレッドから同時に書き込む用途に合わせている。
+    journal_mode が WAL だと読み込みと書き込みが互いをブロックしない。
+    synchronous は WAL なら NORMAL でもコミット済みのデータは壊れない。(電源断で直前のコミットが失われることはある)
+    """
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    # 負の値は KiB 単位 (約 16MB)
+    cache_size: int = -16 * 1024
+    busy_timeout: int = 5000
+    temp_store: str = "MEMORY"
+    # NOTE: 暗黙のトランザクションを BEGIN IMMEDIATE で始め、書き込みロックを最初に取る。
+    # DEFERRED だと読み込みから書き込みへの昇格時に他の書き込みと衝突し、busy_timeout を待たずに "database is locked" になる
+    isolation_level: str = "IMMEDIATE"
+
+
+class ConnectionManager:
+    """1つの DB ファイルへの接続をスレッドごとに1つ保持して使い回す。
+
+    sqlite3 の接続は作成したスレッドでしか使えないので、スレッドごとに接続を作りプールする。
+    同じスレッドでは DataBase を何度作っても同じ接続を使う。
+    """
+
+    def __init__(self, db_path: str, settings: ConnectionSettings | None = None) -> None:
+        """インスタンスの初期化。
+
+        Args:
+            db_path (str): DBのパス。
+            settings (ConnectionSettings | None, optional): 接続の設定。デフォルトは None (ConnectionSettings())。
+        """
+        self.db_path = db_path
+        self.settings = settings if settings is not None else ConnectionSettings()
+        self._local = threading.local()
+        # close_all() で閉じるために、全てのスレッドの接続を保持しておく
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        """このスレッド用の接続を返す。無ければ作成する。
+
+        Returns:
+            sqlite3.Connection: 接続。
+        """
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _connect(self) -> sqlite3.Connection:
+        settings = self.settings
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=settings.busy_timeout / 1000,
+            isolation_level=settings.isolation_level,
+            # NOTE: 接続は作成したスレッドでしか使わないが、close_all() で他のスレッドから閉じられるようにする
+            check_same_thread=False,
+        )
+        # NOTE: journal_mode の変更はロックが必要で、他の接続が書き込み中だと失敗するので変わる場合だけ設定する
+        current_journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+        if current_journal_mode.lower() != settings.journal_mode.lower():
+            connection.execute(f"PRAGMA journal_mode={settings.journal_mode}")
+        connection.execute(f"PRAGMA synchronous={settings.synchronous}")
+        connection.execute(f"PRAGMA cache_size={settings.cache_size}")
+        connection.execute(f"PRAGMA busy_timeout={settings.busy_timeout}")
+        connection.execute(f"PRAGMA temp_store={settings.temp_store}")
+        return connection
+
+    def close_all(self) -> None:
+        """全てのスレッドの接続を閉じる。
+        NOTE: 他のスレッドで使用中の接続も閉じるので、全ての処理が終わってから呼ぶこと。
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for connection in connections:
+            connection.close()
+
+
+_managers: dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: str, settings: ConnectionSettings | None = None) -> ConnectionManager:
+    """DB ファイルごとに共有される ConnectionManager を返す。
+
+    Args:
+        db_path (str): DBのパス。
+        settings (ConnectionSettings | None, optional): 初めて作成する場合の接続の設定。
+        NOTE: 既に作成済みの場合は無視される。デフォルトは None 。
+
+    Returns:
+        ConnectionManager: db_path に対応する ConnectionManager 。
+    """
+    # ":memory:" は接続ごとに別の DB になるので共有しない
+    if db_path == ":memory:":
+        return ConnectionManager(db_path, settings)
+
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = ConnectionManager(db_path, settings)
+        return _managers[key]
+
+
 class DataBase:
     """データベースを抽象化するクラス。"""
 
@@ -34,6 +148,7 @@ class DataBase:
         columns: tuple[str, ...],
         updatable_columns: tuple[str, ...],
         table_info: str | None = None,
+        connection_manager: ConnectionManager | None = None,
     ) -> None:
         """インスタンスの初期化。
 
@@ -43,11 +158,18 @@ class DataBase:
             columns (tuple[str, ...]): 全てのカラム名。
             updatable_columns (tuple[str, ...]): 更新可能なカラム名。
             table_info (str | None, optional): 作成するテーブルのカラム情報を持つクエリ。デフォルトは None 。
+            connection_manager (ConnectionManager | None, optional): 接続を取得するマネージャ。
+            デフォルトは None (get_connection_manager(db_path) で db_path ごとに共有されるものを使う)。
         """
-        self.connection = sqlite3.connect(db_path)
-        # select の結果を辞書に変更する
-        self.connection.row_factory = dict_factory
+        self.connection_manager = (
+            connection_manager if connection_manager is not None else get_connection_manager(db_path)
+        )
+        # NOTE: 同じスレッドの他のインスタンスと接続を共有する
+        self.connection = self.connection_manager.connection()
         self.cursor = self.connection.cursor()
+        # select の結果を辞書に変更する
+        # NOTE: 接続は共有しているので、接続ではなくカーソルに設定する
+        self.cursor.row_factory = dict_factory
 
         self.table_name = table_name
         self.columns = columns
@@ -87,9 +209,10 @@ class DataBase:
         return False if self.cursor.fetchone()["COUNT(*)"] == 0 else True
 
     def close(self) -> None:
-        """接続を閉じる。"""
+        """カーソルを閉じる。
+        NOTE: 接続は他のインスタンスと共有しているので閉じない。接続を閉じる場合は connection_manager.close_all() を呼ぶこと。
+        """
         self.cursor.close()
-        self.connection.close()
 
     def _commit(self) -> None:
         """DBに加えた変更をコミットする。"""